@@ -0,0 +1,166 @@
+"""Record a benchmark baseline and check later runs against it.
+
+    python scripts/bench.py record [--out benchmarks/baseline.json] [-- PYTEST_ARGS...]
+    python scripts/bench.py compare [--baseline benchmarks/baseline.json] [--tolerance 0.25]
+        [--current RUN.json] [-- PYTEST_ARGS...]
+
+Both commands run `tests/benchmark` through pytest-benchmark (extra pytest arguments such as
+`-k step` go after `--`) unless `compare` is given a `--current` file. A baseline keeps, per
+benchmark, the summary statistics pytest-benchmark reports plus the machine it ran on;
+`--current` also accepts a raw `--benchmark-json` file. A recorded baseline also notes the
+git commit it was recorded at, which `compare` prints; re-record it when the code on the
+measured paths changes. `compare` prints the change of each shared benchmark and exits with
+status 1 when any got slower by more than `--tolerance` (a fraction of the baseline
+`--stat`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+STATS = ("min", "max", "mean", "median", "stddev", "iqr", "rounds")
+
+
+def run_suite(pytest_args: list[str]) -> dict[str, Any]:
+    """Run the benchmark tests and return pytest-benchmark's JSON report."""
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / "run.json"
+        cmd = [
+            sys.executable,
+            "-m",
+            "pytest",
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            str(ROOT / "tests" / "benchmark"),
+            f"--benchmark-json={report}",
+            *pytest_args,
+        ]
+        src = str(ROOT / "src")
+        path = os.pathsep.join(p for p in (src, os.environ.get("PYTHONPATH")) if p)
+        proc = subprocess.run(cmd, cwd=ROOT, env={**os.environ, "PYTHONPATH": path})
+        if proc.returncode != 0 or not report.exists():
+            raise SystemExit(f"Benchmark run failed (pytest exit status {proc.returncode})")
+        data: dict[str, Any] = json.loads(report.read_text())
+        return data
+
+
+def git_commit() -> str | None:
+    """Commit of the working tree (suffixed `-dirty` with uncommitted changes), if known."""
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        )
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    if head.returncode != 0:
+        return None
+    return head.stdout.strip() + ("-dirty" if status.stdout.strip() else "")
+
+
+def condense(report: dict[str, Any]) -> dict[str, Any]:
+    """Baseline form of a pytest-benchmark report (a baseline is returned unchanged)."""
+    if isinstance(report.get("benchmarks"), dict):
+        return report
+    machine = report.get("machine_info", {})
+    return {
+        "machine": {
+            "python": machine.get("python_version", platform.python_version()),
+            "platform": machine.get("platform", platform.platform()),
+            "cpu": machine.get("cpu", {}).get("brand_raw", platform.processor()),
+        },
+        "datetime": report.get("datetime"),
+        "benchmarks": {
+            b["fullname"]: {k: b["stats"][k] for k in STATS} for b in report["benchmarks"]
+        },
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], *, tolerance: float, stat: str
+) -> tuple[list[str], list[str]]:
+    """Report lines for every shared benchmark, and the names of the regressed ones."""
+    base, cur = baseline["benchmarks"], current["benchmarks"]
+    lines, regressed = [], []
+    width = max((len(name) for name in base.keys() & cur.keys()), default=0)
+    for name in sorted(base.keys() & cur.keys()):
+        before, after = base[name][stat], cur[name][stat]
+        change = after / before - 1.0 if before > 0 else 0.0
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        elif change < -tolerance:
+            flag = "  faster"
+        lines.append(
+            f"{name:<{width}}  {before * 1e6:12.2f}us  {after * 1e6:12.2f}us  {change:+7.1%}{flag}"
+        )
+    for name in sorted(base.keys() - cur.keys()):
+        lines.append(f"{name}: not in the current run")
+    for name in sorted(cur.keys() - base.keys()):
+        lines.append(f"{name}: new (no baseline)")
+    return lines, regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark baseline and regression check")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="Run the suite and write a baseline")
+    rec.add_argument("--out", type=Path, default=DEFAULT_BASELINE)
+    cmp_ = sub.add_parser("compare", help="Flag regressions against a baseline")
+    cmp_.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    cmp_.add_argument("--current", type=Path, default=None, help="Report to check (default: run)")
+    cmp_.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed slowdown as a fraction"
+    )
+    cmp_.add_argument("--stat", choices=["min", "mean", "median"], default="median")
+    argv = sys.argv[1:] if argv is None else argv
+    # Everything after `--` goes to pytest
+    pytest_args: list[str] = []
+    if "--" in argv:
+        i = argv.index("--")
+        argv, pytest_args = argv[:i], argv[i + 1 :]
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        baseline = condense(run_suite(pytest_args))
+        baseline["commit"] = git_commit()
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Wrote {len(baseline['benchmarks'])} benchmarks to {args.out}")
+        return 0
+
+    baseline = condense(json.loads(args.baseline.read_text()))
+    if args.current is not None:
+        current = condense(json.loads(args.current.read_text()))
+    else:
+        current = condense(run_suite(pytest_args))
+    lines, regressed = compare(baseline, current, tolerance=args.tolerance, stat=args.stat)
+    recorded = baseline.get("commit") or "unknown commit"
+    print(f"baseline recorded at {recorded} ({baseline.get('datetime')})")
+    print(f"{args.stat}: baseline -> current (tolerance {args.tolerance:.0%})")
+    print("\n".join(lines))
+    if regressed:
+        print(f"{len(regressed)} benchmark(s) regressed beyond {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,8 +4,15 @@ from pathlib import Path
 from typing import Optional
 
 import gymnasium as gym
+import numpy as np
 import column_popper.envs  # register env
 
+try:
+    from stable_baselines3.common.callbacks import BaseCallback  # type: ignore
+    from stable_baselines3.common.vec_env import VecEnv  # type: ignore
+except ImportError:  # main() reports the missing dependency
+    BaseCallback = VecEnv = object  # type: ignore[assignment,misc]
+
 
 def parse_curve(s: str) -> list[tuple[float, float]]:
     out: list[tuple[float, float]] = []
@@ -21,6 +28,72 @@ def parse_curve(s: str) -> list[tuple[float, float]]:
     return out
 
 
+class ColumnPopperVecEnv(VecEnv):
+    """SB3 view of a Gymnasium vector env: same-step autoreset and epsilon manual falls.
+
+    The vector env is one object, so `get_attr`, `set_attr` and `env_method` act on it as a
+    whole and repeat the result for every requested index.
+    """
+
+    def __init__(self, venv, eps: float, seed: Optional[int] = None):
+        self.venv = venv
+        self.eps = float(eps)
+        self.np_random = np.random.default_rng(seed)
+        self._actions = np.zeros(venv.num_envs, dtype=np.int64)
+        super().__init__(venv.num_envs, venv.single_observation_space, venv.single_action_space)
+
+    def reset(self):
+        obs, _ = self.venv.reset()
+        return obs
+
+    def step_async(self, actions):  # type: ignore[override]
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs).copy()
+        if self.eps > 0:
+            self._actions[self.np_random.random(self.num_envs) < self.eps] = 3
+
+    def step_wait(self):
+        obs, rewards, terminated, truncated, info = self.venv.step(self._actions)
+        dones = terminated | truncated
+        infos = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            for i in np.flatnonzero(dones):
+                infos[i]["terminal_observation"] = {k: v[i].copy() for k, v in obs.items()}
+                infos[i]["TimeLimit.truncated"] = bool(truncated[i] and not terminated[i])
+            obs, _ = self.venv.reset(options={"reset_mask": dones})
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        self.venv.close()
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self.venv, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self.venv, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        result = getattr(self.venv, method_name)(*method_args, **method_kwargs)
+        return [result] * len(self._get_indices(indices))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+
+class EventExportCallback(BaseCallback):
+    """Writes game-event counters through a `MetricsExporter` during and after training."""
+
+    def __init__(self, exporter):
+        super().__init__()
+        self.exporter = exporter
+
+    def _on_step(self) -> bool:
+        self.exporter.maybe_write()
+        return True
+
+    def _on_training_end(self) -> None:
+        self.exporter.write()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Train PPO on Column Popper")
     parser.add_argument("--timesteps", type=int, default=50_000)
@@ -28,6 +101,37 @@ def main() -> None:
     parser.add_argument("--initial-fall", type=float, default=3.0)
     parser.add_argument("--fall-curve", type=str, default="20:2,40:1")
     parser.add_argument("--epsilon-fall", type=float, default=0.05, help="With probability epsilon, override action to manual fall (3) to encourage exploration. Decays to 0 over training.")
+    parser.add_argument(
+        "--num-envs",
+        type=int,
+        default=1,
+        help="Number of envs stepped together (>1 uses the batched vector env).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help=(
+            "With --num-envs > 1, split the envs across this many worker processes "
+            "(0 = step all in-process)."
+        ),
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        help=(
+            "Write game-event counters here during training "
+            "(e.g. a node exporter textfile collector .prom file)."
+        ),
+    )
+    parser.add_argument("--metrics-format", choices=["prometheus", "json"], default="prometheus")
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=10.0,
+        help="Seconds between --metrics-file writes.",
+    )
     parser.add_argument(
         "--model-out",
         type=Path,
@@ -44,33 +148,51 @@ def main() -> None:
 
     os.makedirs(args.model_out.parent, exist_ok=True)
 
-    base_env = gym.make(
-        "SpecKitAI/ColumnPopper-v1",
-        seed=args.seed,
+    env_kwargs = dict(
         include_time_left_norm=True,
-        use_wall_time=False,
         initial_fall_interval=args.initial_fall,
         schedule_curve=parse_curve(args.fall_curve),
     )
 
-    # Optional exploration wrapper to ensure agent experiences manual fall
-    if args.epsilon_fall > 0:
-        import numpy as np
-
-        class ManualFallEpsilonWrapper(gym.Wrapper):
-            def __init__(self, env: gym.Env, eps: float):
-                super().__init__(env)
-                self.eps = float(eps)
-                self.np_random = np.random.default_rng(args.seed)
+    if args.num_envs > 1:
+        from stable_baselines3.common.vec_env import VecMonitor  # type: ignore
 
-            def step(self, action):  # type: ignore[override]
-                if self.np_random.random() < self.eps:
-                    action = 3
-                return self.env.step(action)
+        from column_popper.envs import ProcessVectorColumnPopperEnv, VectorColumnPopperEnv
 
-        env = ManualFallEpsilonWrapper(base_env, args.epsilon_fall)
+        if args.workers > 0:
+            venv = ProcessVectorColumnPopperEnv(
+                args.num_envs, num_workers=args.workers, seed=args.seed, **env_kwargs
+            )
+        else:
+            venv = VectorColumnPopperEnv(args.num_envs, seed=args.seed, **env_kwargs)
+        vec_env = ColumnPopperVecEnv(venv, args.epsilon_fall, seed=args.seed)
+        counted_env = venv
+        env = VecMonitor(vec_env)
+        wrapped_eps_env = vec_env
     else:
-        env = base_env
+        base_env = gym.make(
+            "SpecKitAI/ColumnPopper-v1", seed=args.seed, use_wall_time=False, **env_kwargs
+        )
+        counted_env = base_env
+
+        # Optional exploration wrapper to ensure agent experiences manual fall
+        if args.epsilon_fall > 0:
+
+            class ManualFallEpsilonWrapper(gym.Wrapper):
+                def __init__(self, env: gym.Env, eps: float):
+                    super().__init__(env)
+                    self.eps = float(eps)
+                    self.np_random = np.random.default_rng(args.seed)
+
+                def step(self, action):  # type: ignore[override]
+                    if self.np_random.random() < self.eps:
+                        action = 3
+                    return self.env.step(action)
+
+            env = ManualFallEpsilonWrapper(base_env, args.epsilon_fall)
+        else:
+            env = base_env
+        wrapped_eps_env = env
 
     # Optional: decay epsilon linearly to 0 over training
     callback = None
@@ -79,7 +201,7 @@ def main() -> None:
             from stable_baselines3.common.callbacks import BaseCallback  # type: ignore
 
             class EpsilonDecayCallback(BaseCallback):
-                def __init__(self, wrapped_env: gym.Env, initial_eps: float, total_timesteps: int):
+                def __init__(self, wrapped_env, initial_eps: float, total_timesteps: int):
                     super().__init__()
                     self.wrapped_env = wrapped_env
                     self.initial_eps = float(initial_eps)
@@ -92,7 +214,7 @@ def main() -> None:
                         setattr(self.wrapped_env, "eps", float(new_eps))
                     return True
 
-            callback = EpsilonDecayCallback(env, args.epsilon_fall, args.timesteps)
+            callback = EpsilonDecayCallback(wrapped_eps_env, args.epsilon_fall, args.timesteps)
         except Exception:
             callback = None
 
@@ -208,11 +330,16 @@ def main() -> None:
     except Exception:
         pass
     metrics_cb = MetricsCallback(eval_env, eval_freq=1000, n_eval_episodes=5)
-    # Combine callbacks: epsilon decay (if any) and metrics collection
-    if callback is not None:
-        cb = CallbackList([callback, metrics_cb])
-    else:
-        cb = CallbackList([metrics_cb])
+    # Combine callbacks: epsilon decay (if any), metrics collection and event export
+    callbacks = [metrics_cb] if callback is None else [callback, metrics_cb]
+    if args.metrics_file is not None:
+        from column_popper.envs.events import MetricsExporter
+
+        exporter = MetricsExporter(
+            counted_env, args.metrics_file, fmt=args.metrics_format, interval=args.metrics_interval
+        )
+        callbacks.append(EventExportCallback(exporter))
+    cb = CallbackList(callbacks)
     model.learn(total_timesteps=args.timesteps, callback=cb)
     model.save(str(args.model_out))
     env.close()
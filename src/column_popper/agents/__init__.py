@@ -0,0 +1,19 @@
+from .search import (
+    ExpectimaxPlanner,
+    GameModel,
+    MCTSPlanner,
+    SearchConfig,
+    SearchResult,
+    SearchState,
+    TranspositionTable,
+)
+
+__all__ = [
+    "ExpectimaxPlanner",
+    "GameModel",
+    "MCTSPlanner",
+    "SearchConfig",
+    "SearchResult",
+    "SearchState",
+    "TranspositionTable",
+]
@@ -0,0 +1,605 @@
+"""Search-based planners: MCTS and expectimax with chance nodes.
+
+Planning runs on `SearchState`, a packed copy of the game (2-bit column codes, held cell
+and schedule accumulators) advanced by `GameModel`, a forward model of
+`ColumnPopperEnv.step` that splits each step into a deterministic part (the action, the
+schedule and any overflow) and chance nodes, one per fall tick. A tick's outcome is the
+spawn value of every column, each uniform over the number pool minus the value that would
+complete a triple (the rule of `Board.spawn_value_for_column`), so a tick has at most
+`len(pool) ** width` outcomes. MCTS samples chance outcomes from that distribution;
+expectimax enumerates them exactly.
+
+The model starts from the env's `get_state()` snapshot and applies the rules through the
+same core helpers as the envs: `core.bitboard` pops and spawn constraints, `core.spawn`
+choices and the compiled `core.schedule` timer. Restoring a full env snapshot per node
+would cost far more than the node itself, and chance nodes need to pick spawn outcomes
+that the env's RNG cannot be steered to. `tests/unit/test_search.py` checks the model
+against `env.step` over many seeds.
+
+Both planners cache nodes in a `TranspositionTable` keyed by one integer packing the board,
+the held cell and the step index. The table has a fixed capacity with LRU or
+depth-preferred replacement and persists across `act()` calls, so the subtree under the
+next root is reused. Each decision stops at the configured node budget or time limit,
+whichever comes first.
+
+Example:
+
+    env = ColumnPopperEnv(seed=0)
+    obs, info = env.reset()
+    planner = MCTSPlanner.for_env(env, SearchConfig(max_nodes=2000))
+    obs, reward, terminated, truncated, info = env.step(planner.act(env))
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any, NamedTuple, TypeVar
+
+from ..core.bitboard import (
+    CELL_BITS,
+    CELL_MASK,
+    MAX_CELL_VALUE,
+    board_key,
+    bottom_occupied_row,
+    fill_count,
+    full_mask,
+    pack_board,
+    pop_triples,
+    spawn_avoid,
+    top_empty_row,
+)
+from ..core.schedule import DEFAULT_CURVE, SIM_DT, compile_schedule
+from ..core.spawn import spawn_choices
+from ..rewards.presets import RewardPreset
+
+NUM_ACTIONS = 4
+TT_POLICIES = ("lru", "depth")
+# Simulated seconds per env step (ColumnPopperEnv without wall time)
+STEP_DT = SIM_DT
+
+
+class SearchState(NamedTuple):
+    codes: tuple[int, ...]  # one packed code per column (see core.bitboard)
+    sel_value: int  # held value, 0 when nothing is held
+    sel_row: int
+    sel_col: int
+    elapsed: float
+    fall_interval: float
+    accum: float
+
+
+@dataclass
+class GameModel:
+    """Forward model of `ColumnPopperEnv` on `SearchState` (simulated time only)."""
+
+    height: int = 12
+    width: int = 3
+    number_pool: tuple[int, ...] = (1, 2, 3)
+    rewards: RewardPreset = field(default_factory=RewardPreset)
+    strict_invalid: bool = False
+    game_duration: float = 60.0
+    schedule_curve: tuple[tuple[float, float], ...] = DEFAULT_CURVE
+
+    def __post_init__(self) -> None:
+        if max(self.number_pool) > MAX_CELL_VALUE or min(self.number_pool) < 1:
+            raise ValueError("Search requires number_pool values in 1..3")
+        self.schedule_curve = tuple(sorted(self.schedule_curve))
+        # Initial interval unused: `advance` is always given the state's interval
+        self._schedule = compile_schedule(self.game_duration, 0.0, self.schedule_curve)
+        self._choices = spawn_choices(self.number_pool)
+        self._full = full_mask(self.height)
+        self._bottom_shift = CELL_BITS * (self.height - 1)
+        self._key_bits = CELL_BITS * self.height * self.width
+
+    @classmethod
+    def from_env(cls, env: Any) -> GameModel:
+        base = env.unwrapped
+        if base.use_wall_time:
+            raise ValueError("Search requires simulated time (use_wall_time=False)")
+        return cls(
+            height=base.board.height,
+            width=base.board.width,
+            number_pool=tuple(int(v) for v in base.board.number_pool),
+            rewards=base.rewards,
+            strict_invalid=base.strict_invalid,
+            game_duration=base.game_duration,
+            schedule_curve=tuple(base.schedule.curve),
+        )
+
+    def root(self, env: Any) -> SearchState:
+        """Current state of `env` as a `SearchState`."""
+        base = env.unwrapped
+        snap = base.get_state()
+        elapsed, _, interval, accum = snap.schedule
+        return SearchState(
+            codes=tuple(int(c) for c in pack_board(base.board.grid)),
+            sel_value=snap.selection[1] if snap.selection[0] else 0,
+            sel_row=snap.sel_pos[0],
+            sel_col=snap.sel_pos[1],
+            elapsed=elapsed,
+            fall_interval=interval,
+            accum=accum,
+        )
+
+    def key(self, state: SearchState) -> int:
+        """Compact transposition key: board, held cell and step index in one integer.
+
+        The schedule accumulators are a function of the step index, so they are implied.
+        """
+        bits = self._key_bits
+        key = board_key(state.codes, self.height)
+        key |= state.sel_value << bits
+        key |= (state.sel_row + 1) << (bits + 2)
+        key |= (state.sel_col + 1) << (bits + 7)
+        return key | (round(state.elapsed / STEP_DT) << (bits + 10))
+
+    def step_index(self, state: SearchState) -> int:
+        return round(state.elapsed / STEP_DT)
+
+    def apply_action(  # noqa: C901
+        self, state: SearchState, action: int
+    ) -> tuple[SearchState, float, int, bool]:
+        """Deterministic part of `env.step(action)`.
+
+        Returns (after_state, reward, pending_fall_ticks, terminal). The after-state has
+        the schedule advanced but no falls applied; apply `pending_fall_ticks` chance ticks
+        to reach the next decision state. Overflow only depends on cells already on the
+        board, so terminal steps are fully resolved here and need no ticks.
+        """
+        h, rw = self.height, self.rewards
+        codes = list(state.codes)
+        sel_v, sel_r, sel_c = state.sel_value, state.sel_row, state.sel_col
+        reward = rw.step_cost
+        terminal = False
+
+        if action < 3:
+            col = action
+            if sel_v == 0:
+                row = bottom_occupied_row(codes[col], h)
+                if row >= 0:
+                    sel_v = (codes[col] >> (CELL_BITS * row)) & CELL_MASK
+                    sel_r, sel_c = row, col
+                    reward += rw.valid_action
+            else:
+                if col == sel_c and 0 <= sel_r < h:
+                    codes[col] &= ~(CELL_MASK << (CELL_BITS * sel_r))
+                top = top_empty_row(codes[col], h)
+                if top >= 0:
+                    codes[col] |= sel_v << (CELL_BITS * top)
+                    if col != sel_c and 0 <= sel_r < h and 0 <= sel_c < self.width:
+                        codes[sel_c] &= ~(CELL_MASK << (CELL_BITS * sel_r))
+                    sel_v, sel_r, sel_c = 0, -1, -1
+                    reward += rw.valid_action
+                    codes[col], popped = pop_triples(codes[col], h)
+                    if popped:
+                        reward += rw.pop_cell * popped
+                else:
+                    reward += rw.invalid_full_drop
+                    terminal = self.strict_invalid
+        else:
+            # Same accumulation order as the env so rewards match bit for bit
+            reward += rw.valid_action
+            reward += rw.manual_fall_bonus
+
+        elapsed, time_left, interval, accum, falls = self._advance_schedule(state)
+        ticks = 1 if action == 3 else falls
+
+        # Tick k overflows if original row height-1-k is occupied in any column
+        for k in range(min(ticks, self.height)):
+            shift = self._bottom_shift - CELL_BITS * k
+            if any((code >> shift) & CELL_MASK for code in codes):
+                reward += rw.overflow
+                terminal = True
+                break
+        if not terminal and time_left <= 0.0:
+            reward += rw.time_up
+            terminal = True
+
+        after = SearchState(tuple(codes), sel_v, sel_r, sel_c, elapsed, interval, accum)
+        return after, reward, 0 if terminal else ticks, terminal
+
+    def _advance_schedule(self, state: SearchState) -> tuple[float, float, float, float, int]:
+        """One step of the env's timer: (elapsed, time_left, fall_interval, accum, falls)."""
+        return self._schedule.advance(state.elapsed, state.fall_interval, state.accum, STEP_DT)
+
+    def tick(self, state: SearchState, spawns: Sequence[int]) -> SearchState:
+        """Apply one fall tick with the given per-column spawn values."""
+        full = self._full
+        codes = tuple(
+            ((code << CELL_BITS) & full) | v for code, v in zip(state.codes, spawns, strict=True)
+        )
+        sel_r = state.sel_row
+        if state.sel_col >= 0 and sel_r >= 0:
+            sel_r = min(sel_r + 1, self.height - 1)
+        return state._replace(codes=codes, sel_row=sel_r)
+
+    def spawn_options(self, state: SearchState) -> list[tuple[int, ...]]:
+        """Allowed spawn values per column for the next tick (the chance distribution)."""
+        full = self._full
+        choices = self._choices
+        options = []
+        for code in state.codes:
+            shifted = (code << CELL_BITS) & full
+            avoid = spawn_avoid(shifted) if self.height >= 3 else 0
+            options.append(choices.get(avoid, choices[0]))
+        return options
+
+    def tick_outcomes(self, state: SearchState) -> Iterator[tuple[float, SearchState]]:
+        """Enumerate (probability, next_state) over every outcome of one tick."""
+        options = self.spawn_options(state)
+        prob = 1.0
+        for opts in options:
+            prob /= len(opts)
+        for spawns in _product(options):
+            yield prob, self.tick(state, spawns)
+
+    def sample_tick(self, state: SearchState, rng: random.Random) -> SearchState:
+        spawns = [opts[int(rng.random() * len(opts))] for opts in self.spawn_options(state)]
+        return self.tick(state, spawns)
+
+    def evaluate(self, state: SearchState) -> float:
+        """Heuristic value of a non-terminal leaf: a penalty growing as columns fill up."""
+        fill = max(fill_count(code, self.height) for code in state.codes) / self.height
+        return self.rewards.overflow * fill**4
+
+
+def _product(options: Sequence[Sequence[int]]) -> Iterator[tuple[int, ...]]:
+    if not options:
+        yield ()
+        return
+    for head in options[0]:
+        for tail in _product(options[1:]):
+            yield (head, *tail)
+
+
+@dataclass(frozen=True)
+class SearchConfig:
+    # Per-decision budgets; search stops at whichever is reached first (None = unlimited)
+    max_nodes: int | None = 2000
+    time_limit: float | None = None
+    # UCT exploration constant (MCTS); rewards are in RewardPreset units
+    exploration: float = 3.0
+    discount: float = 0.99
+    # Maximum decision plies below the root (MCTS simulations, expectimax deepening)
+    max_depth: int = 30
+    tt_capacity: int = 200_000
+    tt_policy: str = "lru"
+    seed: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.max_nodes is None and self.time_limit is None:
+            raise ValueError("SearchConfig needs max_nodes or time_limit")
+        if self.tt_policy not in TT_POLICIES:
+            raise ValueError(f"Unknown tt_policy: {self.tt_policy!r}")
+
+
+class TranspositionTable:
+    """Bounded map from state keys to search nodes.
+
+    `lru` keeps up to `capacity` entries and evicts the least recently used one. `depth`
+    hashes each key into one of `capacity` fixed slots; on a collision the entry closer to
+    the present (smaller step index, `entry.depth`) is kept, and entries older than
+    `horizon` (set to the root's step index by the planners) are always replaced.
+    """
+
+    def __init__(self, capacity: int, policy: str = "lru") -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if policy not in TT_POLICIES:
+            raise ValueError(f"Unknown tt_policy: {policy!r}")
+        self.capacity = capacity
+        self.policy = policy
+        self.horizon = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lru: OrderedDict[int, Any] = OrderedDict()
+        self._slots: list[tuple[int, Any] | None] = [None] * capacity if policy == "depth" else []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._lru) if self.policy == "lru" else self._size
+
+    def get(self, key: int) -> Any:
+        if self.policy == "lru":
+            node = self._lru.get(key)
+            if node is not None:
+                self._lru.move_to_end(key)
+        else:
+            slot = self._slots[hash(key) % self.capacity]
+            node = slot[1] if slot is not None and slot[0] == key else None
+        if node is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return node
+
+    def put(self, key: int, node: Any) -> None:
+        if self.policy == "lru":
+            self._lru[key] = node
+            self._lru.move_to_end(key)
+            if len(self._lru) > self.capacity:
+                self._lru.popitem(last=False)
+                self.evictions += 1
+            return
+        i = hash(key) % self.capacity
+        slot = self._slots[i]
+        if slot is None:
+            self._size += 1
+        elif slot[0] != key:
+            resident = slot[1].depth
+            if resident >= self.horizon and resident < node.depth:
+                return
+            self.evictions += 1
+        self._slots[i] = (key, node)
+
+    def clear(self) -> None:
+        self._lru.clear()
+        self._slots = [None] * self.capacity if self.policy == "depth" else []
+        self._size = 0
+
+
+class _Node:
+    """MCTS decision node: per-action visit counts and return sums."""
+
+    __slots__ = ("depth", "visits", "n", "w")
+
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+        self.visits = 0
+        self.n = [0] * NUM_ACTIONS
+        self.w = [0.0] * NUM_ACTIONS
+
+
+class _Entry:
+    """Expectimax table entry: value searched `remaining` plies deep and its best action."""
+
+    __slots__ = ("depth", "remaining", "value", "action")
+
+    def __init__(self, depth: int, remaining: int, value: float, action: int) -> None:
+        self.depth = depth
+        self.remaining = remaining
+        self.value = value
+        self.action = action
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    action: int
+    # Per-action value estimates (MCTS: mean return; expectimax: backed-up value)
+    values: tuple[float, ...]
+    # Normalized root visit counts (MCTS) or a one-hot of the chosen action (expectimax),
+    # usable as a distillation target
+    policy: tuple[float, ...]
+    # MCTS: simulations (each expands at most one node); expectimax: decision nodes searched
+    nodes: int
+    elapsed: float
+    depth: int
+
+    @property
+    def nodes_per_sec(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class _Budget(Exception):
+    pass
+
+
+_P = TypeVar("_P", bound="_Planner")
+
+
+class _Planner(ABC):
+    def __init__(self, model: GameModel, config: SearchConfig | None = None) -> None:
+        self.model = model
+        self.config = config or SearchConfig()
+        self.table = TranspositionTable(self.config.tt_capacity, self.config.tt_policy)
+        self.rng = random.Random(self.config.seed)
+        self.last_result: SearchResult | None = None
+
+    @classmethod
+    def for_env(cls: type[_P], env: Any, config: SearchConfig | None = None) -> _P:
+        return cls(GameModel.from_env(env), config)
+
+    def act(self, env: Any) -> int:
+        """Search from the current state of `env` and return the chosen action."""
+        self.last_result = self.search(self.model.root(env))
+        return self.last_result.action
+
+    @abstractmethod
+    def search(self, root: SearchState) -> SearchResult:
+        """Search from `root` within the configured budget."""
+
+    def reset(self) -> None:
+        """Drop the cached tree (e.g. between unrelated games)."""
+        self.table.clear()
+
+    def _deadline(self, start: float) -> float:
+        limit = self.config.time_limit
+        return math.inf if limit is None else start + limit
+
+
+class MCTSPlanner(_Planner):
+    """UCT over decision nodes with sampled chance nodes and a shared transposition table.
+
+    A simulation descends by UCT (untried actions first), samples each fall tick's spawns
+    from the constrained distribution, expands one new node, scores it with
+    `GameModel.evaluate` and backs up discounted returns. The chosen action is the most
+    visited one at the root.
+    """
+
+    def search(self, root: SearchState) -> SearchResult:
+        cfg, model, table = self.config, self.model, self.table
+        start = time.perf_counter()
+        deadline = self._deadline(start)
+        max_nodes = cfg.max_nodes if cfg.max_nodes is not None else math.inf
+        table.horizon = model.step_index(root)
+        root_key = model.key(root)
+        root_node = table.get(root_key)
+        if root_node is None:
+            root_node = _Node(table.horizon)
+            table.put(root_key, root_node)
+
+        # One node per simulation: each expands at most one new node
+        nodes = 0
+        max_seen = 0
+        while nodes < max_nodes:
+            # Check the clock every few simulations; perf_counter is not free
+            if nodes & 15 == 0 and time.perf_counter() >= deadline:
+                break
+            max_seen = max(max_seen, self._simulate(root, root_node))
+            nodes += 1
+
+        total = sum(root_node.n) or 1
+        values = tuple(w / n if n else 0.0 for w, n in zip(root_node.w, root_node.n, strict=True))
+        action = max(range(NUM_ACTIONS), key=lambda a: (root_node.n[a], values[a]))
+        return SearchResult(
+            action=action,
+            values=values,
+            policy=tuple(n / total for n in root_node.n),
+            nodes=nodes,
+            elapsed=time.perf_counter() - start,
+            depth=max_seen,
+        )
+
+    def _simulate(self, root: SearchState, root_node: _Node) -> int:
+        """Run one simulation and return the decision depth it reached."""
+        cfg, model, table, rng = self.config, self.model, self.table, self.rng
+        path: list[tuple[_Node, int, float]] = []
+        state, node = root, root_node
+        value = 0.0
+        depth = 0
+        while True:
+            action = self._select(node)
+            after, reward, ticks, terminal = model.apply_action(state, action)
+            path.append((node, action, reward))
+            if terminal:
+                value = 0.0
+                break
+            for _ in range(ticks):
+                after = model.sample_tick(after, rng)
+            state = after
+            depth += 1
+            key = model.key(state)
+            child = table.get(key)
+            if child is None:
+                table.put(key, _Node(model.step_index(state)))
+                value = model.evaluate(state)
+                break
+            node = child
+            if depth >= cfg.max_depth:
+                value = model.evaluate(state)
+                break
+
+        ret = value
+        for node, action, reward in reversed(path):
+            ret = reward + cfg.discount * ret
+            node.n[action] += 1
+            node.w[action] += ret
+            node.visits += 1
+        return depth
+
+    def _select(self, node: _Node) -> int:
+        n = node.n
+        for a in range(NUM_ACTIONS):
+            if n[a] == 0:
+                return a
+        log_total = math.log(node.visits)
+        c = self.config.exploration
+        w = node.w
+        best, best_score = 0, -math.inf
+        for a in range(NUM_ACTIONS):
+            score = w[a] / n[a] + c * math.sqrt(log_total / n[a])
+            if score > best_score:
+                best, best_score = a, score
+        return best
+
+
+class ExpectimaxPlanner(_Planner):
+    """Iterative-deepening expectimax with exact chance enumeration.
+
+    Each iteration searches one decision ply deeper; chance ticks are expanded over every
+    spawn outcome weighted by its probability. Values are cached in the transposition
+    table with the depth they were searched to, and the best action of the last completed
+    iteration is returned when the budget runs out.
+    """
+
+    def search(self, root: SearchState) -> SearchResult:
+        cfg, model = self.config, self.model
+        start = time.perf_counter()
+        self._deadline_at = self._deadline(start)
+        self._max_nodes = cfg.max_nodes if cfg.max_nodes is not None else math.inf
+        self._nodes = 0
+        self.table.horizon = model.step_index(root)
+
+        values: tuple[float, ...] = (0.0,) * NUM_ACTIONS
+        action, depth = 3, 0
+        for d in range(1, cfg.max_depth + 1):
+            try:
+                q = tuple(self._q(root, a, d) for a in range(NUM_ACTIONS))
+            except _Budget:
+                break
+            values, depth = q, d
+            action = max(range(NUM_ACTIONS), key=lambda a: q[a])
+        policy = tuple(1.0 if a == action else 0.0 for a in range(NUM_ACTIONS))
+        return SearchResult(
+            action=action,
+            values=values,
+            policy=policy,
+            nodes=self._nodes,
+            elapsed=time.perf_counter() - start,
+            depth=depth,
+        )
+
+    def _count(self) -> None:
+        self._nodes += 1
+        if self._nodes >= self._max_nodes:
+            raise _Budget
+        if self._nodes & 63 == 0 and time.perf_counter() >= self._deadline_at:
+            raise _Budget
+
+    def _value(self, state: SearchState, remaining: int) -> float:
+        if remaining == 0:
+            return self.model.evaluate(state)
+        key = self.model.key(state)
+        entry = self.table.get(key)
+        if entry is not None and entry.remaining >= remaining:
+            return float(entry.value)
+        self._count()
+        best, best_action = -math.inf, 0
+        for a in range(NUM_ACTIONS):
+            q = self._q(state, a, remaining)
+            if q > best:
+                best, best_action = q, a
+        self.table.put(key, _Entry(self.model.step_index(state), remaining, best, best_action))
+        return best
+
+    def _q(self, state: SearchState, action: int, remaining: int) -> float:
+        after, reward, ticks, terminal = self.model.apply_action(state, action)
+        if terminal:
+            return reward
+        return reward + self.config.discount * self._expect(after, ticks, remaining - 1)
+
+    def _expect(self, state: SearchState, ticks: int, remaining: int) -> float:
+        if ticks == 0:
+            return self._value(state, remaining)
+        total = 0.0
+        for prob, nxt in self.model.tick_outcomes(state):
+            total += prob * self._expect(nxt, ticks - 1, remaining)
+        return total
+
+
+__all__ = [
+    "ExpectimaxPlanner",
+    "GameModel",
+    "MCTSPlanner",
+    "SearchConfig",
+    "SearchResult",
+    "SearchState",
+    "TranspositionTable",
+]
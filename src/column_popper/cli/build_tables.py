@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from ..core.tables import build_pop_table, pop_table_path, write_pop_table
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the cached column pop lookup table")
+    parser.add_argument("--height", type=int, default=12)
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Output directory (default: $COLUMN_POPPER_CACHE or ~/.cache/column_popper)",
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild even if cached")
+    args = parser.parse_args(argv)
+
+    path = pop_table_path(args.height, args.cache_dir)
+    if path.exists() and not args.force:
+        print(f"Pop table already cached at {path}")
+        return 0
+    start = time.perf_counter()
+    table = build_pop_table(args.height)
+    write_pop_table(path, table)
+    elapsed = time.perf_counter() - start
+    size_mib = table.nbytes / 2**20
+    print(f"Wrote {table.size} entries ({size_mib:.1f} MiB) to {path} in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
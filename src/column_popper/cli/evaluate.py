@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from column_popper.eval import EpisodeResult, cache_path, evaluate, summarize
+
+
+def _parse_curve(s: str) -> list[list[float]]:
+    out: list[list[float]] = []
+    for seg in s.split(","):
+        seg = seg.strip()
+        if not seg:
+            continue
+        t_str, i_str = seg.split(":", 1)
+        out.append([float(t_str), float(i_str)])
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate a policy over a sweep of seeds")
+    parser.add_argument(
+        "--policy",
+        default="random",
+        help="'random', an importable 'package.module:callable', or a saved model (.zip)",
+    )
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--episodes", type=int, default=1000, help="One episode per seed")
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Worker processes (0 = evaluate in-process)"
+    )
+    parser.add_argument("--batch", type=int, default=64, help="Boards stepped together per worker")
+    parser.add_argument(
+        "--shard-size", type=int, default=None, help="Seeds per worker task (default: auto)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Keep per-episode results here and only play seeds not evaluated yet",
+    )
+    parser.add_argument(
+        "--policy-version",
+        default=None,
+        help="Cache key for the policy instead of a hash of its code and state",
+    )
+    parser.add_argument("--results", type=Path, default=None, help="Write per-episode JSONL here")
+    parser.add_argument("--include-time", action="store_true", help="Include time_left_norm in obs")
+    parser.add_argument("--game-duration", type=float, default=60.0)
+    parser.add_argument("--initial-fall", type=float, default=3.0)
+    parser.add_argument("--fall-curve", type=str, default="20:2,40:1")
+    parser.add_argument("--context", default=None, help="multiprocessing start method")
+    args = parser.parse_args(argv)
+
+    env_kwargs: dict[str, Any] = {
+        "game_duration": args.game_duration,
+        "include_time_left_norm": bool(args.include_time),
+        "initial_fall_interval": args.initial_fall,
+        "schedule_curve": _parse_curve(args.fall_curve),
+    }
+    seeds = range(args.seed_start, args.seed_start + args.episodes)
+    results = evaluate(
+        args.policy,
+        seeds,
+        env_kwargs=env_kwargs,
+        workers=args.workers,
+        batch=args.batch,
+        shard_size=args.shard_size,
+        cache_dir=args.cache_dir,
+        policy_version=args.policy_version,
+        context=args.context,
+    )
+    if args.results is not None:
+        _write_results(args.results, results)
+    summary = summarize(results)
+    summary["policy"] = args.policy
+    summary["seeds"] = [args.seed_start, args.seed_start + args.episodes]
+    if args.cache_dir is not None:
+        summary["cache"] = str(
+            cache_path(args.cache_dir, args.policy, env_kwargs, args.policy_version)
+        )
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+def _write_results(path: Path, results: list[EpisodeResult]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps(asdict(r)) + "\n")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
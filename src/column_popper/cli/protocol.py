@@ -3,11 +3,24 @@ from __future__ import annotations
 import argparse
 import json
 import sys
-from typing import Any, TextIO
+from collections import deque
+from typing import Any
 
 import gymnasium as gym
+import numpy as np
 
 import column_popper.envs  # noqa: F401
+from column_popper.envs.info import INFO_LEVELS, LEVEL_FIELDS
+from column_popper.envs.vector_env import VectorColumnPopperEnv
+from column_popper.utils.delta import DeltaEncoder
+from column_popper.utils.jsonl import BulkReader, FrameWriter, dumps, encode_obs
+
+ENV_ID = "SpecKitAI/ColumnPopper-v1"
+# Line a pipelining client sends to acknowledge `done` (see `StreamSession`)
+ACK_LINE = "done"
+# Queue entries besides actions: an acknowledgement, and the end of input
+_ACK = -1
+_EOF = -2
 
 
 def _jsonable(x: dict[str, Any]) -> dict[str, Any]:
@@ -20,8 +33,8 @@ def _jsonable(x: dict[str, Any]) -> dict[str, Any]:
     return out
 
 
-def _read_action(stdin: TextIO) -> int:
-    line = stdin.readline()
+def parse_action(line: str) -> int:
+    """Action from one client line; anything but an integer in [0, 3] means 0."""
     s = (line or "").strip()
     try:
         a = int(s)
@@ -32,82 +45,467 @@ def _read_action(stdin: TextIO) -> int:
     return a
 
 
+def parse_actions(line: str, num_envs: int) -> np.ndarray:
+    """`num_envs` actions from one client line: integers separated by spaces or commas,
+    optionally in JSON list brackets. Missing or invalid entries mean 0; extras are ignored.
+    """
+    tokens = (line or "").replace(",", " ").strip().strip("[]").split()
+    actions = np.zeros((num_envs,), dtype=np.int64)
+    for i, token in enumerate(tokens[:num_envs]):
+        actions[i] = parse_action(token)
+    return actions
+
+
+def make_env(seed: int, include_time: bool, info_level: str) -> gym.Env[dict[str, Any], int]:
+    return gym.make(
+        ENV_ID,
+        disable_env_checker=True,
+        seed=seed,
+        include_time_left_norm=include_time,
+        info_level=info_level,
+    )
+
+
+def make_vector_env(num_envs: int, include_time: bool) -> VectorColumnPopperEnv:
+    return VectorColumnPopperEnv(num_envs, include_time_left_norm=include_time)
+
+
+class StreamSession:
+    """One protocol session, independent of the transport.
+
+    `start()` returns the opening lines (`meta`, the first `reset` and `step_request`);
+    each `step(action)` returns the lines that follow the action (`step_result`, then either
+    the next `step_request` or `done` and the next episode's `reset` / `step_request`).
+    Lines end with a newline. `finished` turns true after the last episode's `done`.
+
+    With `fast`, lines are built with the `utils.jsonl` encoders, and each observation is
+    encoded once: a `step_result`'s obs and info are repeated verbatim by the next
+    `step_request`. The bytes are the same either way.
+
+    With `delta`, `meta` says so, `reset` and `step_result` carry either a keyframe `obs` or
+    an `obs_delta` (see `utils.delta`), and `step_request` carries no obs or info: the client
+    already has them from the message before it.
+
+    With `max_queue > 0` the client may send actions ahead of time: the transport
+    `submit()`s each line to a queue of at most `max_queue` entries and calls
+    `step_queued()` while it is non-empty. `meta` announces `max_queue`. When an episode
+    ends, every action line up to the client's acknowledgement (a `done` line, or the end
+    of input) is discarded, since it was meant for the finished episode. The next episode's
+    `reset` follows the acknowledgement and reports how many lines were dropped under
+    `discarded`. What is discarded thus depends only on the lines sent, not on how they
+    arrive. An acknowledgement sent while an episode is still running is ignored.
+    """
+
+    def __init__(
+        self,
+        env: gym.Env[dict[str, Any], int],
+        *,
+        episodes: int,
+        seed: int,
+        fast: bool = False,
+        delta: bool = False,
+        keyframe_interval: int = 100,
+        max_queue: int = 0,
+    ) -> None:
+        self.env = env
+        self.episodes = int(episodes)
+        self.seed = int(seed)
+        self.fast = fast
+        self.episode = 0
+        self.step_index = 0
+        self.finished = self.episodes <= 0
+        self._delta = DeltaEncoder(keyframe_interval) if delta else None
+        self.max_queue = int(max_queue)
+        self.queue: deque[int] = deque()
+        self.awaiting_ack = False
+        self._discarded = 0
+        self._obs_key = "obs"
+        self._obs_out: Any = None
+        self._info_out: Any = None
+
+    def _line(self, msg: dict[str, Any], **tail: Any) -> str:
+        # In fast mode `tail` values are already-encoded JSON (see `_payload`)
+        if self.fast:
+            return dumps(msg, **tail) + "\n"
+        return json.dumps({**msg, **tail}) + "\n"
+
+    def _payload(self, obs: dict[str, Any], info: dict[str, Any]) -> None:
+        key, value = ("obs", obs) if self._delta is None else self._delta.encode(obs)
+        self._obs_key = key
+        if self.fast:
+            self._info_out = json.dumps(info)
+            self._obs_out = encode_obs(value) if key == "obs" else json.dumps(value)
+        else:
+            self._info_out = info
+            self._obs_out = _jsonable(value) if key == "obs" else value
+
+    def _request(self) -> str:
+        msg = {"type": "step_request", "episode": self.episode, "step": self.step_index}
+        if self._delta is not None:
+            return self._line(msg)
+        return self._line(msg, obs=self._obs_out, info=self._info_out)
+
+    def _reset(self) -> list[str]:
+        obs, info = self.env.reset(seed=self.seed + self.episode)
+        self.step_index = 0
+        if self._delta is not None:
+            self._delta.reset()
+        self._payload(obs, info)
+        msg: dict[str, Any] = {"type": "reset", "episode": self.episode}
+        if self.max_queue and self.episode:
+            msg["discarded"] = self._discarded
+            self._discarded = 0
+        reset = self._line(
+            msg,
+            **{self._obs_key: self._obs_out},
+            info=self._info_out,
+        )
+        return [reset, self._request()]
+
+    def start(self) -> list[str]:
+        meta: dict[str, Any] = {"type": "meta", "env_id": ENV_ID, "action_space_n": 4}
+        if self._delta is not None:
+            meta.update(delta=True, keyframe_interval=self._delta.keyframe_interval)
+        if self.max_queue:
+            meta["max_queue"] = self.max_queue
+        lines = [self._line(meta)]
+        if not self.finished:
+            lines += self._reset()
+        return lines
+
+    def feed(self, line: str) -> list[str]:
+        """`step()` with the action parsed from one client line."""
+        return self.step(parse_action(line))
+
+    @property
+    def queue_full(self) -> bool:
+        return len(self.queue) >= self.max_queue
+
+    def submit(self, line: str) -> None:
+        """Queue one client line: an action, an acknowledgement, or `""` for end of input."""
+        if self.queue_full:
+            raise RuntimeError(f"Action queue is full ({self.max_queue})")
+        if not line:
+            self.queue.append(_EOF)
+        elif line.strip() == ACK_LINE:
+            self.queue.append(_ACK)
+        else:
+            self.queue.append(parse_action(line))
+
+    def step_queued(self) -> list[str]:
+        """Consume the oldest queue entry: `step()` with an action, or, after an episode
+        ended, drop it or start the next episode on an acknowledgement."""
+        entry = self.queue.popleft()
+        if self.awaiting_ack:
+            if entry in (_ACK, _EOF):
+                self.awaiting_ack = False
+                return self._reset()
+            self._discarded += 1
+            return []
+        if entry == _ACK:
+            return []
+        # At the end of input the episode plays on with action 0, as without pipelining
+        return self.step(max(entry, 0))
+
+    def step(self, action: int) -> list[str]:
+        if self.finished:
+            raise RuntimeError("Session is finished")
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self._payload(obs, info)
+        result = self._line(
+            {
+                "type": "step_result",
+                "episode": self.episode,
+                "step": self.step_index,
+                "action": action,
+                "reward": reward,
+                "terminated": terminated,
+                "truncated": truncated,
+            },
+            info=self._info_out,
+            **{self._obs_key: self._obs_out},
+        )
+        self.step_index += 1
+        if not (terminated or truncated):
+            return [result, self._request()]
+        lines = [result, self._line({"type": "done", "episode": self.episode})]
+        self.episode += 1
+        if self.episode >= self.episodes:
+            self.finished = True
+        elif self.max_queue:
+            self.awaiting_ack = True
+        else:
+            lines += self._reset()
+        return lines
+
+
+class BatchStreamSession:
+    """A protocol session that plays `num_envs` boards in lockstep.
+
+    `meta` announces `num_envs`; every `step_request` carries the batched observation and
+    info of all envs (arrays with a leading env axis) and the client answers with
+    `num_envs` actions on one line (see `parse_actions`). `step_result` holds per-env
+    lists of actions, rewards and flags. Each env that finishes an episode gets a
+    `{"type": "done", "env": i, "episode": e}` line after the `step_result` and is reset
+    in the same step: the next `step_request` lists it under `reset` (with its new `seed`)
+    and already shows its new episode's first observation.
+
+    Env `i` plays episodes `0 .. episodes - 1` with seeds `seed + i * episodes + e`, so it
+    sees the boards of a single-env session started at `seed + i * episodes`. Once an env
+    has played all its episodes it is retired: its `episode` entry becomes `null`, its
+    observation and info stay at their final values, and its action is ignored (reward 0,
+    flags false). `finished` turns true when every env is retired.
+    """
+
+    def __init__(
+        self,
+        env: VectorColumnPopperEnv,
+        *,
+        episodes: int,
+        seed: int,
+        info_level: str = "full",
+    ) -> None:
+        self.env = env
+        self.num_envs = env.num_envs
+        self.episodes = int(episodes)
+        self.seed = int(seed)
+        self.fields = LEVEL_FIELDS[info_level]
+        self.episode = np.zeros((self.num_envs,), dtype=np.int64)
+        self.retired = np.zeros((self.num_envs,), dtype=bool)
+        self.step_index = 0
+        self.finished = self.episodes <= 0
+        self._final_obs: dict[str, np.ndarray] = {}
+        self._final_info: dict[str, np.ndarray] = {}
+
+    def _seeds(self) -> list[int]:
+        last = max(self.episodes - 1, 0)
+        return [
+            self.seed + i * self.episodes + min(int(e), last)
+            for i, e in enumerate(self.episode.tolist())
+        ]
+
+    def _episodes(self) -> list[int | None]:
+        return [
+            None if r else e
+            for e, r in zip(self.episode.tolist(), self.retired.tolist(), strict=True)
+        ]
+
+    def _info(self, info: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        return {k: info[k] for k in self.fields}
+
+    def _freeze(self, obs: dict[str, np.ndarray], info: dict[str, np.ndarray]) -> None:
+        # Retired envs keep stepping inside the vector env; report their final state instead
+        retired = self.retired
+        for k, v in self._final_obs.items():
+            obs[k][retired] = v[retired]
+        for k, v in self._final_info.items():
+            info[k][retired] = v[retired]
+
+    def start(self) -> list[str]:
+        meta = {"type": "meta", "env_id": ENV_ID, "action_space_n": 4, "num_envs": self.num_envs}
+        lines = [dumps(meta) + "\n"]
+        if self.finished:
+            return lines
+        seeds = self._seeds()
+        obs, info = self.env.reset(seed=seeds)
+        info = self._info(info)
+        encoded = encode_obs(obs)
+        reset_info = json.dumps({**_jsonable(info), "seed": seeds})
+        reset = {"type": "reset", "episode": self._episodes()}
+        lines.append(dumps(reset, obs=encoded, info=reset_info) + "\n")
+        lines.append(self._request(encoded, json.dumps(_jsonable(info)), [], []))
+        return lines
+
+    def _request(self, obs: str, info: str, reset: list[int], seeds: list[int]) -> str:
+        msg = {
+            "type": "step_request",
+            "episode": self._episodes(),
+            "step": self.step_index,
+            "reset": reset,
+            "seed": seeds,
+        }
+        return dumps(msg, obs=obs, info=info) + "\n"
+
+    def feed(self, line: str) -> list[str]:
+        """`step()` with the actions parsed from one client line."""
+        return self.step(parse_actions(line, self.num_envs))
+
+    def step(self, actions: np.ndarray) -> list[str]:
+        if self.finished:
+            raise RuntimeError("Session is finished")
+        obs, reward, terminated, truncated, info = self.env.step(actions)
+        info = self._info(info)
+        retired = self.retired
+        if retired.any():
+            self._freeze(obs, info)
+            actions = np.where(retired, 0, actions)
+            reward[retired] = 0.0
+            terminated[retired] = False
+            truncated[retired] = False
+        result = {
+            "type": "step_result",
+            "episode": self._episodes(),
+            "step": self.step_index,
+            "action": actions.tolist(),
+            "reward": reward.tolist(),
+            "terminated": terminated.tolist(),
+            "truncated": truncated.tolist(),
+        }
+        info_out = json.dumps(_jsonable(info))
+        obs_out = encode_obs(obs)
+        lines = [dumps(result, info=info_out, obs=obs_out) + "\n"]
+        self.step_index += 1
+
+        done = terminated | truncated
+        if not done.any():
+            lines.append(self._request(obs_out, info_out, [], []))
+            return lines
+        return lines + self._end_episodes(done, obs, info, obs_out, info_out)
+
+    def _end_episodes(
+        self,
+        done: np.ndarray,
+        obs: dict[str, np.ndarray],
+        info: dict[str, np.ndarray],
+        obs_out: str,
+        info_out: str,
+    ) -> list[str]:
+        """`done` lines for the envs in `done`, then the request after resetting them."""
+        idx = np.flatnonzero(done)
+        lines = [
+            dumps({"type": "done", "env": i, "episode": int(self.episode[i])}) + "\n"
+            for i in idx.tolist()
+        ]
+        self.episode[idx] += 1
+        retiring = done & (self.episode >= self.episodes)
+        if retiring.any():
+            for k, v in obs.items():
+                self._final_obs.setdefault(k, np.zeros_like(v))[retiring] = v[retiring]
+            for k, v in info.items():
+                self._final_info.setdefault(k, np.zeros_like(v))[retiring] = v[retiring]
+            self.retired |= retiring
+        if self.retired.all():
+            self.finished = True
+            return lines
+        restart = done & ~self.retired
+        if not restart.any():
+            lines.append(self._request(obs_out, info_out, [], []))
+            return lines
+        seeds = self._seeds()
+        reset_obs, reset_info = self.env.reset(seed=seeds, options={"reset_mask": restart})
+        for k, v in obs.items():
+            v[restart] = reset_obs[k][restart]
+        for k, v in info.items():
+            v[restart] = reset_info[k][restart]
+        ids = np.flatnonzero(restart).tolist()
+        request = self._request(
+            encode_obs(obs), json.dumps(_jsonable(info)), ids, [seeds[i] for i in ids]
+        )
+        lines.append(request)
+        return lines
+
+
+def _run_pipelined(session: StreamSession, stdin: BulkReader, out: FrameWriter) -> None:
+    """Step through actions as they arrive, blocking only when none is queued."""
+    while not session.finished:
+        if not session.queue:
+            session.submit(stdin.readline())
+        for line in stdin.buffered(session.max_queue - len(session.queue)):
+            session.submit(line)
+        for line in session.step_queued():
+            out.write(line)
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Interactive streaming protocol over JSONL")
     parser.add_argument("--episodes", type=int, default=1)
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--include-time", action="store_true")
+    parser.add_argument(
+        "--info-level",
+        choices=list(INFO_LEVELS),
+        default="full",
+        help="Per-step info fields to emit (reset info always carries seed/version)",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=1,
+        help="Play this many envs per message (K actions per line; see BatchStreamSession)",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Send keyframes and obs_delta changes instead of full observations",
+    )
+    parser.add_argument(
+        "--keyframe-interval",
+        type=int,
+        default=100,
+        help="Deltas between keyframes with --delta (0 = only at episode start)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        type=int,
+        default=0,
+        metavar="DEPTH",
+        help="Accept up to DEPTH actions sent ahead of time; after each done, action lines "
+        "up to the client's 'done' line are discarded (0 = one action per step_request)",
+    )
+    parser.add_argument(
+        "--throughput",
+        action="store_true",
+        help="Read stdin in bulk and buffer JSONL output (same bytes as the default mode)",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=0.05,
+        help="Max seconds between output flushes with --throughput (output is always "
+        "flushed before waiting for an action)",
+    )
     args = parser.parse_args(argv)
+    if args.batch < 1:
+        parser.error("--batch must be >= 1")
+    if args.batch > 1 and (args.delta or args.pipeline):
+        parser.error("--delta and --pipeline are only supported for single-env sessions")
+    if args.pipeline < 0:
+        parser.error("--pipeline must be >= 0")
 
-    env: gym.Env[dict[str, Any], int] = gym.make(
-        "SpecKitAI/ColumnPopper-v1",
-        disable_env_checker=True,
-        seed=args.seed,
-        include_time_left_norm=args.include_time,
-    )
+    fast = args.throughput
+    out = FrameWriter(sys.stdout, args.flush_interval if fast else 0.0)
+    # Pipelining takes the lines that have already arrived, which needs the bulk reader
+    bulk = fast or args.pipeline > 0
+    stdin: Any = BulkReader(sys.stdin, on_wait=out.flush) if bulk else sys.stdin
+    session: StreamSession | BatchStreamSession
+    if args.batch > 1:
+        env: Any = make_vector_env(args.batch, args.include_time)
+        session = BatchStreamSession(
+            env, episodes=args.episodes, seed=args.seed, info_level=args.info_level
+        )
+    else:
+        env = make_env(args.seed, args.include_time, args.info_level)
+        session = StreamSession(
+            env,
+            episodes=args.episodes,
+            seed=args.seed,
+            fast=fast,
+            delta=args.delta,
+            keyframe_interval=args.keyframe_interval,
+            max_queue=args.pipeline,
+        )
     try:
-        meta = {
-            "type": "meta",
-            "env_id": "SpecKitAI/ColumnPopper-v1",
-            "action_space_n": 4,
-        }
-        sys.stdout.write(json.dumps(meta) + "\n")
-        sys.stdout.flush()
-
-        for epi in range(args.episodes):
-            obs, info = env.reset(seed=args.seed + epi)
-            sys.stdout.write(
-                json.dumps({
-                    "type": "reset",
-                    "episode": epi,
-                    "obs": _jsonable(obs),
-                    "info": info,
-                }) + "\n"
-            )
-            sys.stdout.flush()
-
-            step = 0
-            while True:
-                # Request action
-                sys.stdout.write(
-                    json.dumps({
-                        "type": "step_request",
-                        "episode": epi,
-                        "step": step,
-                        "obs": _jsonable(obs),
-                        "info": info,
-                    }) + "\n"
-                )
-                sys.stdout.flush()
-
-                action = _read_action(sys.stdin)
-                obs, reward, terminated, truncated, info = env.step(action)
-                sys.stdout.write(
-                    json.dumps({
-                        "type": "step_result",
-                        "episode": epi,
-                        "step": step,
-                        "action": action,
-                        "reward": reward,
-                        "terminated": terminated,
-                        "truncated": truncated,
-                        "info": info,
-                        "obs": _jsonable(obs),
-                    }) + "\n"
-                )
-                sys.stdout.flush()
-                step += 1
-                if terminated or truncated:
-                    sys.stdout.write(
-                        json.dumps({"type": "done", "episode": epi}) + "\n"
-                    )
-                    sys.stdout.flush()
-                    break
+        for line in session.start():
+            out.write(line)
+        if isinstance(session, StreamSession) and session.max_queue:
+            _run_pipelined(session, stdin, out)
+        while not session.finished:
+            for line in session.feed(stdin.readline()):
+                out.write(line)
         return 0
     finally:
-        from typing import cast
-
-        cast(Any, env).close()
+        out.flush()
+        env.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ..utils.delta import expand
+from ..utils.replay import (
+    ReplayError,
+    ReplayHeader,
+    ReplayWriter,
+    read_replay,
+    record_episode,
+    replay_episode,
+)
+
+
+def _read_frames(path: Path) -> dict[int, list[dict[str, Any]]]:
+    """Frames per episode; `--delta` rollouts are expanded to full observations."""
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    episodes: dict[int, list[dict[str, Any]]] = {}
+    for frame in expand(lines):
+        episodes.setdefault(int(frame["episode"]), []).append(frame)
+    return episodes
+
+
+def _episode_seed(
+    header: ReplayHeader, frames: list[dict[str, Any]], epi: int, seed: int | None
+) -> int:
+    """Seed of episode `epi`: the one its first frame reports, checked against `--seed`.
+
+    Rollouts put seed/version/spawn_stream into each episode's first frame; older ones
+    did not, and then `--seed` is required.
+    """
+    info = frames[0].get("info") or {}
+    expected = None if seed is None else seed + epi
+    if "seed" not in info:
+        if expected is None:
+            raise ReplayError(f"Episode {epi} does not report its seed; pass --seed")
+        return expected
+    if expected is not None and info["seed"] != expected:
+        raise ReplayError(f"Episode {epi} was played with seed {info['seed']}, not {expected}")
+    stream = info.get("spawn_stream", header.spawn_stream)
+    if stream != header.spawn_stream:
+        raise ReplayError(f"Episode {epi} uses spawn stream {stream}, not {header.spawn_stream}")
+    if info["seed"] is None:
+        raise ReplayError(f"Episode {epi} was played unseeded and cannot be replayed")
+    return int(info["seed"])
+
+
+def _convert(args: argparse.Namespace) -> int:
+    from ..envs.column_popper_env import ColumnPopperEnv
+
+    # Same env as `cli.rollout`; episode e there is reset with seed + e
+    env = ColumnPopperEnv(seed=args.seed, include_time_left_norm=args.include_time)
+    header = ReplayHeader.for_env(env)
+    episodes = _read_frames(args.input)
+    steps = 0
+    with ReplayWriter(args.output, header) as writer:
+        for epi in sorted(episodes):
+            frames = sorted(episodes[epi], key=lambda fr: int(fr["step"]))
+            actions = [int(fr["action"]) for fr in frames]
+            seed = _episode_seed(header, frames, epi, args.seed)
+            episode = record_episode(env, seed, actions, digests=not args.no_digest)
+            if episode.steps != len(frames):
+                raise ReplayError(f"Episode {epi} ended before its last frame")
+            if args.check:
+                _check_frames(header, episode, frames, epi)
+            writer.write_episode(episode)
+            steps += episode.steps
+    size = args.output.stat().st_size
+    print(f"Wrote {len(episodes)} episodes ({steps} steps, {size} bytes) to {args.output}")
+    return 0
+
+
+def _check_frames(
+    header: ReplayHeader, episode: Any, frames: list[dict[str, Any]], epi: int
+) -> None:
+    """Compare a re-simulation step by step against the JSONL frames."""
+    env = header.make_env()
+    env.reset(seed=episode.seed)
+    for fr in frames:
+        obs, reward, terminated, truncated, _ = env.step(int(fr["action"]))
+        same = (
+            reward == fr["reward"]
+            and terminated == fr["terminated"]
+            and truncated == fr["truncated"]
+            and np.array_equal(obs["board"], np.asarray(fr["obs"]["board"]))
+        )
+        if not same:
+            raise ReplayError(f"Episode {epi} diverges from its frames at step {fr['step']}")
+
+
+def _run(args: argparse.Namespace) -> int:
+    header, episodes = read_replay(args.input)
+    env = header.make_env(info_level="none", reuse_obs=True)
+    steps = 0
+    start = time.perf_counter()
+    for i, episode in enumerate(episodes):
+        result = replay_episode(header, episode, verify=not args.no_verify, env=env)
+        steps += result.steps
+        if args.verbose:
+            print(
+                f"episode {i}: seed={episode.seed} steps={result.steps} "
+                f"score={result.score} reward={result.total_reward:.4f}"
+            )
+    elapsed = time.perf_counter() - start
+    rate = steps / elapsed if elapsed > 0 else 0.0
+    checked = "unverified" if args.no_verify else "verified"
+    print(f"Replayed {len(episodes)} episodes, {steps} steps ({checked}) at {rate:.0f} steps/s")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert and replay binary replay logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    conv = sub.add_parser("convert", help="Convert a JSONL rollout into a binary replay")
+    conv.add_argument("input", type=Path, help="JSONL frames from the rollout mode")
+    conv.add_argument("output", type=Path)
+    conv.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="--seed the rollout was run with (default: the seeds its frames report)",
+    )
+    conv.add_argument("--include-time", action="store_true", help="Rollout used --include-time")
+    conv.add_argument("--no-digest", action="store_true", help="Omit per-step state digests")
+    conv.add_argument(
+        "--check",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Compare rewards, flags and boards with the frames (default: on)",
+    )
+
+    run = sub.add_parser("run", help="Re-simulate a binary replay")
+    run.add_argument("input", type=Path)
+    run.add_argument("--no-verify", action="store_true", help="Skip digest checks")
+    run.add_argument("--verbose", action="store_true", help="Print one line per episode")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "convert":
+            return _convert(args)
+        return _run(args)
+    except ReplayError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,14 +3,22 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from pathlib import Path
 from typing import Any, TextIO
 
 import gymnasium as gym
 
 import column_popper.envs  # noqa: F401
+from column_popper.envs.info import INFO_LEVELS
+from column_popper.utils.delta import DeltaEncoder
+from column_popper.utils.jsonl import BulkReader, FrameWriter, dumps, encode_obs
+from column_popper.utils.shards import EpisodeBuffer, ShardWriter, existing_shards
 
+# Reset info fields that describe the whole episode
+_EPISODE_INFO = ("seed", "version", "spawn_stream")
 
-def _read_action(stdin: TextIO) -> int | None:
+
+def _read_action(stdin: TextIO | BulkReader) -> int | None:
     line = stdin.readline()
     if line == "":
         return None  # EOF
@@ -39,27 +47,89 @@ def _to_jsonable(obs: dict[str, Any]) -> dict[str, Any]:
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Headless rollout that streams JSONL frames")
     parser.add_argument("--episodes", type=int, default=1)
-    parser.add_argument("--format", choices=["jsonl"], default="jsonl")
+    parser.add_argument("--format", choices=["jsonl", "npz"], default="jsonl")
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--include-time", action="store_true", help="Include time_left_norm in obs")
+    parser.add_argument(
+        "--info-level",
+        choices=list(INFO_LEVELS),
+        default="full",
+        help=(
+            "Per-step info fields to emit (the first frame of each episode also carries "
+            "seed/version/spawn_stream)"
+        ),
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        default=None,
+        help="Shard directory for --format=npz (must not already contain shards)",
+    )
+    parser.add_argument(
+        "--shard-steps", type=int, default=100_000, help="Minimum steps per npz shard"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["deflate", "none"],
+        default="deflate",
+        help="npz shard compression ('none' lets readers memory-map shards)",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="JSONL frames carry keyframes and obs_delta changes instead of full observations",
+    )
+    parser.add_argument(
+        "--keyframe-interval",
+        type=int,
+        default=100,
+        help="Deltas between keyframes with --delta (0 = only at episode start)",
+    )
+    parser.add_argument(
+        "--throughput",
+        action="store_true",
+        help="Read stdin in bulk and buffer JSONL output (same bytes as the default mode)",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=0.05,
+        help="Max seconds between output flushes with --throughput",
+    )
     args = parser.parse_args(argv)
+    if args.format == "npz":
+        _check_npz_args(parser, args)
 
     env: gym.Env[dict[str, Any], int] = gym.make(
         "SpecKitAI/ColumnPopper-v1",
         disable_env_checker=True,
         seed=args.seed,
         include_time_left_norm=args.include_time,
+        info_level=args.info_level,
+        reuse_obs=args.format == "npz",
     )
+    fast = args.throughput
+    out = FrameWriter(sys.stdout, args.flush_interval if fast else 0.0)
+    stdin: Any = BulkReader(sys.stdin, on_wait=out.flush) if fast else sys.stdin
+    delta = DeltaEncoder(args.keyframe_interval) if args.delta else None
     try:
+        if args.format == "npz":
+            return _rollout_npz(env, args)
         for epi in range(args.episodes):
             obs, info = env.reset(seed=args.seed + epi)
+            # Per-episode constants from the reset info go into the episode's first frame
+            episode_info = {k: info[k] for k in _EPISODE_INFO}
+            if delta is not None:
+                delta.reset()
             step_idx = 0
             while True:
-                act = _read_action(sys.stdin)
+                act = _read_action(stdin)
                 if act is None:
                     act = env.action_space.sample()
 
                 obs, reward, terminated, truncated, info = env.step(act)
+                if step_idx == 0:
+                    info = {**info, **episode_info}
 
                 frame = {
                     "episode": epi,
@@ -69,10 +139,14 @@ def main(argv: list[str] | None = None) -> int:
                     "terminated": terminated,
                     "truncated": truncated,
                     "info": info,
-                    "obs": _to_jsonable(obs),
                 }
-                sys.stdout.write(json.dumps(frame) + "\n")
-                sys.stdout.flush()
+                key, value = ("obs", obs) if delta is None else delta.encode(obs)
+                if fast:
+                    encoded = encode_obs(value) if key == "obs" else json.dumps(value)
+                    out.write(dumps(frame, **{key: encoded}) + "\n")
+                else:
+                    frame[key] = _to_jsonable(value) if key == "obs" else value
+                    out.write(json.dumps(frame) + "\n")
                 step_idx += 1
                 if terminated or truncated:
                     break
@@ -80,8 +154,42 @@ def main(argv: list[str] | None = None) -> int:
     finally:
         from typing import cast
 
+        out.flush()
         cast(Any, env).close()
 
 
+def _check_npz_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if args.out_dir is None:
+        parser.error("--format=npz requires --out-dir")
+    if args.delta or args.throughput:
+        parser.error("--delta and --throughput only apply to --format=jsonl")
+    if existing_shards(args.out_dir):
+        parser.error(f"--out-dir {args.out_dir} already contains shards")
+
+
+def _rollout_npz(env: gym.Env[dict[str, Any], int], args: argparse.Namespace) -> int:
+    """Same episodes as the JSONL mode, written as columnar shards instead of frames."""
+    base: Any = env.unwrapped
+    buf = EpisodeBuffer(include_time=args.include_time)
+    stdin = BulkReader(sys.stdin)
+    with ShardWriter(
+        args.out_dir, shard_steps=args.shard_steps, compress=args.compress == "deflate"
+    ) as writer:
+        for epi in range(args.episodes):
+            seed = args.seed + epi
+            env.reset(seed=seed)
+            buf.clear()
+            while True:
+                act = _read_action(stdin)
+                if act is None:
+                    act = env.action_space.sample()
+                obs, reward, terminated, truncated, _ = env.step(act)
+                buf.add(obs, act, float(reward), terminated, truncated, base.score)
+                if terminated or truncated:
+                    break
+            writer.add_episode(epi, seed, buf.arrays())
+    return 0
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
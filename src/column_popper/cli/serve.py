@@ -0,0 +1,272 @@
+"""Asyncio server for the streaming protocol.
+
+Hosts many protocol sessions in one process, one per TCP or Unix-socket connection. Each
+connection gets its own env and speaks exactly the stdin/stdout protocol of
+`cli.protocol` (`meta`, `reset`, `step_request`, `step_result`, `done`; one action per
+line), so a session is byte-for-byte the output of `cli.protocol --throughput` given the
+same actions. A client that disconnects ends its session. With `batch > 1` each connection
+plays that many envs per message instead (`cli.protocol.BatchStreamSession`).
+
+Backpressure is per connection: the server reads an action only after its previous
+response has drained below `write_buffer` bytes, and an unread backlog of actions fills the
+reader's buffer and then the socket, which stalls the client instead of the server. With
+`pipeline > 0` the server instead keeps reading actions into the session's queue (up to that
+depth) while it steps, so an open-loop client need not wait for each `step_request`.
+Between an episode's `done` and the client's `done` acknowledgement, action lines are
+discarded (see `StreamSession`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+from column_popper.envs.info import INFO_LEVELS
+
+from .protocol import BatchStreamSession, StreamSession, make_env, make_vector_env
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    episodes: int = 1
+    seed: int = 42
+    include_time: bool = False
+    info_level: str = "full"
+    # Envs per session; > 1 switches to batched messages (K actions per line)
+    batch: int = 1
+    # Keyframes plus obs_delta messages instead of full observations (single-env sessions)
+    delta: bool = False
+    keyframe_interval: int = 100
+    # Actions a client may send ahead of time (0 = one action per step_request)
+    pipeline: int = 0
+    # Session k plays seeds seed + k * episodes + e instead of every session using seed + e
+    distinct_seeds: bool = False
+    # 0 = unlimited; connections beyond the limit are closed immediately
+    max_sessions: int = 0
+    # High-water mark of each connection's send buffer, in bytes
+    write_buffer: int = 1 << 16
+    # Longest accepted action line, in bytes
+    line_limit: int = 1 << 12
+    # Pending-connection queue of the listening socket (many clients connect at once)
+    backlog: int = 1024
+    # Seconds to wait for an action before dropping the session (None = forever)
+    idle_timeout: float | None = None
+
+
+class StreamServer:
+    """Accepts connections and runs one `StreamSession` per connection."""
+
+    def __init__(self, config: ServerConfig) -> None:
+        self.config = config
+        self.active = 0
+        self.completed = 0
+        self._ids = itertools.count()
+
+    def _open_session(self, seed: int) -> tuple[Any, StreamSession | BatchStreamSession]:
+        """Build the env and session for one connection."""
+        cfg = self.config
+        env: Any
+        if cfg.batch > 1:
+            env = make_vector_env(cfg.batch, cfg.include_time)
+            return env, BatchStreamSession(
+                env, episodes=cfg.episodes, seed=seed, info_level=cfg.info_level
+            )
+        env = make_env(cfg.seed, cfg.include_time, cfg.info_level)
+        return env, StreamSession(
+            env,
+            episodes=cfg.episodes,
+            seed=seed,
+            fast=True,
+            delta=cfg.delta,
+            keyframe_interval=cfg.keyframe_interval,
+            max_queue=cfg.pipeline,
+        )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        cfg = self.config
+        if cfg.max_sessions and self.active >= cfg.max_sessions:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+            return
+        session_id = next(self._ids)
+        seed = cfg.seed + (session_id * cfg.batch * cfg.episodes if cfg.distinct_seeds else 0)
+        env: Any = None
+        self.active += 1
+        try:
+            env, session = self._open_session(seed)
+            transport: Any = writer.transport
+            transport.set_write_buffer_limits(high=cfg.write_buffer)
+            writer.write("".join(session.start()).encode())
+            await writer.drain()
+            if isinstance(session, StreamSession) and session.max_queue:
+                await self._run_pipelined(session, reader, writer)
+            while not session.finished:
+                line = await asyncio.wait_for(reader.readline(), cfg.idle_timeout)
+                if not line:
+                    break
+                lines = session.feed(line.decode("utf-8", "replace"))
+                writer.write("".join(lines).encode())
+                await writer.drain()
+            if session.finished:
+                self.completed += 1
+        except (ConnectionError, asyncio.TimeoutError, ValueError):
+            # Reset by the peer, idle too long, or an action line over `line_limit`
+            pass
+        finally:
+            self.active -= 1
+            if env is not None:
+                env.close()
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _run_pipelined(
+        self, session: StreamSession, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Read actions into the session's queue while stepping through it.
+
+        Reading stops while the queue is full, so a client that runs far ahead is held back
+        by the socket like an unpipelined one.
+        """
+        ready, room = asyncio.Event(), asyncio.Event()
+        eof = False
+
+        async def fill() -> None:
+            nonlocal eof
+            try:
+                while True:
+                    while session.queue_full:
+                        room.clear()
+                        await room.wait()
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    session.submit(line.decode("utf-8", "replace"))
+                    ready.set()
+            except (ConnectionError, ValueError):
+                pass
+            finally:
+                eof = True
+                ready.set()
+
+        task = asyncio.create_task(fill())
+        try:
+            while not session.finished:
+                while not session.queue and not eof:
+                    ready.clear()
+                    await asyncio.wait_for(ready.wait(), self.config.idle_timeout)
+                if not session.queue:
+                    break
+                writer.write("".join(session.step_queued()).encode())
+                room.set()
+                await writer.drain()
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def start(
+        self,
+        *,
+        host: str | None = None,
+        port: int | None = None,
+        path: str | None = None,
+        reuse_port: bool = False,
+    ) -> asyncio.Server:
+        """Listen on `path` (Unix socket) or `host:port` (`port=0` picks a free port)."""
+        limit, backlog = self.config.line_limit, self.config.backlog
+        if path is not None:
+            return await asyncio.start_unix_server(
+                self.handle, path=path, limit=limit, backlog=backlog
+            )
+        return await asyncio.start_server(
+            self.handle,
+            host=host,
+            port=port,
+            limit=limit,
+            backlog=backlog,
+            reuse_port=reuse_port or None,
+        )
+
+
+async def _serve(server: StreamServer, args: argparse.Namespace) -> None:
+    srv = await server.start(
+        host=args.host, port=args.port, path=args.unix, reuse_port=args.reuse_port
+    )
+    where = ", ".join(str(s.getsockname()) for s in srv.sockets)
+    print(f"Serving Column Popper streams on {where}", file=sys.stderr, flush=True)
+    async with srv:
+        await srv.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the streaming protocol to many clients")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", default=None, help="Listen on this Unix socket path instead")
+    parser.add_argument(
+        "--reuse-port",
+        action="store_true",
+        help="Set SO_REUSEPORT so several server processes can share the port",
+    )
+    parser.add_argument("--episodes", type=int, default=1, help="Episodes per session")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--distinct-seeds", action="store_true", help="Give each session its own seed range"
+    )
+    parser.add_argument("--include-time", action="store_true")
+    parser.add_argument(
+        "--batch", type=int, default=1, help="Envs per session (K actions per line)"
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Send keyframes and obs_delta changes (see utils.delta)",
+    )
+    parser.add_argument("--keyframe-interval", type=int, default=100)
+    parser.add_argument(
+        "--pipeline",
+        type=int,
+        default=0,
+        metavar="DEPTH",
+        help="Accept up to DEPTH actions sent ahead of time (0 = one per step_request)",
+    )
+    parser.add_argument("--info-level", choices=list(INFO_LEVELS), default="full")
+    parser.add_argument("--max-sessions", type=int, default=0, help="0 = unlimited")
+    parser.add_argument(
+        "--write-buffer", type=int, default=1 << 16, help="Per-connection send buffer (bytes)"
+    )
+    parser.add_argument(
+        "--idle-timeout", type=float, default=None, help="Drop sessions idle this many seconds"
+    )
+    args = parser.parse_args(argv)
+    if args.batch > 1 and (args.delta or args.pipeline):
+        parser.error("--delta and --pipeline are only supported for single-env sessions")
+
+    config = ServerConfig(
+        episodes=args.episodes,
+        seed=args.seed,
+        include_time=args.include_time,
+        info_level=args.info_level,
+        batch=args.batch,
+        delta=args.delta,
+        keyframe_interval=args.keyframe_interval,
+        pipeline=args.pipeline,
+        distinct_seeds=args.distinct_seeds,
+        max_sessions=args.max_sessions,
+        write_buffer=args.write_buffer,
+        idle_timeout=args.idle_timeout,
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve(StreamServer(config), args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,276 @@
+"""Shared-memory transport for the streaming protocol.
+
+For a policy and an env on the same host. The env side runs a `StreamSession` in its own
+process and passes the protocol's messages (`meta`, `reset`, `step_request`, `step_result`,
+`done`) through a ring of fixed-layout slots in one `multiprocessing.shared_memory` block
+instead of JSON lines. Actions come back through a second ring. Each ring is guarded by a
+pair of semaphores (free slots / filled slots), so neither side polls or parses text.
+
+A slot holds every numeric field of any message type: the obs arrays, `episode`, `step`,
+`action`, `reward`, the flags and the numeric info fields. Rare non-numeric fields (`meta`'s
+`env_id`, the per-episode `seed` / `version` / `spawn_stream` of reset info) travel as
+JSON in a small `extra` field. `decode_slot` rebuilds the message dict that
+`json.loads` gives for the same JSONL line (with obs as arrays). `column_popper.client`
+wraps both transports behind one API.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+
+from column_popper.envs.info import LEVEL_FIELDS
+
+from .protocol import StreamSession, make_env
+
+MESSAGE_TYPES = ("meta", "reset", "step_request", "step_result", "done")
+# Internal end-of-stream marker; never a protocol message
+_EOF = 255
+EXTRA_BYTES = 256
+OBS_FIELDS: dict[str, tuple[Any, tuple[int, ...]]] = {
+    "board": (np.int32, (12, 3)),
+    "selection": (np.int32, (2,)),
+    "time_left_norm": (np.float32, (1,)),
+    "sel_pos": (np.int32, (2,)),
+}
+INFO_FIELDS: dict[str, Any] = {
+    "score": np.float64,
+    "time_left": np.float64,
+    "pops_this_step": np.int64,
+    "fall_interval": np.float64,
+}
+SLOT = np.dtype(
+    [
+        ("type", np.uint8),
+        ("terminated", np.bool_),
+        ("truncated", np.bool_),
+        ("action", np.int8),
+        ("episode", np.int32),
+        ("step", np.int64),
+        ("reward", np.float64),
+        *((name, dtype) for name, dtype in INFO_FIELDS.items()),
+        *((name, dtype, shape) for name, (dtype, shape) in OBS_FIELDS.items()),
+        ("extra_len", np.int32),
+        ("extra", np.uint8, (EXTRA_BYTES,)),
+    ],
+    align=True,
+)
+# Bytes before the message ring: a `closed` flag set by whichever side leaves first
+_HEADER = 64
+# Seconds between checks of the peer while waiting on a semaphore
+_POLL = 0.5
+
+
+class ShmChannel:
+    """Both rings over one shared block: messages env -> client, actions client -> env.
+
+    `sems` is `(msg_free, msg_filled, act_free, act_filled)`; both sides must be built with
+    the same block, `slots` and semaphores. Slot `i` of a ring carries its `i`-th item.
+    """
+
+    def __init__(self, shm: SharedMemory, slots: int, sems: tuple[Any, Any, Any, Any]) -> None:
+        self.shm = shm
+        self.slots = int(slots)
+        self.msg_free, self.msg_filled, self.act_free, self.act_filled = sems
+        buf = shm.buf
+        self._closed = np.ndarray((1,), dtype=np.uint8, buffer=buf)
+        ring = np.ndarray((self.slots,), dtype=SLOT, buffer=buf, offset=_HEADER)
+        self._fields = {name: ring[name] for name in SLOT.names or ()}
+        self._actions = np.ndarray(
+            (self.slots,), dtype=np.int64, buffer=buf, offset=_HEADER + ring.nbytes
+        )
+        self._put_i = self._get_i = self._act_put_i = self._act_get_i = 0
+
+    @staticmethod
+    def size(slots: int) -> int:
+        return _HEADER + slots * SLOT.itemsize + slots * np.dtype(np.int64).itemsize
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._closed[0])
+
+    def close(self) -> None:
+        """Mark the channel closed (a side waiting for its peer gives up) and drop this
+        side's views of the block."""
+        self._closed[0] = 1
+        self._fields = {}
+        self._closed = self._actions = np.zeros((1,), dtype=np.uint8)
+
+    def _acquire(self, sem: Any, alive: Callable[[], bool] | None = None) -> bool:
+        """Wait for `sem`; False once the channel is closed or `alive()` turns false."""
+        while not sem.acquire(timeout=_POLL):
+            if self.closed or (alive is not None and not alive()):
+                return False
+        return True
+
+    # Env side
+    def put(self, msg: dict[str, Any]) -> bool:
+        """Write one message dict; False when the client has gone away."""
+        if not self._acquire(self.msg_free):
+            return False
+        i = self._put_i % self.slots
+        self._put_i += 1
+        f = self._fields
+        f["type"][i] = MESSAGE_TYPES.index(msg["type"])
+        extra: dict[str, Any] = {}
+        for key, value in msg.items():
+            if key in ("type", "obs", "info"):
+                continue
+            if key in f:
+                f[key][i] = value
+            else:
+                extra[key] = value
+        obs = msg.get("obs")
+        if obs is not None:
+            for key, value in obs.items():
+                f[key][i] = value
+        info = msg.get("info")
+        if info is not None:
+            for key, value in info.items():
+                if key in INFO_FIELDS:
+                    f[key][i] = value
+                else:
+                    extra[key] = value
+        self._put_extra(i, extra)
+        self.msg_filled.release()
+        return True
+
+    def put_eof(self) -> None:
+        if self._acquire(self.msg_free):
+            i = self._put_i % self.slots
+            self._put_i += 1
+            self._fields["type"][i] = _EOF
+            self.msg_filled.release()
+
+    def _put_extra(self, i: int, extra: dict[str, Any]) -> None:
+        data = json.dumps(extra).encode() if extra else b""
+        if len(data) > EXTRA_BYTES:
+            raise ValueError(f"Message fields too large for a slot: {extra!r}")
+        self._fields["extra_len"][i] = len(data)
+        self._fields["extra"][i, : len(data)] = np.frombuffer(data, dtype=np.uint8)
+
+    def get_action(self) -> int | None:
+        """Next action; None when the client has gone away."""
+        if not self._acquire(self.act_filled):
+            return None
+        action = int(self._actions[self._act_get_i % self.slots])
+        self._act_get_i += 1
+        self.act_free.release()
+        return action
+
+    # Client side
+    def put_action(self, action: int, alive: Callable[[], bool] | None = None) -> bool:
+        """Write one action; False when the env has gone away (`alive` checks the env
+        process while the action ring is full)."""
+        if not self._acquire(self.act_free, alive):
+            return False
+        self._actions[self._act_put_i % self.slots] = action
+        self._act_put_i += 1
+        self.act_filled.release()
+        return True
+
+    def get(
+        self, obs_keys: tuple[str, ...], info_level: str, *, timeout: float | None = None
+    ) -> dict[str, Any] | None:
+        """Next message (None at end of stream), decoded as in `decode_slot`."""
+        if not self.msg_filled.acquire(timeout=timeout):
+            raise TimeoutError("No message from the env process")
+        i = self._get_i % self.slots
+        self._get_i += 1
+        msg = decode_slot(self._fields, i, obs_keys, info_level)
+        self.msg_free.release()
+        return msg
+
+
+def obs_keys(include_time: bool) -> tuple[str, ...]:
+    """Observation keys of a session, in the env's order."""
+    return tuple(k for k in OBS_FIELDS if include_time or k != "time_left_norm")
+
+
+def decode_slot(
+    fields: dict[str, np.ndarray], i: int, obs_keys: tuple[str, ...], info_level: str
+) -> dict[str, Any] | None:
+    """The message in slot `i`, with the keys, key order and values of its JSONL form."""
+    code = int(fields["type"][i])
+    if code == _EOF:
+        return None
+    kind = MESSAGE_TYPES[code]
+    n = int(fields["extra_len"][i])
+    extra = json.loads(fields["extra"][i, :n].tobytes()) if n else {}
+    msg: dict[str, Any] = {"type": kind}
+    if kind == "meta":
+        msg.update(extra)
+        return msg
+    msg["episode"] = int(fields["episode"][i])
+    if kind == "done":
+        return msg
+    if kind != "reset":
+        msg["step"] = int(fields["step"][i])
+    info: dict[str, Any] = {}
+    for key in LEVEL_FIELDS[info_level]:
+        value = fields[key][i]
+        info[key] = int(value) if key == "pops_this_step" else float(value)
+    info.update(extra)
+    obs = {key: fields[key][i].copy() for key in obs_keys}
+    if kind == "step_result":
+        msg["action"] = int(fields["action"][i])
+        msg["reward"] = float(fields["reward"][i])
+        msg["terminated"] = bool(fields["terminated"][i])
+        msg["truncated"] = bool(fields["truncated"][i])
+        msg["info"], msg["obs"] = info, obs
+    else:
+        msg["obs"], msg["info"] = obs, info
+    return msg
+
+
+class _RecordSession(StreamSession):
+    """`StreamSession` whose lines are message dicts holding the env's own obs and info."""
+
+    def _payload(self, obs: dict[str, Any], info: dict[str, Any]) -> None:
+        self._obs_out, self._info_out = obs, info
+
+    def _line(self, msg: dict[str, Any], **tail: Any) -> Any:
+        return {**msg, **tail}
+
+
+def serve(
+    shm_name: str,
+    slots: int,
+    sems: tuple[Any, Any, Any, Any],
+    *,
+    episodes: int,
+    seed: int,
+    include_time: bool,
+    info_level: str,
+) -> None:
+    """Env-side loop (a process target): play one session over the channel."""
+    shm = SharedMemory(name=shm_name)
+    channel = ShmChannel(shm, slots, sems)
+    env = make_env(seed, include_time, info_level)
+    try:
+        session = _RecordSession(env, episodes=episodes, seed=seed)
+        # `_RecordSession` returns message dicts where `StreamSession` returns lines
+        opening: Any = session.start()
+        sent = all(channel.put(msg) for msg in opening)
+        while sent and not session.finished:
+            action = channel.get_action()
+            if action is None:
+                return
+            if not 0 <= action <= 3:
+                action = 0
+            replies: Any = session.step(action)
+            sent = all(channel.put(msg) for msg in replies)
+        channel.put_eof()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        env.close()
+        channel.close()
+        shm.close()
+
+
+__all__ = ["MESSAGE_TYPES", "SLOT", "ShmChannel", "decode_slot", "obs_keys", "serve"]
@@ -0,0 +1,223 @@
+"""Python client for the streaming protocol.
+
+`connect()` starts an env session and returns a client that yields its messages as dicts
+and takes actions; switching transports is a matter of its first argument:
+
+```python
+from column_popper.client import connect
+
+with connect("shm", episodes=10, seed=0) as client:  # or connect("pipe", ...)
+    for msg in client:
+        if msg["type"] == "step_request":
+            client.send(policy(msg["obs"]))
+```
+
+`"pipe"` runs `cli.protocol --throughput` in a subprocess and speaks JSONL over its stdin
+and stdout; `"shm"` runs the same session in a child process over the shared-memory rings
+of `cli.shm`. Both yield the same messages, with observations as NumPy arrays.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from column_popper.cli import shm as _shm
+
+TRANSPORTS = ("pipe", "shm")
+# Observation dtypes as produced by the env (JSON carries plain numbers)
+_OBS_DTYPES = {name: dtype for name, (dtype, _) in _shm.OBS_FIELDS.items()}
+# Seconds between liveness checks of the env process while waiting for a message
+_POLL = 0.5
+
+
+class StreamClient(ABC):
+    """One protocol session. Iterate for messages; `send()` answers a `step_request`."""
+
+    def __init__(self, *, episodes: int, seed: int, include_time: bool, info_level: str) -> None:
+        self.episodes = int(episodes)
+        self.seed = int(seed)
+        self.include_time = include_time
+        self.info_level = info_level
+
+    @abstractmethod
+    def recv(self) -> dict[str, Any] | None:
+        """Next message, or None once the session has ended."""
+
+    @abstractmethod
+    def send(self, action: int) -> None:
+        """Answer a `step_request`; raises `ConnectionError` once the env has gone away."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """End the session and release the transport."""
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        while (msg := self.recv()) is not None:
+            yield msg
+
+    def __enter__(self) -> StreamClient:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class PipeClient(StreamClient):
+    """JSONL over the stdin/stdout of a `cli.protocol --throughput` subprocess."""
+
+    def __init__(
+        self,
+        *,
+        episodes: int = 1,
+        seed: int = 42,
+        include_time: bool = False,
+        info_level: str = "full",
+    ) -> None:
+        super().__init__(
+            episodes=episodes, seed=seed, include_time=include_time, info_level=info_level
+        )
+        argv = [
+            sys.executable,
+            "-m",
+            "column_popper.cli.protocol",
+            "--throughput",
+            f"--episodes={self.episodes}",
+            f"--seed={self.seed}",
+            f"--info-level={info_level}",
+        ]
+        if include_time:
+            argv.append("--include-time")
+        # Make sure the child imports this very package, installed or not
+        src = str(Path(__file__).resolve().parents[1])
+        path = os.pathsep.join(p for p in (src, os.environ.get("PYTHONPATH")) if p)
+        self._proc = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env={**os.environ, "PYTHONPATH": path},
+        )
+
+    def recv(self) -> dict[str, Any] | None:
+        assert self._proc.stdout is not None
+        line = self._proc.stdout.readline()
+        if not line:
+            return None
+        msg: dict[str, Any] = json.loads(line)
+        obs = msg.get("obs")
+        if obs is not None:
+            msg["obs"] = {k: np.asarray(v, dtype=_OBS_DTYPES[k]) for k, v in obs.items()}
+        return msg
+
+    def send(self, action: int) -> None:
+        assert self._proc.stdin is not None
+        self._proc.stdin.write(b"%d\n" % action)
+        self._proc.stdin.flush()
+
+    def close(self) -> None:
+        for stream in (self._proc.stdin, self._proc.stdout):
+            if stream is not None:
+                stream.close()
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+
+class ShmClient(StreamClient):
+    """Fixed-layout slots in shared memory, shared with an env child process.
+
+    `slots` is the capacity of each ring: how many messages the env can write ahead of the
+    client, and how many actions the client can send ahead of the env. `context` names the
+    multiprocessing start method (default: the platform default).
+    """
+
+    def __init__(
+        self,
+        *,
+        episodes: int = 1,
+        seed: int = 42,
+        include_time: bool = False,
+        info_level: str = "full",
+        slots: int = 16,
+        context: str | None = None,
+    ) -> None:
+        super().__init__(
+            episodes=episodes, seed=seed, include_time=include_time, info_level=info_level
+        )
+        if slots < 1:
+            raise ValueError("slots must be >= 1")
+        ctx: Any = mp.get_context(context)
+        sems = (ctx.Semaphore(slots), ctx.Semaphore(0), ctx.Semaphore(slots), ctx.Semaphore(0))
+        self._mem = SharedMemory(create=True, size=_shm.ShmChannel.size(slots))
+        self._channel = _shm.ShmChannel(self._mem, slots, sems)
+        self._obs_keys = _shm.obs_keys(include_time)
+        self._done = False
+        self._proc = ctx.Process(
+            target=_shm.serve,
+            args=(self._mem.name, slots, sems),
+            kwargs={
+                "episodes": self.episodes,
+                "seed": self.seed,
+                "include_time": include_time,
+                "info_level": info_level,
+            },
+            daemon=True,
+        )
+        self._proc.start()
+
+    def recv(self) -> dict[str, Any] | None:
+        if self._done:
+            return None
+        while True:
+            try:
+                msg = self._channel.get(self._obs_keys, self.info_level, timeout=_POLL)
+                break
+            except TimeoutError:
+                if not self._proc.is_alive():
+                    self._done = True
+                    return None
+        if msg is None:
+            self._done = True
+        return msg
+
+    def send(self, action: int) -> None:
+        proc = self._proc
+        if proc is None or not self._channel.put_action(action, proc.is_alive):
+            raise ConnectionError("The env process has exited")
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        self._channel.close()
+        self._proc.join(timeout=5)
+        if self._proc.is_alive():
+            self._proc.terminate()
+            self._proc.join()
+        self._proc = None
+        self._mem.close()
+        self._mem.unlink()
+
+
+def connect(transport: str = "pipe", **options: Any) -> StreamClient:
+    """Start a session over `transport` (`"pipe"` or `"shm"`); `options` are the session
+    settings (`episodes`, `seed`, `include_time`, `info_level`) plus transport extras."""
+    if transport == "pipe":
+        return PipeClient(**options)
+    if transport == "shm":
+        return ShmClient(**options)
+    raise ValueError(f"Unknown transport {transport!r}; expected one of {TRANSPORTS}")
+
+
+__all__ = ["PipeClient", "ShmClient", "StreamClient", "TRANSPORTS", "connect"]
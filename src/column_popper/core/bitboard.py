@@ -0,0 +1,280 @@
+"""Packed column encoding: 2 bits per cell, one uint32 per column.
+
+Row `r` of a column occupies bits `[2r, 2r + 1]`, so row 0 (top) is the least significant
+cell and a fall (everything moves down one row) is a left shift by 2. A 12x3 board packs
+into three 24-bit codes, or a single 72-bit integer key. Cell values must be in 0..3.
+
+Scalar helpers operate on Python ints; the `*_codes` variants take uint32 arrays of any
+shape and are used by batched engines and table builders.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .board import Board
+
+CELL_BITS = 2
+CELL_MASK = 0b11
+MAX_CELL_VALUE = 3
+
+
+def full_mask(height: int) -> int:
+    """Mask covering every cell of a column."""
+    return (1 << (CELL_BITS * height)) - 1
+
+
+def low_mask(height: int) -> int:
+    """Mask with the low bit of every cell set (0b0101...01)."""
+    return full_mask(height) // CELL_MASK
+
+
+def pack_column(column: Sequence[int] | np.ndarray) -> int:
+    code = 0
+    for r, v in enumerate(column):
+        code |= (int(v) & CELL_MASK) << (CELL_BITS * r)
+    return code
+
+
+def unpack_column(code: int, height: int = 12) -> np.ndarray:
+    shifts = np.arange(height, dtype=np.uint32) * CELL_BITS
+    column: np.ndarray = ((np.uint32(code) >> shifts) & CELL_MASK).astype(np.int32)
+    return column
+
+
+def pack_board(grid: np.ndarray) -> np.ndarray:
+    """Pack a `(height, width)` grid (or `(..., height, width)` batch) into uint32 codes."""
+    grid = np.asarray(grid)
+    height = grid.shape[-2]
+    shifts = (np.arange(height, dtype=np.uint32) * CELL_BITS)[:, None]
+    cells = grid.astype(np.uint32) << shifts
+    packed: np.ndarray = np.bitwise_or.reduce(cells, axis=-2)
+    return packed
+
+
+def unpack_board(codes: np.ndarray, height: int = 12) -> np.ndarray:
+    """Inverse of `pack_board`: `(..., width)` codes to `(..., height, width)` int32 grids."""
+    codes = np.asarray(codes, dtype=np.uint32)
+    shifts = (np.arange(height, dtype=np.uint32) * CELL_BITS)[:, None]
+    grid: np.ndarray = ((codes[..., None, :] >> shifts) & CELL_MASK).astype(np.int32)
+    return grid
+
+
+def board_key(codes: Sequence[int] | np.ndarray, height: int = 12) -> int:
+    """Combine per-column codes into one integer (column `c` at bits `c * 2 * height`)."""
+    key = 0
+    for c, code in enumerate(codes):
+        key |= int(code) << (CELL_BITS * height * c)
+    return key
+
+
+def occupancy(code: int, height: int = 12) -> int:
+    """Low bit of each cell set where the cell is non-empty."""
+    return (code | (code >> 1)) & low_mask(height)
+
+
+def shift_down(code: int, height: int = 12) -> tuple[int, bool]:
+    """Move every cell down one row, leaving row 0 empty. Returns (code, overflow)."""
+    overflow = (code >> (CELL_BITS * (height - 1))) != 0
+    return (code << CELL_BITS) & full_mask(height), overflow
+
+
+def spawn_avoid(code: int) -> int:
+    """Value a spawn at row 0 must avoid (rows 1 and 2 equal and non-empty), else 0."""
+    a = (code >> CELL_BITS) & CELL_MASK
+    return a if a != 0 and a == (code >> (2 * CELL_BITS)) & CELL_MASK else 0
+
+
+def triple_starts(code: int, height: int = 12) -> int:
+    """Cells (low bits) where three identical non-empty values start, before greedy pruning."""
+    diff = code ^ (code >> CELL_BITS)
+    same_next = ~(diff | (diff >> 1)) & low_mask(height)
+    occ = occupancy(code, height)
+    return occ & same_next & (same_next >> CELL_BITS) & low_mask(height - 2)
+
+
+def pop_triples(code: int, height: int = 12) -> tuple[int, int]:
+    """Greedy top-down triple removal (same rule as `Board.pop_triples_in_column`).
+
+    Returns (new_code, popped_cell_count).
+    """
+    cand = triple_starts(code, height)
+    popped = 0
+    while cand:
+        low = cand & -cand
+        # Clear the triple's three cells and drop candidates inside it
+        run = low | (low << CELL_BITS) | (low << (2 * CELL_BITS))
+        code &= ~(run * CELL_MASK)
+        cand &= ~run
+        popped += 3
+    return code, popped
+
+
+def top_empty_row(code: int, height: int = 12) -> int:
+    empty = ~occupancy(code, height) & low_mask(height)
+    return ((empty & -empty).bit_length() - 1) // CELL_BITS if empty else -1
+
+
+def bottom_occupied_row(code: int, height: int = 12) -> int:
+    occ = occupancy(code, height)
+    return (occ.bit_length() - 1) // CELL_BITS if occ else -1
+
+
+def fill_count(code: int, height: int = 12) -> int:
+    return occupancy(code, height).bit_count()
+
+
+def pop_triples_codes(codes: np.ndarray, height: int = 12) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `pop_triples` over a uint32 array. Returns (new_codes, popped_counts)."""
+    codes = np.asarray(codes, dtype=np.uint32)
+    low = np.uint32(low_mask(height))
+    diff = codes ^ (codes >> CELL_BITS)
+    same_next = ~(diff | (diff >> 1)) & low
+    occ = (codes | (codes >> 1)) & low
+    cand = occ & same_next & (same_next >> CELL_BITS) & np.uint32(low_mask(height - 2))
+    out = codes.copy()
+    popped = np.zeros(codes.shape, dtype=np.int64)
+    while cand.any():
+        first = cand & (~cand + np.uint32(1))
+        run = first | (first << CELL_BITS) | (first << (2 * CELL_BITS))
+        out &= ~(run * np.uint32(CELL_MASK))
+        cand &= ~run
+        popped += 3 * (first != 0)
+    return out, popped
+
+
+def shift_down_codes(codes: np.ndarray, height: int = 12) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `shift_down`. Returns (new_codes, overflow_flags)."""
+    codes = np.asarray(codes, dtype=np.uint32)
+    overflow = (codes >> (CELL_BITS * (height - 1))) != 0
+    return (codes << CELL_BITS) & np.uint32(full_mask(height)), overflow
+
+
+def spawn_avoid_codes(codes: np.ndarray) -> np.ndarray:
+    """Vectorized `spawn_avoid`."""
+    codes = np.asarray(codes, dtype=np.uint32)
+    a = (codes >> CELL_BITS) & CELL_MASK
+    b = (codes >> (2 * CELL_BITS)) & CELL_MASK
+    avoid: np.ndarray = np.where((a != 0) & (a == b), a, 0).astype(np.int32)
+    return avoid
+
+
+@dataclass
+class BitBoard(Board):
+    """Board backend storing each column as a packed 2-bit-per-cell code.
+
+    Pops, fall shifts and the spawn constraint run as bit operations on Python ints and
+    the occupancy index is derived from the codes on demand. `grid` is materialized
+    read-only on access; assigning to it loads a full grid. Requires values in 0..3.
+    """
+
+    def __post_init__(self) -> None:
+        if max(self.number_pool) > MAX_CELL_VALUE or min(self.number_pool) < 1:
+            raise ValueError("BitBoard requires number_pool values in 1..3")
+        self._init_rng()
+        self._codes = [0] * self.width
+        self._view: np.ndarray | None = None
+
+    @property
+    def codes(self) -> tuple[int, ...]:
+        return tuple(self._codes)
+
+    def key(self) -> int:
+        """Compact integer key of the cells (72 bits for the default board)."""
+        return board_key(self._codes, self.height)
+
+    @property
+    def grid(self) -> np.ndarray:
+        if self._view is None:
+            view = unpack_board(np.array(self._codes, dtype=np.uint32), self.height)
+            view.flags.writeable = False
+            self._view = view
+        return self._view
+
+    @grid.setter
+    def grid(self, value: np.ndarray) -> None:
+        grid = np.asarray(value)
+        if grid.size and (grid.min() < 0 or grid.max() > MAX_CELL_VALUE):
+            raise ValueError("BitBoard cells must be in 0..3")
+        self._codes = [int(c) for c in pack_board(grid)]
+        self._view = None
+
+    def cell(self, row: int, col: int) -> int:
+        return (self._codes[col] >> (CELL_BITS * row)) & CELL_MASK
+
+    def set_cell(self, row: int, col: int, value: int) -> None:
+        shift = CELL_BITS * row
+        self._codes[col] = (self._codes[col] & ~(CELL_MASK << shift)) | (int(value) << shift)
+        self._view = None
+
+    def bottom_occupied_row(self, col: int) -> int:
+        return bottom_occupied_row(self._codes[col], self.height)
+
+    def top_empty_row(self, col: int) -> int:
+        return top_empty_row(self._codes[col], self.height)
+
+    def fill_count(self, col: int) -> int:
+        return fill_count(self._codes[col], self.height)
+
+    def reindex(self) -> None:
+        # The index is derived from the codes; nothing to rebuild
+        return None
+
+    def get_state(self) -> tuple[Any, ...]:
+        return (tuple(self._codes), self.sampler.get_state())
+
+    def set_state(self, state: tuple[Any, ...]) -> None:
+        codes, spawn = state
+        self._codes = list(codes)
+        self._view = None
+        self.sampler.set_state(spawn)
+
+    def fall(self) -> bool:
+        overflow = False
+        for col in range(self.width):
+            code, col_overflow = shift_down(self._codes[col], self.height)
+            self._codes[col] = code
+            self._codes[col] = code | self.spawn_value_for_column(col)
+            overflow = overflow or col_overflow
+        self._view = None
+        return overflow
+
+    def pop_triples_in_column(self, col: int) -> int:
+        assert 0 <= col < self.width
+        code, popped = pop_triples(self._codes[col], self.height)
+        if popped:
+            self._codes[col] = code
+            self._view = None
+        return popped
+
+    def spawn_value_for_column(self, col: int) -> int:
+        assert 0 <= col < self.width
+        avoid = spawn_avoid(self._codes[col]) if self.height >= 3 else 0
+        return self.sampler.sample(avoid)
+
+
+__all__ = [
+    "BitBoard",
+    "board_key",
+    "bottom_occupied_row",
+    "fill_count",
+    "full_mask",
+    "low_mask",
+    "occupancy",
+    "pack_board",
+    "pack_column",
+    "pop_triples",
+    "pop_triples_codes",
+    "shift_down",
+    "shift_down_codes",
+    "spawn_avoid",
+    "spawn_avoid_codes",
+    "top_empty_row",
+    "triple_starts",
+    "unpack_board",
+    "unpack_column",
+]
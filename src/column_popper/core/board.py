@@ -2,9 +2,29 @@ from __future__ import annotations
 
 from collections.abc import Sequence
 from dataclasses import dataclass
+from typing import Any
 
 import numpy as np
 
+from .spawn import SpawnSampler
+
+
+def _pop_triples(column: np.ndarray) -> int:
+    """Zero contiguous triples of identical non-zero values in `column` (top-down, greedy)."""
+    popped = 0
+    i = 0
+    while i <= column.shape[0] - 3:
+        v = column[i]
+        if v != 0 and column[i + 1] == v and column[i + 2] == v:
+            # Pop exactly three here
+            column[i : i + 3] = 0
+            popped += 3
+            # After popping, do not compress here; compression/gravity is driven by game tick
+            i += 3
+        else:
+            i += 1
+    return popped
+
 
 @dataclass
 class Board:
@@ -12,10 +32,135 @@ class Board:
     width: int = 3
     number_pool: Sequence[int] = (1, 2, 3)
     seed: int | None = None
+    # See `core.spawn` for the determinism contract of each mode
+    spawn_mode: str = "compat"
 
     def __post_init__(self) -> None:
-        self.rng = np.random.Generator(np.random.PCG64(self.seed))
+        self._init_rng()
         self.grid = np.zeros((self.height, self.width), dtype=np.int32)
+        self.reindex()
+
+    def _init_rng(self) -> None:
+        self.rng = np.random.Generator(np.random.PCG64(self.seed))
+        self.sampler = SpawnSampler(self.rng, self.number_pool, self.spawn_mode)
+
+    @property
+    def spawn_stream(self) -> str:
+        """Version string of the spawn stream this board draws from."""
+        return self.sampler.stream
+
+    # Cell access by logical row (0 = top, height - 1 = bottom)
+    def cell(self, row: int, col: int) -> int:
+        return int(self.grid[row, col])
+
+    def set_cell(self, row: int, col: int, value: int) -> None:
+        old = int(self.grid[row, col])
+        self.grid[row, col] = value
+        self._index_cell(row, col, old, int(value))
+
+    # Per-column occupancy index, kept up to date by set_cell, fall and pops.
+    # Code that writes `grid` directly must call `reindex()` afterwards.
+    def bottom_occupied_row(self, col: int) -> int:
+        """Row of the bottom-most non-empty cell in `col`, or -1 if the column is empty."""
+        return self._bottom[col]
+
+    def top_empty_row(self, col: int) -> int:
+        """Row of the top-most empty cell in `col`, or -1 if the column is full."""
+        return self._top[col]
+
+    def fill_count(self, col: int) -> int:
+        """Number of non-empty cells in `col`."""
+        return self._fill[col]
+
+    def reindex(self) -> None:
+        """Rebuild the occupancy index of every column from the cells."""
+        self._top = [-1] * self.width
+        self._bottom = [-1] * self.width
+        self._fill = [0] * self.width
+        for col in range(self.width):
+            self._reindex_column(col)
+
+    def _reindex_column(self, col: int) -> None:
+        self._top[col] = self._scan_empty(col, 0)
+        self._bottom[col] = self._scan_occupied(col, self.height - 1)
+        self._fill[col] = sum(1 for r in range(self.height) if self.cell(r, col) != 0)
+
+    def _scan_empty(self, col: int, start: int) -> int:
+        for r in range(start, self.height):
+            if self.cell(r, col) == 0:
+                return r
+        return -1
+
+    def _scan_occupied(self, col: int, start: int) -> int:
+        for r in range(start, -1, -1):
+            if self.cell(r, col) != 0:
+                return r
+        return -1
+
+    def _index_cell(self, row: int, col: int, old: int, value: int) -> None:
+        if (old == 0) == (value == 0):
+            return
+        if value != 0:
+            self._fill[col] += 1
+            if row > self._bottom[col]:
+                self._bottom[col] = row
+            if row == self._top[col]:
+                self._top[col] = self._scan_empty(col, row + 1)
+        else:
+            self._fill[col] -= 1
+            if self._top[col] < 0 or row < self._top[col]:
+                self._top[col] = row
+            if row == self._bottom[col]:
+                self._bottom[col] = self._scan_occupied(col, row - 1)
+
+    def _index_fall(self, col: int, overflow: bool) -> None:
+        # Every cell moved down one row and row 0 now holds the spawn
+        last = self.height - 1
+        top = self._top[col]
+        self._top[col] = -1 if top < 0 or top >= last else top + 1
+        bottom = self._bottom[col]
+        if bottom < last:
+            self._bottom[col] = bottom + 1
+        else:
+            # The old bottom cell fell off; find the new one
+            self._bottom[col] = self._scan_occupied(col, last)
+        if not overflow:
+            self._fill[col] += 1
+
+    # Snapshots are opaque immutable tuples, restorable into a board of the same class,
+    # size and spawn mode. They include the occupancy index so restoring skips reindex().
+    def get_state(self) -> tuple[Any, ...]:
+        return (
+            self.grid.tobytes(),
+            tuple(self._top),
+            tuple(self._bottom),
+            tuple(self._fill),
+            self.sampler.get_state(),
+        )
+
+    def set_state(self, state: tuple[Any, ...]) -> None:
+        cells, top, bottom, fill, spawn = state
+        self.grid[...] = np.frombuffer(cells, dtype=np.int32).reshape(self.height, self.width)
+        self._top, self._bottom, self._fill = list(top), list(bottom), list(fill)
+        self.sampler.set_state(spawn)
+
+    def fall(self) -> bool:
+        """Shift every column down one row and spawn a new value at the top.
+
+        Columns are processed left to right so spawn draws keep a stable RNG order.
+        Returns True if any column had its bottom cell occupied before shifting (overflow).
+        """
+        overflow = False
+        for col in range(self.width):
+            column = self.grid[:, col]
+            col_overflow = bool(column[-1] != 0)
+            # shift down by one
+            column[1:] = column[:-1]
+            # spawn at top with constraint
+            column[0] = self.spawn_value_for_column(col)
+            self._index_fall(col, col_overflow)
+            overflow = overflow or col_overflow
+        return overflow
 
     # Core utilities for tests
     def pop_triples_in_column(self, col: int) -> int:
@@ -25,23 +170,9 @@ class Board:
         If multiple disjoint triples exist, remove all of them.
         """
         assert 0 <= col < self.width
-        column = self.grid[:, col]
-        popped = 0
-
-        # Scan for any run-lengths of >=3 with equal values; remove triples greedily.
-        i = 0
-        while i <= self.height - 3:
-            v = column[i]
-            if v != 0 and column[i + 1] == v and column[i + 2] == v:
-                # Pop exactly three here
-                column[i : i + 3] = 0
-                popped += 3
-                # After popping, do not compress here; compression/gravity is driven by game tick
-                i += 3
-            else:
-                i += 1
-
-        self.grid[:, col] = column
+        popped = _pop_triples(self.grid[:, col])
+        if popped:
+            self._reindex_column(col)
         return popped
 
     def spawn_value_for_column(self, col: int) -> int:
@@ -53,16 +184,101 @@ class Board:
         (rows 1 and 2). If they are identical and non-zero, avoid that value.
         """
         assert 0 <= col < self.width
-        pool = list(self.number_pool)
-        column = self.grid[:, col]
-
-        avoid = None
+        avoid = 0
         if self.height >= 3:
-            a, b = int(column[1]), int(column[2])
+            a, b = self.cell(1, col), self.cell(2, col)
             if a != 0 and a == b:
                 avoid = a
+        return self.sampler.sample(avoid)
+
+
+@dataclass
+class RingBoard(Board):
+    """Board stored as a circular buffer of rows, so a fall tick is O(1) per column.
+
+    Every fall shifts all columns together, so one head offset serves the whole board.
+    The `height` rows are kept twice in a `(2 * height, width)` buffer (slot `p` and its
+    mirror `p + height` always hold the same values), which makes the logical grid, rows
+    `head .. head + height - 1`, one contiguous slice. A fall moves the head up one row
+    and writes the spawns into the row (and mirror) that held the bottom row.
+
+    `grid` is that slice: a read-only view of the live cells, valid until the next
+    mutation (copy it to keep it). Assigning to `grid` loads a full `(height, width)`
+    array. Pops run in place on the view and then refresh the mirror of that column.
+    """
+
+    def __post_init__(self) -> None:
+        self._init_rng()
+        self._cells = np.zeros((2 * self.height, self.width), dtype=np.int32)
+        self._head = 0
+        self.reindex()
+
+    @property
+    def grid(self) -> np.ndarray:
+        view = self._cells[self._head : self._head + self.height]
+        view.flags.writeable = False
+        return view
+
+    @grid.setter
+    def grid(self, value: np.ndarray) -> None:
+        self._cells[: self.height] = value
+        self._cells[self.height :] = value
+        self._head = 0
+        self.reindex()
+
+    def cell(self, row: int, col: int) -> int:
+        return int(self._cells[self._head + row, col])
+
+    def set_cell(self, row: int, col: int, value: int) -> None:
+        phys = self._head + row
+        cells = self._cells
+        old = int(cells[phys, col])
+        cells[phys, col] = value
+        cells[phys - self.height if phys >= self.height else phys + self.height, col] = value
+        self._index_cell(row, col, old, int(value))
 
-        if avoid is not None and avoid in pool and len(pool) > 1:
-            pool = [p for p in pool if p != avoid]
+    def get_state(self) -> tuple[Any, ...]:
+        return (
+            self._cells.tobytes(),
+            self._head,
+            tuple(self._top),
+            tuple(self._bottom),
+            tuple(self._fill),
+            self.sampler.get_state(),
+        )
 
-        return int(self.rng.choice(pool))
+    def set_state(self, state: tuple[Any, ...]) -> None:
+        cells, head, top, bottom, fill, spawn = state
+        self._cells[...] = np.frombuffer(cells, dtype=np.int32).reshape(self._cells.shape)
+        self._head = head
+        self._top, self._bottom, self._fill = list(top), list(bottom), list(fill)
+        self.sampler.set_state(spawn)
+
+    def fall(self) -> bool:
+        h = self.height
+        head = self._head - 1 if self._head else h - 1
+        cells = self._cells
+        # The new head row held the bottom row before the shift
+        old = cells[head].tolist()
+        self._head = head
+        overflow = False
+        for col in range(self.width):
+            col_overflow = old[col] != 0
+            value = self.spawn_value_for_column(col)
+            cells[head, col] = value
+            cells[head + h, col] = value
+            self._index_fall(col, col_overflow)
+            overflow = overflow or col_overflow
+        return overflow
+
+    def pop_triples_in_column(self, col: int) -> int:
+        assert 0 <= col < self.width
+        h, head = self.height, self._head
+        cells = self._cells
+        popped = _pop_triples(cells[head : head + h, col])
+        if popped:
+            # Rows head..h-1 are mirrored at head+h..2h-1, rows h..head+h-1 at 0..head-1
+            cells[head + h :, col] = cells[head:h, col]
+            cells[:head, col] = cells[h : head + h, col]
+            self._reindex_column(col)
+        return popped
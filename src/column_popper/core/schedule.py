@@ -1,6 +1,169 @@
+"""Fall schedule: game timer and automatic fall events.
+
+`Schedule` is the per-env timer. Its curve is compiled once into a `CompiledSchedule`
+(sorted breakpoints searched with `bisect`). In sim-time mode every step advances by the
+same `dt`, so the whole timeline is known up front: `CompiledSchedule.timeline(dt)`
+precomputes the schedule state and fall count after every step of an episode, and
+`Schedule(fixed_dt=dt)` steps by table lookup. Tables are built with the same float
+arithmetic as the step-by-step path, so both agree exactly.
+
+Batched engines stack the timelines of several curves with `stack_timelines` and index
+them by (curve, step), which gives each env its own curve.
+"""
+
 from __future__ import annotations
 
+from bisect import bisect_left
+from collections.abc import Sequence
 from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+# Simulated seconds per env step when wall time is off
+SIM_DT = 0.1
+# Default (time, interval) ramp: 3s -> 2s at 20s, then 1s at 40s
+DEFAULT_CURVE = ((20.0, 2.0), (40.0, 1.0))
+# Steps simulated past time-up, so engines that step once more before resetting stay exact
+_TIMELINE_TAIL = 2
+# Longer episodes are stepped arithmetically instead of tabulated
+MAX_TIMELINE_STEPS = 1_000_000
+
+
+@dataclass(frozen=True)
+class CompiledSchedule:
+    """Sorted fall curve: `intervals[i]` applies once elapsed time passes `thresholds[i]`."""
+
+    game_duration: float
+    initial_interval: float
+    thresholds: tuple[float, ...]
+    intervals: tuple[float, ...]
+
+    def interval_at(self, elapsed: float, current: float) -> float:
+        """Interval after the last threshold strictly below `elapsed` (else `current`)."""
+        k = bisect_left(self.thresholds, elapsed)
+        return self.intervals[k - 1] if k else current
+
+    def advance(
+        self, elapsed: float, fall_interval: float, accum: float, dt: float
+    ) -> tuple[float, float, float, float, int]:
+        """One step of the timer: (elapsed, time_left, fall_interval, accum, falls)."""
+        prev_interval = fall_interval
+        elapsed += dt
+        time_left = max(0.0, self.game_duration - elapsed)
+        fall_interval = self.interval_at(elapsed, fall_interval)
+        if fall_interval != prev_interval:
+            # Reset accumulator at boundary to avoid retroactive extra falls
+            accum = 0.0
+        accum += dt
+
+        falls = 0
+        # Guard against zero or negative intervals
+        interval = max(1e-6, float(fall_interval))
+        while accum >= interval:
+            accum -= interval
+            falls += 1
+        return elapsed, time_left, fall_interval, accum, falls
+
+    def timeline(self, dt: float) -> FallTimeline:
+        """Schedule state after every fixed-`dt` step of an episode (cached)."""
+        return _timeline(self, float(dt))
+
+
+class FallTimeline(NamedTuple):
+    """Per-step schedule table; index 0 is the reset state, index k the state after k steps.
+
+    `falls[k]` is the number of automatic falls emitted by step k (`falls[0] == 0`). The
+    table runs a couple of steps past time-up.
+    """
+
+    dt: float
+    elapsed: np.ndarray
+    time_left: np.ndarray
+    fall_interval: np.ndarray
+    accum: np.ndarray
+    falls: np.ndarray
+    # The same rows as Python tuples (elapsed, time_left, fall_interval, accum, falls),
+    # which scalar lookups read several times faster than NumPy scalars
+    rows: tuple[tuple[float, float, float, float, int], ...]
+
+    def locate(self, state: tuple[float, float, float, float]) -> int | None:
+        """Step index whose row equals `state` (elapsed, time_left, interval, accum)."""
+        k = int(np.searchsorted(self.elapsed, state[0]))
+        if k < len(self.rows) and self.rows[k][:4] == tuple(state):
+            return k
+        return None
+
+
+@lru_cache(maxsize=64)
+def compile_schedule(
+    game_duration: float, initial_interval: float, curve: tuple[tuple[float, float], ...]
+) -> CompiledSchedule:
+    """Compile (and cache) a curve of (elapsed_threshold, interval) items."""
+    ordered = sorted((float(t), float(iv)) for t, iv in curve)
+    return CompiledSchedule(
+        game_duration=float(game_duration),
+        initial_interval=float(initial_interval),
+        thresholds=tuple(t for t, _ in ordered),
+        intervals=tuple(iv for _, iv in ordered),
+    )
+
+
+@lru_cache(maxsize=64)
+def _timeline(compiled: CompiledSchedule, dt: float) -> FallTimeline:
+    if dt <= 0.0:
+        raise ValueError("Timeline dt must be positive")
+    if not compiled.game_duration / dt <= MAX_TIMELINE_STEPS:
+        raise ValueError(f"Episode exceeds {MAX_TIMELINE_STEPS} steps of {dt}s")
+    elapsed, time_left = 0.0, compiled.game_duration
+    interval, accum = compiled.initial_interval, 0.0
+    rows = [(elapsed, time_left, interval, accum, 0)]
+    tail = _TIMELINE_TAIL
+    while tail > 0:
+        elapsed, time_left, interval, accum, falls = compiled.advance(elapsed, interval, accum, dt)
+        rows.append((elapsed, time_left, interval, accum, falls))
+        if time_left <= 0.0:
+            tail -= 1
+    cols = list(zip(*rows, strict=True))
+    return FallTimeline(
+        dt=dt,
+        elapsed=np.array(cols[0], dtype=np.float64),
+        time_left=np.array(cols[1], dtype=np.float64),
+        fall_interval=np.array(cols[2], dtype=np.float64),
+        accum=np.array(cols[3], dtype=np.float64),
+        falls=np.array(cols[4], dtype=np.int64),
+        rows=tuple(rows),
+    )
+
+
+class StackedTimelines(NamedTuple):
+    """Timelines of several curves as `(num_curves, steps)` arrays for batched lookups."""
+
+    elapsed: np.ndarray  # (steps,), the same for every curve
+    time_left: np.ndarray  # (steps,)
+    fall_interval: np.ndarray  # (num_curves, steps)
+    accum: np.ndarray
+    falls: np.ndarray
+
+    @property
+    def last_step(self) -> int:
+        return int(self.elapsed.shape[0]) - 1
+
+
+def stack_timelines(timelines: Sequence[FallTimeline]) -> StackedTimelines:
+    """Stack timelines sharing `dt` and game duration (the elapsed column is curve-free)."""
+    first = timelines[0]
+    for tl in timelines[1:]:
+        if tl.dt != first.dt or not np.array_equal(tl.elapsed, first.elapsed):
+            raise ValueError("Stacked timelines need the same dt and game duration")
+    return StackedTimelines(
+        elapsed=first.elapsed,
+        time_left=first.time_left,
+        fall_interval=np.stack([tl.fall_interval for tl in timelines]),
+        accum=np.stack([tl.accum for tl in timelines]),
+        falls=np.stack([tl.falls for tl in timelines]),
+    )
 
 
 @dataclass
@@ -10,14 +173,25 @@ class Schedule:
     - Advances time in fixed dt steps (default 1.0 per env.step call)
     - Emits automatic fall events based on `fall_interval`
     - Supports changing interval over elapsed time via `curve`
+    - With `fixed_dt`, steps of exactly that size are read from a precomputed timeline
     """
 
     game_duration: float = 60.0
     initial_interval: float = 1.0
     curve: list[tuple[float, float]] = field(default_factory=list)
     # curve items are (elapsed_time_threshold, new_interval), applied when elapsed >= threshold
+    fixed_dt: float | None = None
 
     def __post_init__(self) -> None:
+        self.compiled = compile_schedule(
+            float(self.game_duration),
+            float(self.initial_interval),
+            tuple((float(t), float(iv)) for t, iv in self.curve),
+        )
+        self._timeline: FallTimeline | None = None
+        dt = self.fixed_dt
+        if dt is not None and dt > 0.0 and self.game_duration / dt <= MAX_TIMELINE_STEPS:
+            self._timeline = self.compiled.timeline(dt)
         self.reset()
 
     def reset(self) -> None:
@@ -25,30 +199,36 @@ class Schedule:
         self.time_left: float = float(self.game_duration)
         self.fall_interval: float = float(self.initial_interval)
         self._accum: float = 0.0
+        # Row of the timeline matching the current state; None when unknown
+        self._step: int | None = 0
 
-    def _update_interval(self) -> None:
-        for t, interval in sorted(self.curve):
-            # Apply change only after strictly passing the threshold
-            if self.elapsed > t:
-                self.fall_interval = float(interval)
+    def get_state(self) -> tuple[float, float, float, float]:
+        """(elapsed, time_left, fall_interval, accumulator) for snapshots."""
+        return (self.elapsed, self.time_left, self.fall_interval, self._accum)
+
+    def set_state(self, state: tuple[float, float, float, float]) -> None:
+        self.elapsed, self.time_left, self.fall_interval, self._accum = state
+        # Resolved lazily against the timeline on the next fixed-dt step
+        self._step = None
 
     def advance_step(self, dt: float = 1.0) -> int:
         """Advance time by dt and return the number of auto fall events to apply."""
-        prev_interval = self.fall_interval
-        self.elapsed += dt
-        self.time_left = max(0.0, self.game_duration - self.elapsed)
-        self._update_interval()
-        if self.fall_interval != prev_interval:
-            # Reset accumulator at boundary to avoid retroactive extra falls
-            self._accum = 0.0
-        self._accum += dt
-
-        falls = 0
-        # Guard against zero or negative intervals
-        interval = max(1e-6, float(self.fall_interval))
-        while self._accum >= interval:
-            self._accum -= interval
-            falls += 1
+        timeline = self._timeline
+        if timeline is not None and dt == timeline.dt:
+            k = self._step
+            if k is None:
+                k = timeline.locate(self.get_state())
+            if k is not None and k + 1 < len(timeline.rows):
+                k += 1
+                self._step = k
+                (self.elapsed, self.time_left, self.fall_interval, self._accum, falls) = (
+                    timeline.rows[k]
+                )
+                return falls
+        self._step = None
+        self.elapsed, self.time_left, self.fall_interval, self._accum, falls = (
+            self.compiled.advance(self.elapsed, self.fall_interval, self._accum, dt)
+        )
         return falls
 
     @property
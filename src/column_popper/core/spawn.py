@@ -0,0 +1,176 @@
+"""Block-buffered spawn sampling.
+
+Determinism contract
+--------------------
+A spawn stream is identified by a version string that is reported in env `info` as
+`spawn_stream`. For a fixed seed, number pool and sequence of "avoid" values, a given
+stream version yields the same spawn values on every platform, for as long as NumPy keeps
+its PCG64 and bounded-integer streams stable (which NumPy documents as part of its
+`Generator` compatibility policy).
+
+- `pcg64-choice-v1` (modes `choice` and `compat`): the stream of
+  `Generator(PCG64(seed)).choice(pool)` with the avoided value filtered out of `pool`.
+  `choice` calls NumPy per spawn; `compat` reads raw PCG64 outputs in blocks and
+  reproduces `choice`'s bounded sampling (Lemire's method on 32-bit words) exactly.
+- `pcg64-block6-v1` (mode `fast`): blocks of `integers(0, k * (k - 1), dtype=uint8)`
+  where `k = len(pool)`; a draw `u` selects `pool[u % k]`, or `reduced[u % (k - 1)]`
+  when a value is avoided. One draw per spawn and no rejection loop. Streams differ
+  from `pcg64-choice-v1`. The span must fit in a uint8, so pools are limited to
+  `FAST_MAX_POOL` values.
+
+Only the sampler may draw from its generator; any other use of the same generator
+desynchronizes block-buffered modes. `get_state()` / `set_state()` capture and restore the
+position in the stream; block-buffered modes only touch the generator state on refills, so
+both are O(1).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+SPAWN_MODES = ("choice", "compat", "fast")
+SPAWN_STREAMS = {
+    "choice": "pcg64-choice-v1",
+    "compat": "pcg64-choice-v1",
+    "fast": "pcg64-block6-v1",
+}
+# Raw 64-bit outputs per refill in compat mode (two 32-bit words each)
+COMPAT_BLOCK = 256
+FAST_BLOCK = 4096
+# Largest pool whose fast-mode span k * (k - 1) fits the uint8 draws
+FAST_MAX_POOL = 16
+_MASK32 = 0xFFFFFFFF
+
+
+def spawn_choices(pool: Sequence[int]) -> dict[int, tuple[int, ...]]:
+    """Candidate values per avoided value (0 = nothing avoided), as spawn filtering does."""
+    full = tuple(int(p) for p in pool)
+    choices = {0: full}
+    for avoid in full:
+        if len(full) > 1:
+            choices[avoid] = tuple(p for p in full if p != avoid)
+    return choices
+
+
+def spawn_tables(pool: Sequence[int]) -> tuple[np.ndarray, np.ndarray]:
+    """Array form of `spawn_choices` for batched engines.
+
+    Row 0 is the full pool; row `v` is the pool without `v`. Returns (values, sizes).
+    """
+    choices = spawn_choices(pool)
+    top = max(choices[0])
+    values = np.zeros((top + 1, len(choices[0])), dtype=np.int32)
+    sizes = np.zeros((top + 1,), dtype=np.uint64)
+    for avoid in range(top + 1):
+        sub = choices.get(avoid, choices[0])
+        values[avoid, : len(sub)] = sub
+        sizes[avoid] = len(sub)
+    return values, sizes
+
+
+class SpawnSampler:
+    """Samples spawn values for one board from its generator (see module docstring)."""
+
+    def __init__(self, rng: np.random.Generator, pool: Sequence[int], mode: str = "compat") -> None:
+        if mode not in SPAWN_MODES:
+            raise ValueError(f"Unknown spawn mode: {mode!r}")
+        self.rng = rng
+        self.mode = mode
+        self.stream = SPAWN_STREAMS[mode]
+        self._choices = spawn_choices(pool)
+        self._full = self._choices[0]
+        if mode == "fast" and len(self._full) > FAST_MAX_POOL:
+            raise ValueError(
+                f"Spawn mode 'fast' supports pools of at most {FAST_MAX_POOL} values, "
+                f"got {len(self._full)}"
+            )
+        self._thresholds = {n: ((1 << 32) - n) % n for n in range(1, len(self._full) + 1)}
+        # Blocks are replaced on refill and never mutated, so snapshots may share them
+        self._words: list[int] = []
+        self._pos = 0
+        if mode == "compat":
+            state = dict(rng.bit_generator.state)
+            if state.get("has_uint32"):
+                # A buffered half-output is the next 32-bit word the Generator would use
+                self._words = [int(state["uinteger"])]
+                state["has_uint32"] = 0
+                rng.bit_generator.state = state
+        # Generator state right after the current block was drawn; applied lazily after
+        # set_state() so restoring does not pay for a generator state assignment
+        self._rng_state: Mapping[str, Any] = rng.bit_generator.state
+        self._rng_stale = False
+
+    def get_state(self) -> tuple[Any, ...]:
+        """Opaque, immutable position in the spawn stream."""
+        if self.mode == "choice":
+            return (self.rng.bit_generator.state,)
+        return (self._words, self._pos, self._rng_state)
+
+    def set_state(self, state: tuple[Any, ...]) -> None:
+        if self.mode == "choice":
+            self.rng.bit_generator.state = state[0]
+            return
+        self._words, self._pos, rng_state = state
+        if rng_state is not self._rng_state:
+            self._rng_state = rng_state
+            self._rng_stale = True
+
+    def _sync_rng(self) -> None:
+        if self._rng_stale:
+            self.rng.bit_generator.state = self._rng_state
+            self._rng_stale = False
+
+    def sample(self, avoid: int = 0) -> int:
+        values = self._choices.get(avoid, self._full)
+        if self.mode == "fast":
+            if self._pos >= len(self._words):
+                self._refill_fast()
+            u = self._words[self._pos]
+            self._pos += 1
+            return values[u % len(values)]
+        if self.mode == "choice":
+            return int(self.rng.choice(list(values)))
+
+        n = len(values)
+        if n == 1:
+            # Generator.choice draws nothing for a single candidate
+            return values[0]
+        threshold = self._thresholds[n]
+        while True:
+            if self._pos >= len(self._words):
+                self._refill_compat()
+            m = self._words[self._pos] * n
+            self._pos += 1
+            if (m & _MASK32) >= threshold:
+                return values[m >> 32]
+
+    def _refill_compat(self) -> None:
+        self._sync_rng()
+        raw = self.rng.bit_generator.random_raw(COMPAT_BLOCK)
+        words = np.empty((2 * COMPAT_BLOCK,), dtype=np.uint64)
+        words[0::2] = raw & np.uint64(_MASK32)
+        words[1::2] = raw >> np.uint64(32)
+        self._words = words.tolist()
+        self._pos = 0
+        self._rng_state = self.rng.bit_generator.state
+
+    def _refill_fast(self) -> None:
+        self._sync_rng()
+        k = len(self._full)
+        span = k * (k - 1) if k > 1 else 1
+        self._words = self.rng.integers(0, span, size=FAST_BLOCK, dtype=np.uint8).tolist()
+        self._pos = 0
+        self._rng_state = self.rng.bit_generator.state
+
+
+__all__ = [
+    "FAST_MAX_POOL",
+    "SPAWN_MODES",
+    "SPAWN_STREAMS",
+    "SpawnSampler",
+    "spawn_choices",
+    "spawn_tables",
+]
@@ -0,0 +1,173 @@
+"""Precomputed column-transition tables over packed column codes.
+
+A column of `height` cells with values 0..3 has `4 ** height` packed codes (16.8M for the
+default 12 rows), so pop outcomes fit in one uint32 table: the low 24 bits hold the
+post-pop code and the high 8 bits the popped-cell count. The spawn constraint only reads
+rows 1 and 2, so it is a 16-entry table indexed by bits 2..5 of the code.
+
+The pop table is built on first use (about a second with NumPy) and cached on disk as a
+`.npy` file that later loads are memory-mapped from. The cache directory defaults to
+`~/.cache/column_popper` and can be moved with `COLUMN_POPPER_CACHE`.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .bitboard import CELL_BITS, CELL_MASK, BitBoard, pop_triples_codes
+
+TABLE_FORMAT_VERSION = 1
+# Largest column height whose pop table still fits the 24-bit code field
+MAX_TABLE_HEIGHT = 12
+_CODE_MASK = np.uint32(0xFFFFFF)
+_COUNT_SHIFT = np.uint32(24)
+_BUILD_CHUNK = 1 << 20
+
+
+def _spawn_avoid_table() -> np.ndarray:
+    # Indexed by bits 2..5 of a column code: (row 2 << 2) | row 1
+    table = np.zeros((16,), dtype=np.int32)
+    for bits in range(16):
+        below, below2 = bits & CELL_MASK, bits >> CELL_BITS
+        table[bits] = below if below != 0 and below == below2 else 0
+    return table
+
+
+SPAWN_AVOID_TABLE = _spawn_avoid_table()
+
+_loaded: dict[tuple[int, str], np.ndarray] = {}
+
+
+def default_cache_dir() -> Path:
+    env = os.environ.get("COLUMN_POPPER_CACHE")
+    if env:
+        return Path(env)
+    return Path.home() / ".cache" / "column_popper"
+
+
+def pop_table_path(height: int = 12, cache_dir: str | os.PathLike[str] | None = None) -> Path:
+    base = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    return base / f"pop_table_h{height}_v{TABLE_FORMAT_VERSION}.npy"
+
+
+def build_pop_table(height: int = 12) -> np.ndarray:
+    """Compute the pop table for every column code of the given height."""
+    if not 3 <= height <= MAX_TABLE_HEIGHT:
+        raise ValueError(f"height must be in 3..{MAX_TABLE_HEIGHT}")
+    n = 1 << (CELL_BITS * height)
+    table = np.empty((n,), dtype=np.uint32)
+    for start in range(0, n, _BUILD_CHUNK):
+        codes = np.arange(start, min(n, start + _BUILD_CHUNK), dtype=np.uint32)
+        new_codes, popped = pop_triples_codes(codes, height)
+        table[start : start + codes.size] = new_codes | (popped.astype(np.uint32) << _COUNT_SHIFT)
+    return table
+
+
+def write_pop_table(path: str | os.PathLike[str], table: np.ndarray) -> None:
+    """Write atomically so concurrent builders never expose a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".npy.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, table)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def load_pop_table(
+    height: int = 12,
+    cache_dir: str | os.PathLike[str] | None = None,
+    *,
+    build: bool = True,
+) -> np.ndarray:
+    """Return the memory-mapped pop table, building and caching it on first use."""
+    path = pop_table_path(height, cache_dir)
+    key = (height, str(path))
+    cached = _loaded.get(key)
+    if cached is not None:
+        return cached
+    if not path.exists():
+        if not build:
+            raise FileNotFoundError(path)
+        write_pop_table(path, build_pop_table(height))
+    table: np.ndarray = np.load(path, mmap_mode="r")
+    if table.shape != (1 << (CELL_BITS * height),) or table.dtype != np.uint32:
+        raise ValueError(f"Corrupt pop table at {path}")
+    _loaded[key] = table
+    return table
+
+
+@dataclass(frozen=True)
+class PopTable:
+    """Table-driven pop and spawn-constraint kernel over packed column codes."""
+
+    table: np.ndarray
+
+    @classmethod
+    def load(
+        cls, height: int = 12, cache_dir: str | os.PathLike[str] | None = None
+    ) -> PopTable:
+        return cls(load_pop_table(height, cache_dir))
+
+    def pop(self, code: int) -> tuple[int, int]:
+        """Return (post-pop code, popped cell count) for one column code."""
+        entry = int(self.table[code])
+        return entry & 0xFFFFFF, entry >> 24
+
+    def pop_codes(self, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Batched `pop`: one gather over a uint32 code array."""
+        entry = self.table[np.asarray(codes, dtype=np.uint32)]
+        return entry & _CODE_MASK, (entry >> _COUNT_SHIFT).astype(np.int64)
+
+    @staticmethod
+    def spawn_avoid(code: int) -> int:
+        return int(SPAWN_AVOID_TABLE[(code >> CELL_BITS) & 0xF])
+
+    @staticmethod
+    def spawn_avoid_codes(codes: np.ndarray) -> np.ndarray:
+        idx = (np.asarray(codes, dtype=np.uint32) >> CELL_BITS) & np.uint32(0xF)
+        avoid: np.ndarray = SPAWN_AVOID_TABLE[idx]
+        return avoid
+
+
+@dataclass
+class LookupBitBoard(BitBoard):
+    """`BitBoard` whose pops and spawn constraint are single table loads."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._pop_table = PopTable.load(self.height)
+        self._entries = self._pop_table.table
+
+    def pop_triples_in_column(self, col: int) -> int:
+        assert 0 <= col < self.width
+        entry = int(self._entries[self._codes[col]])
+        popped = entry >> 24
+        if popped:
+            self._codes[col] = entry & 0xFFFFFF
+            self._view = None
+        return popped
+
+    def spawn_value_for_column(self, col: int) -> int:
+        assert 0 <= col < self.width
+        return self.sampler.sample(int(SPAWN_AVOID_TABLE[(self._codes[col] >> CELL_BITS) & 0xF]))
+
+
+__all__ = [
+    "LookupBitBoard",
+    "PopTable",
+    "SPAWN_AVOID_TABLE",
+    "build_pop_table",
+    "default_cache_dir",
+    "load_pop_table",
+    "pop_table_path",
+    "write_pop_table",
+]
@@ -1,6 +1,8 @@
 import gymnasium as gym
 
 from .column_popper_env import ColumnPopperEnv
+from .process_vector_env import ProcessVectorColumnPopperEnv
+from .vector_env import VectorColumnPopperEnv
 
 _ENV_ID = "SpecKitAI/ColumnPopper-v1"
 
@@ -11,6 +13,7 @@ except gym.error.Error:
     gym.register(
         id=_ENV_ID,
         entry_point="column_popper.envs.column_popper_env:ColumnPopperEnv",
+        vector_entry_point="column_popper.envs.vector_env:VectorColumnPopperEnv",
     )
 
-__all__ = ["ColumnPopperEnv"]
+__all__ = ["ColumnPopperEnv", "ProcessVectorColumnPopperEnv", "VectorColumnPopperEnv"]
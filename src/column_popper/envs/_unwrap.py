@@ -0,0 +1,16 @@
+"""Find the Column Popper envs behind wrappers and Gymnasium vector envs."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def env_targets(env: Any, method: str, feature: str) -> list[Any]:
+    """The envs under `env` that provide `method`: `env` itself once unwrapped, or every
+    sub-env of a Gymnasium `SyncVectorEnv`. Raises `TypeError` naming `feature` otherwise."""
+    env = getattr(env, "unwrapped", env)
+    if hasattr(env, method):
+        return [env]
+    if hasattr(env, "envs"):
+        return [t for sub in env.envs for t in env_targets(sub, method, feature)]
+    raise TypeError(f"{type(env).__name__} does not support {feature}")
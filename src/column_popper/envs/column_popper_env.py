@@ -6,14 +6,45 @@ import gymnasium as gym
 import numpy as np
 from gymnasium import spaces
 
-from ..core.board import Board
-from ..core.schedule import Schedule
+from ..core.bitboard import BitBoard
+from ..core.board import Board, RingBoard
+from ..core.schedule import DEFAULT_CURVE, SIM_DT, Schedule
+from ..core.spawn import SPAWN_MODES
+from ..core.tables import LookupBitBoard
 from ..rewards.presets import RewardPreset, get_preset
 from ..version import __version__ as PKG_VERSION
+from .events import (
+    DROPS,
+    EVENTS,
+    INVALID_DROPS,
+    INVALID_PICKS,
+    MANUAL_FALLS,
+    OVERFLOWS,
+    PICKS,
+    POPS,
+    SCHEDULED_FALLS,
+    STEPS,
+    TRUNCATIONS,
+    EventCounts,
+)
+from .info import INFO_LEVELS, LazyInfo
+from .profiling import ProfilingMixin
+from .state import EnvState
 
 
-class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
+class ColumnPopperEnv(ProfilingMixin, gym.Env[dict[str, Any], int]):
     metadata = {"render_modes": ["ansi"], "render_fps": 30}
+    # Phase -> method timed when profiling is enabled (see `envs.profiling`)
+    _PROFILE_HOOKS = {
+        "reset": "reset",
+        "step": "step",
+        "action": "_apply_action",
+        "pop": "_pop_column",
+        "schedule": "_advance_schedule",
+        "fall": "_fall_tick",
+        "obs": "_obs",
+        "info": "_info",
+    }
 
     def __init__(
         self,
@@ -26,8 +57,22 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
         use_wall_time: bool = False,
         initial_fall_interval: float = 3.0,
         schedule_curve: list[tuple[float, float]] | None = None,
+        board_backend: str = "array",
+        spawn_mode: str = "compat",
+        reuse_obs: bool = False,
+        info_level: str = "full",
+        profile: bool = False,
     ) -> None:
         super().__init__()
+        if board_backend not in _BOARD_BACKENDS:
+            raise ValueError(f"Unknown board_backend: {board_backend!r}")
+        if spawn_mode not in SPAWN_MODES:
+            raise ValueError(f"Unknown spawn_mode: {spawn_mode!r}")
+        if info_level not in INFO_LEVELS:
+            raise ValueError(f"Unknown info_level: {info_level!r}")
+        self.board_backend = board_backend
+        self.spawn_mode = spawn_mode
+        self.info_level = info_level
         self._seed = seed
         self.strict_invalid = strict_invalid
         self.game_duration = float(game_duration)
@@ -36,15 +81,16 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
         self.use_wall_time = use_wall_time
         self._initial_fall_interval = float(initial_fall_interval)
         # Default ramp: 3s -> 2s at 20s, then 1s at 40s
-        self._schedule_curve = schedule_curve or [(20.0, 2.0), (40.0, 1.0)]
+        self._schedule_curve = schedule_curve or list(DEFAULT_CURVE)
 
-        self.board = Board(seed=seed)
+        self.board = _BOARD_BACKENDS[board_backend](seed=seed, spawn_mode=spawn_mode)
         self.selection = np.zeros((2,), dtype=np.int32)  # [is_selected, value]
         self.score = 0.0
         self.schedule = Schedule(
             game_duration=self.game_duration,
             initial_interval=self._initial_fall_interval,
             curve=list(self._schedule_curve),
+            fixed_dt=None if self.use_wall_time else SIM_DT,
         )
         self._last_wall_time = 0.0
         self._terminated = False
@@ -69,9 +115,29 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
         self.observation_space = spaces.Dict(obs_spaces)
         self.action_space = spaces.Discrete(4)  # type: ignore[assignment]
 
+        # With reuse_obs, every observation is the same dict of env-owned arrays that is
+        # overwritten in place on each reset/step; use copy_obs() to keep one around.
+        self.reuse_obs = reuse_obs
+        self._obs_buf: dict[str, np.ndarray] | None = None
+        if reuse_obs:
+            self._obs_buf = {
+                key: np.zeros(space.shape or (), dtype=space.dtype)
+                for key, space in obs_spaces.items()
+            }
+
         # RNG for any stochasticity (kept minimal here)
         self._rng = np.random.Generator(np.random.PCG64(seed))
 
+        # Game-event counters (see `envs.events`): the current episode, finished episodes,
+        # and steps of episodes abandoned by reset(). Snapshots do not include them.
+        self._events = [0] * len(EVENTS)
+        self._events_finished = [0] * len(EVENTS)
+        self._events_abandoned = [0] * len(EVENTS)
+        self._episodes_finished = 0
+        self.last_episode_events: dict[str, int] | None = None
+        if profile:
+            self.enable_profiling()
+
     # Gym API
     def reset(
         self, *, seed: int | None = None, options: dict[str, Any] | None = None
@@ -80,13 +146,16 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
             self._seed = seed
             self._rng = np.random.Generator(np.random.PCG64(seed))
         # Reset game state
-        self.board = Board(seed=self._seed)
+        self.board = _BOARD_BACKENDS[self.board_backend](
+            seed=self._seed, spawn_mode=self.spawn_mode
+        )
         self.selection = np.zeros((2,), dtype=np.int32)
         self.score = 0.0
         self.schedule = Schedule(
             game_duration=self.game_duration,
             initial_interval=self._initial_fall_interval,
             curve=list(self._schedule_curve),
+            fixed_dt=None if self.use_wall_time else SIM_DT,
         )
         if self.use_wall_time:
             import time
@@ -95,75 +164,136 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
         self._terminated = False
         self._sel_col = -1
         self._sel_row = -1
+        if self._events[STEPS]:
+            self._events_abandoned = [
+                a + b for a, b in zip(self._events_abandoned, self._events, strict=True)
+            ]
+            self._events = [0] * len(EVENTS)
         # Ensure first row is visible
         self._fall_tick()
-        return self._obs(), self._info(pops_this_step=0)
+        return self._obs(), self._reset_info()
 
-    def step(self, action: int) -> tuple[dict[str, Any], float, bool, bool, dict[str, Any]]:  # noqa: C901
+    def step(self, action: int) -> tuple[dict[str, Any], float, bool, bool, dict[str, Any]]:
         assert self.action_space.contains(action)
 
+        events = self._events
+        events[STEPS] += 1
+        reward, terminated, pops = self._apply_action(action)
+        falls = self._advance_schedule()
+
+        # Manual fall: ignore scheduled falls this step; apply exactly one row fall.
+        # Otherwise apply the scheduled falls for this step.
+        manual = action == 3
+        fall_event = MANUAL_FALLS if manual else SCHEDULED_FALLS
+        for _ in range(1 if manual else falls):
+            events[fall_event] += 1
+            if self._fall_tick():
+                events[OVERFLOWS] += 1
+                reward += self.rewards.overflow
+                terminated = True
+                self._terminated = True
+                break
+
+        # Truncation check
+        truncated = False
+        if self.schedule.truncated and not terminated:
+            events[TRUNCATIONS] += 1
+            truncated = True
+            reward += self.rewards.time_up
+
+        if terminated or truncated:
+            self._end_episode()
+        obs = self._obs()
+        info = self._info(pops_this_step=pops)
+        return obs, float(reward), bool(terminated), bool(truncated), info
+
+    # Step phases (see `envs.profiling`)
+    def _apply_action(self, action: int) -> tuple[float, bool, int]:
+        """Apply a pick, drop or manual fall; returns (reward, terminated, pops)."""
         reward = 0.0
         reward += self.rewards.step_cost
-
         terminated = False
-        truncated = False
         pops = 0
 
         # Actions 0,1,2 operate on columns
         if action in (0, 1, 2):
             col = int(action)
-            is_sel, value = int(self.selection[0]), int(self.selection[1])
-            column = self.board.grid[:, col]
-
-            if is_sel == 0:
-                # pick bottom-most existing number if any (do not remove yet)
-                nz = np.nonzero(column)[0]
-                if nz.size > 0:
-                    bottom_idx = nz[-1]
-                    val = int(column[bottom_idx])
-                    self.selection[:] = (1, val)
-                    self._sel_col = col
-                    self._sel_row = int(bottom_idx)
-                    reward += self.rewards.valid_action
-                else:
-                    # invalid (empty column pick) – already has step cost applied
-                    pass
+            if int(self.selection[0]) == 0:
+                reward = self._pick(col, reward)
             else:
-                # drop into target column: remove from source pos then place
-                src_c = self._sel_col
-                src_r = self._sel_row
-                # If same column, remove first to compute correct top-empty
-                if col == src_c and 0 <= src_r < self.board.height:
-                    self.board.grid[src_r, src_c] = 0
-                    column = self.board.grid[:, col]
-                zeros = np.where(column == 0)[0]
-                if zeros.size > 0:
-                    top_empty = int(zeros[0])
-                    column[top_empty] = value
-                    # If different column, remove after placement
-                    if col != src_c and 0 <= src_r < self.board.height and 0 <= src_c < self.board.width:
-                        self.board.grid[src_r, src_c] = 0
-                    self.selection[:] = (0, 0)
-                    self._sel_col = -1
-                    self._sel_row = -1
-                    reward += self.rewards.valid_action
-                    pops = self.board.pop_triples_in_column(col)
-                    if pops:
-                        reward += self.rewards.pop_cell * pops
-                        self.score += self.rewards.pop_cell * pops
-                else:
-                    # invalid full-column drop
-                    reward += self.rewards.invalid_full_drop
-                    if self.strict_invalid:
-                        terminated = True
-            self.board.grid[:, col] = column
-
+                reward, terminated, pops = self._drop(col, reward)
         elif action == 3:
             # Manual fall – valid action plus small bonus; apply one fall tick only
             reward += self.rewards.valid_action
             reward += self.rewards.manual_fall_bonus
+        return reward, terminated, pops
+
+    def _pick(self, col: int, reward: float) -> float:
+        # pick bottom-most existing number if any (do not remove yet)
+        board = self.board
+        bottom_idx = board.bottom_occupied_row(col)
+        if bottom_idx < 0:
+            # invalid (empty column pick) – already has step cost applied
+            self._events[INVALID_PICKS] += 1
+            return reward
+        val = board.cell(bottom_idx, col)
+        self.selection[:] = (1, val)
+        self._sel_col = col
+        self._sel_row = bottom_idx
+        self._events[PICKS] += 1
+        return reward + self.rewards.valid_action
+
+    def _drop(self, col: int, reward: float) -> tuple[float, bool, int]:
+        # drop into target column: remove from source pos then place
+        board = self.board
+        value = int(self.selection[1])
+        src_c = self._sel_col
+        src_r = self._sel_row
+        # If same column, remove first to compute correct top-empty
+        if col == src_c and 0 <= src_r < board.height:
+            board.set_cell(src_r, src_c, 0)
+        top_empty = board.top_empty_row(col)
+        if top_empty < 0:
+            # invalid full-column drop
+            self._events[INVALID_DROPS] += 1
+            return reward + self.rewards.invalid_full_drop, self.strict_invalid, 0
+        board.set_cell(top_empty, col, value)
+        # If different column, remove after placement
+        if col != src_c and 0 <= src_r < board.height and 0 <= src_c < board.width:
+            board.set_cell(src_r, src_c, 0)
+        self.selection[:] = (0, 0)
+        self._sel_col = -1
+        self._sel_row = -1
+        reward += self.rewards.valid_action
+        self._events[DROPS] += 1
+        pops = self._pop_column(col)
+        if pops:
+            self._events[POPS] += pops
+            reward += self.rewards.pop_cell * pops
+            self.score += self.rewards.pop_cell * pops
+        return reward, False, pops
+
+    def _end_episode(self) -> None:
+        events = self._events
+        self._events_finished = [a + b for a, b in zip(self._events_finished, events, strict=True)]
+        self._episodes_finished += 1
+        self.last_episode_events = dict(zip(EVENTS, events, strict=True))
+        self._events = [0] * len(EVENTS)
+
+    def event_counts(self) -> EventCounts:
+        """Game-event counts since construction (see `envs.events`)."""
+        return EventCounts(
+            self._episodes_finished,
+            np.array(self._events_finished, dtype=np.int64),
+            np.array(self._events_abandoned, dtype=np.int64)
+            + np.array(self._events, dtype=np.int64),
+        )
+
+    def _pop_column(self, col: int) -> int:
+        return self.board.pop_triples_in_column(col)
 
-        # Advance time and handle falling
+    def _advance_schedule(self) -> int:
+        """Advance time by one action; returns the number of scheduled falls."""
         if self.use_wall_time:
             import time
 
@@ -171,35 +301,9 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
             dt = max(0.0, now - self._last_wall_time)
             self._last_wall_time = now
         else:
-            dt = 1.0
-        # In non-wall-time mode, model action duration as 0.1s per action
-        if not self.use_wall_time:
-            dt = 0.1
-        falls = self.schedule.advance_step(dt=dt)
-
-        if action == 3:
-            # Manual fall: ignore scheduled falls this step; apply exactly one row fall
-            if self._fall_tick():
-                reward += self.rewards.overflow
-                terminated = True
-                self._terminated = True
-        else:
-            # Apply scheduled falls for this step
-            for _ in range(falls):
-                if self._fall_tick():
-                    reward += self.rewards.overflow
-                    terminated = True
-                    self._terminated = True
-                    break
-
-        # Truncation check
-        if self.schedule.truncated and not terminated:
-            truncated = True
-            reward += self.rewards.time_up
-
-        obs = self._obs()
-        info = self._info(pops_this_step=pops)
-        return obs, float(reward), bool(terminated), bool(truncated), info
+            # In non-wall-time mode, model action duration as 0.1s per action
+            dt = SIM_DT
+        return self.schedule.advance_step(dt=dt)
 
     # Rendering (ANSI minimal placeholder)
     def render(self) -> str:  # type: ignore[override]
@@ -209,8 +313,29 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
             lines.append(" ".join(str(int(x)) for x in row))
         return "\n".join(lines)
 
+    def copy_obs(self, obs: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Detached copy of `obs` (default: the current observation).
+
+        Needed with `reuse_obs=True` by callers that keep observations across steps.
+        """
+        if obs is None:
+            obs = self._obs_buf if self._obs_buf is not None else self._obs()
+        return {key: np.array(value, copy=True) for key, value in obs.items()}
+
     # Helpers
     def _obs(self) -> dict[str, Any]:
+        buf = self._obs_buf
+        if buf is not None:
+            np.copyto(buf["board"], self.board.grid)
+            np.copyto(buf["selection"], self.selection)
+            sel_pos = buf["sel_pos"]
+            sel_pos[0] = self._sel_row
+            sel_pos[1] = self._sel_col
+            if self.include_time_left_norm:
+                buf["time_left_norm"][0] = max(
+                    0.0, min(1.0, self.schedule.time_left / self.game_duration)
+                )
+            return buf
         obs: dict[str, Any] = {
             "board": self.board.grid.astype(np.int32, copy=False),
             "selection": self.selection.astype(np.int32, copy=False),
@@ -226,14 +351,18 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
         return obs
 
     def _info(self, *, pops_this_step: int) -> dict[str, Any]:
-        return {
-            "score": float(self.score),
-            "time_left": float(max(0.0, self.schedule.time_left)),
-            "pops_this_step": int(pops_this_step),
-            "fall_interval": float(self.schedule.fall_interval),
-            "seed": int(self._seed) if self._seed is not None else None,
-            "version": PKG_VERSION,
-        }
+        if self.info_level == "none":
+            return {}
+        state = (self.score, self.schedule.time_left, pops_this_step, self.schedule.fall_interval)
+        return LazyInfo.for_level(self.info_level, state)
+
+    def _reset_info(self) -> dict[str, Any]:
+        # Per-episode constants are reported once per episode, not on every step
+        info = self._info(pops_this_step=0)
+        info["seed"] = int(self._seed) if self._seed is not None else None
+        info["version"] = PKG_VERSION
+        info["spawn_stream"] = self.board.spawn_stream
+        return info
 
     # Wall-time advancement for human UI
     def wall_time_tick(self) -> None:
@@ -250,6 +379,49 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
                 self._terminated = True
                 break
 
+    def action_masks(self) -> np.ndarray:
+        """Boolean mask of actions that change the game (picks/drops that are not no-ops).
+
+        Follows the sb3-contrib `MaskablePPO` convention; reads the board's column index.
+        """
+        board = self.board
+        mask = np.ones((4,), dtype=bool)
+        holding = int(self.selection[0]) != 0
+        for col in range(board.width):
+            if holding:
+                mask[col] = col == self._sel_col or board.top_empty_row(col) >= 0
+            else:
+                mask[col] = board.fill_count(col) > 0
+        return mask
+
+    def get_state(self) -> EnvState:
+        """Immutable snapshot of the game, schedule and spawn RNG position."""
+        return EnvState(
+            self.board_backend,
+            self.board.get_state(),
+            (int(self.selection[0]), int(self.selection[1])),
+            (self._sel_row, self._sel_col),
+            self.score,
+            self.schedule.get_state(),
+            self._terminated,
+            self._seed,
+        )
+
+    def set_state(self, state: EnvState) -> None:
+        """Restore a snapshot from `get_state()`; use `peek()` for the matching observation."""
+        if state.board_backend != self.board_backend:
+            raise ValueError(
+                f"Snapshot is for board_backend {state.board_backend!r}, "
+                f"env uses {self.board_backend!r}"
+            )
+        self.board.set_state(state.board)
+        self.selection[0], self.selection[1] = state.selection
+        self._sel_row, self._sel_col = state.sel_pos
+        self.score = state.score
+        self.schedule.set_state(state.schedule)
+        self._terminated = state.terminated
+        self._seed = state.seed
+
     # Peek current observation and info without stepping
     def peek(self) -> tuple[dict[str, Any], dict[str, Any]]:
         return self._obs(), self._info(pops_this_step=0)
@@ -264,17 +436,16 @@ class ColumnPopperEnv(gym.Env[dict[str, Any], int]):
 
         Returns True if overflow occurred.
         """
-        overflow = False
-        for col in range(self.board.width):
-            column = self.board.grid[:, col]
-            if column[-1] != 0:
-                overflow = True
-            # shift down by one
-            column[1:] = column[:-1]
-            # spawn at top with constraint
-            column[0] = self.board.spawn_value_for_column(col)
-            # update selection row when in this column
-            if self._sel_col == col and self._sel_row >= 0:
-                self._sel_row = min(self._sel_row + 1, self.board.height - 1)
-            self.board.grid[:, col] = column
+        overflow = self.board.fall()
+        # update selection row when a cell is held
+        if self._sel_col >= 0 and self._sel_row >= 0:
+            self._sel_row = min(self._sel_row + 1, self.board.height - 1)
         return overflow
+
+
+_BOARD_BACKENDS: dict[str, type[Board]] = {
+    "array": Board,
+    "ring": RingBoard,
+    "bitboard": BitBoard,
+    "lookup": LookupBitBoard,
+}
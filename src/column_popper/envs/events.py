@@ -0,0 +1,212 @@
+"""Game-event counters and their export.
+
+Every env counts, per episode, the events of its steps:
+
+- `steps`
+- `picks`, `drops`: valid picks and drops
+- `invalid_picks`: picks from an empty column
+- `invalid_drops`: drops into a full column
+- `pops`: cells cleared by triples (as in `pops_this_step`)
+- `scheduled_falls`, `manual_falls`: fall ticks applied by the schedule / by action 3
+  (the tick that `reset()` uses to show the first row is not counted)
+- `overflows`, `truncations`: how episodes ended
+
+When an episode ends its counts move into the env's finished totals. `event_counts()`
+returns an `EventCounts`: finished episodes, their summed counts, and the counts of the
+steps of unfinished episodes (in progress, or cut short by `reset()`). Counts of several
+envs (vector env rows, worker processes) add up with `+`.
+
+`MetricsExporter` writes the counts as a Prometheus text-format file (for the node
+exporter's textfile collector) or a JSON snapshot, at most once per `interval` seconds.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ..version import __version__ as PKG_VERSION
+from ._unwrap import env_targets
+
+EVENTS = (
+    "steps",
+    "picks",
+    "drops",
+    "invalid_picks",
+    "invalid_drops",
+    "pops",
+    "scheduled_falls",
+    "manual_falls",
+    "overflows",
+    "truncations",
+)
+# Column of each event in the counter rows
+(
+    STEPS,
+    PICKS,
+    DROPS,
+    INVALID_PICKS,
+    INVALID_DROPS,
+    POPS,
+    SCHEDULED_FALLS,
+    MANUAL_FALLS,
+    OVERFLOWS,
+    TRUNCATIONS,
+) = range(len(EVENTS))
+_HELP = {
+    "steps": "Env steps",
+    "picks": "Valid picks",
+    "drops": "Valid drops",
+    "invalid_picks": "Picks from an empty column",
+    "invalid_drops": "Drops into a full column",
+    "pops": "Cells cleared by triples",
+    "scheduled_falls": "Fall ticks applied by the schedule",
+    "manual_falls": "Fall ticks applied by the manual-fall action",
+    "overflows": "Episodes ended by an overflow",
+    "truncations": "Episodes ended by the time limit",
+}
+
+
+@dataclass
+class EventCounts:
+    """`finished`: summed counts of `episodes` finished episodes; `unfinished`: counts of
+    the episodes being played or cut short by `reset()`. Both are `(len(EVENTS),)` int64
+    arrays."""
+
+    episodes: int
+    finished: np.ndarray
+    unfinished: np.ndarray
+
+    @classmethod
+    def zeros(cls) -> EventCounts:
+        return cls(0, np.zeros(len(EVENTS), np.int64), np.zeros(len(EVENTS), np.int64))
+
+    @classmethod
+    def merge(cls, counts: Iterable[EventCounts]) -> EventCounts:
+        total = cls.zeros()
+        for c in counts:
+            total = total + c
+        return total
+
+    def __add__(self, other: EventCounts) -> EventCounts:
+        return EventCounts(
+            self.episodes + other.episodes,
+            self.finished + other.finished,
+            self.unfinished + other.unfinished,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, EventCounts)
+            and self.episodes == other.episodes
+            and np.array_equal(self.finished, other.finished)
+            and np.array_equal(self.unfinished, other.unfinished)
+        )
+
+    @property
+    def totals(self) -> np.ndarray:
+        """Counts over every step played, finished episodes or not."""
+        out: np.ndarray = self.finished + self.unfinished
+        return out
+
+    def as_dict(self) -> dict[str, Any]:
+        """`totals`, plus `per_episode` means over the finished episodes."""
+        n = self.episodes
+        return {
+            "episodes": n,
+            "totals": dict(zip(EVENTS, self.totals.tolist(), strict=True)),
+            "per_episode": {
+                e: (v / n if n else 0.0)
+                for e, v in zip(EVENTS, self.finished.tolist(), strict=True)
+            },
+        }
+
+    def to_prometheus(self, prefix: str = "column_popper", labels: str = "") -> str:
+        """Prometheus text exposition: one counter per event, plus the episode counter.
+
+        `labels` (e.g. `run="ppo-3"`) is added to every sample.
+        """
+        extra = f",{labels}" if labels else ""
+        bare = f"{{{labels}}}" if labels else ""
+        lines = [
+            f"# HELP {prefix}_events_total Game events counted during env steps.",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        for event, value in zip(EVENTS, self.totals.tolist(), strict=True):
+            lines.append(f'{prefix}_events_total{{event="{event}"{extra}}} {value}')
+        lines += [
+            f"# HELP {prefix}_episodes_total Finished episodes.",
+            f"# TYPE {prefix}_episodes_total counter",
+            f"{prefix}_episodes_total{bare} {self.episodes}",
+            f"# HELP {prefix}_episode_events_mean Mean events per finished episode.",
+            f"# TYPE {prefix}_episode_events_mean gauge",
+        ]
+        for event, value in self.as_dict()["per_episode"].items():
+            lines.append(f'{prefix}_episode_events_mean{{event="{event}"{extra}}} {value:.6g}')
+        return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # Readers (the textfile collector, tail -f) never see a half-written file
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class MetricsExporter:
+    """Writes the event counts of `envs` to `path` as `"prometheus"` text or `"json"`.
+
+    `maybe_write()` (cheap to call every step) writes when `interval` seconds have passed
+    since the last write; `write()` writes now. `envs` are Column Popper envs, their
+    wrappers or a `SyncVectorEnv` of them.
+    """
+
+    def __init__(
+        self,
+        envs: Any,
+        path: str | Path,
+        *,
+        fmt: str = "prometheus",
+        interval: float = 10.0,
+        labels: str = "",
+    ) -> None:
+        if fmt not in ("prometheus", "json"):
+            raise ValueError(f"Unknown metrics format: {fmt!r}")
+        seq = envs if isinstance(envs, (list, tuple)) else [envs]
+        self.envs = [
+            t for env in seq for t in env_targets(env, "event_counts", "game-event counts")
+        ]
+        self.path = Path(path)
+        self.fmt = fmt
+        self.interval = float(interval)
+        self.labels = labels
+        self._last = float("-inf")
+
+    def counts(self) -> EventCounts:
+        return EventCounts.merge(env.event_counts() for env in self.envs)
+
+    def maybe_write(self) -> bool:
+        if time.monotonic() - self._last < self.interval:
+            return False
+        self.write()
+        return True
+
+    def write(self) -> None:
+        self._last = time.monotonic()
+        counts = self.counts()
+        if self.fmt == "prometheus":
+            text = counts.to_prometheus(labels=self.labels)
+        else:
+            snapshot = {"time": time.time(), "version": PKG_VERSION, **counts.as_dict()}
+            text = json.dumps(snapshot) + "\n"
+        _write_atomic(self.path, text)
+
+
+__all__ = ["EVENTS", "EventCounts", "MetricsExporter"]
@@ -0,0 +1,130 @@
+"""Step `info` levels and a lazily resolved info dict.
+
+`info_level` selects which per-step fields an env reports:
+
+- `none`: empty info on every step
+- `minimal`: `score`, `pops_this_step`
+- `full`: `score`, `time_left`, `pops_this_step`, `fall_interval`
+
+Per-episode constants (`seed`, `version`, `spawn_stream`) are only reported by `reset()`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from typing import Any
+
+INFO_LEVELS = ("none", "minimal", "full")
+
+# Step state captured by the env: (score, time_left, pops_this_step, fall_interval)
+StepState = tuple[float, float, int, float]
+
+_STEP_FIELDS: dict[str, Callable[[StepState], Any]] = {
+    "score": lambda s: float(s[0]),
+    "time_left": lambda s: float(max(0.0, s[1])),
+    "pops_this_step": lambda s: int(s[2]),
+    "fall_interval": lambda s: float(s[3]),
+}
+LEVEL_FIELDS: dict[str, tuple[str, ...]] = {
+    "none": (),
+    "minimal": ("score", "pops_this_step"),
+    "full": ("score", "time_left", "pops_this_step", "fall_interval"),
+}
+
+_PENDING: Any = object()
+
+
+class LazyInfo(dict[str, Any]):
+    """`info` dict whose fields are computed from a captured state tuple on first access.
+
+    All keys are present up front, so `in`, `len()` and iteration cost nothing; a value is
+    resolved (once) when read through indexing, `get`, `items`, `values`, copying, equality,
+    JSON encoding or pickling. Assigned values are stored as in a plain dict.
+    """
+
+    __slots__ = ("_state",)
+
+    _state: StepState
+
+    @classmethod
+    def for_level(cls, level: str, state: StepState) -> LazyInfo:
+        # dict's own constructor copies the pending template; no Python-level __init__
+        info = cls(_TEMPLATES[level])
+        info._state = state
+        return info
+
+    def _resolve(self) -> None:
+        for key, value in dict.items(self):
+            if value is _PENDING:
+                dict.__setitem__(self, key, _STEP_FIELDS[key](self._state))
+
+    def __getitem__(self, key: str) -> Any:
+        value = dict.__getitem__(self, key)
+        if value is _PENDING:
+            value = _STEP_FIELDS[key](self._state)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if dict.__contains__(self, key) else default
+
+    # Overriding __iter__ also keeps dict(info) / {**info} off CPython's raw-storage fast path
+    def __iter__(self) -> Iterator[str]:
+        return iter(dict.keys(self))
+
+    def items(self) -> Any:
+        self._resolve()
+        return dict.items(self)
+
+    def values(self) -> Any:
+        self._resolve()
+        return dict.values(self)
+
+    def copy(self) -> dict[str, Any]:
+        self._resolve()
+        return dict(dict.items(self))
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if dict.__contains__(self, key):
+            self[key]
+        return dict.pop(self, key, *default)
+
+    def popitem(self) -> tuple[str, Any]:
+        self._resolve()
+        return dict.popitem(self)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if dict.__contains__(self, key):
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
+
+    def __eq__(self, other: object) -> bool:
+        self._resolve()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = None
+
+    def __or__(self, other: Any) -> Any:
+        return self.copy() | other
+
+    def __ror__(self, other: Any) -> Any:
+        return other | self.copy()
+
+    def __repr__(self) -> str:
+        self._resolve()
+        return dict.__repr__(self)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (dict, (self.copy(),))
+
+
+_TEMPLATES: dict[str, dict[str, Any]] = {
+    level: dict.fromkeys(fields, _PENDING) for level, fields in LEVEL_FIELDS.items()
+}
+
+
+__all__ = ["INFO_LEVELS", "LEVEL_FIELDS", "LazyInfo", "StepState"]
@@ -0,0 +1,373 @@
+"""Multi-process Column Popper vector env with shared-memory results.
+
+`ProcessVectorColumnPopperEnv` splits N envs into contiguous slices, one per worker
+process, and each worker steps its slice with a `VectorColumnPopperEnv`. Observations,
+rewards, flags and info arrays live in one `multiprocessing.shared_memory` block laid out
+like the batched `observation_space`, so nothing but a one-byte command and a short reply
+crosses the pipes: the parent writes actions into a shared array, signals every worker,
+and waits for all of them before reading the results in place.
+
+Env `i` matches `VectorColumnPopperEnv(num_envs, seed=seed)` env `i` (and therefore
+`ColumnPopperEnv(seed=seed + i)`) regardless of the number of workers.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from collections.abc import Sequence
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from .events import EventCounts
+from .profiling import ProfileReport
+from .vector_env import VectorColumnPopperEnv
+
+_STEP = "step"
+_RESET = "reset"
+_PROFILE = "profile"
+_EVENTS = "events"
+_CLOSE = "close"
+# Per-env scalar results shared next to the observation arrays
+_RESULT_FIELDS: tuple[tuple[str, Any], ...] = (
+    ("actions", np.int64),
+    ("reward", np.float64),
+    ("terminated", np.bool_),
+    ("truncated", np.bool_),
+    ("score", np.float64),
+    ("time_left", np.float64),
+    ("pops_this_step", np.int64),
+    ("fall_interval", np.float64),
+)
+_INFO_FIELDS = ("score", "time_left", "pops_this_step", "fall_interval")
+
+
+def _layout(
+    obs_space: spaces.Dict, num_envs: int
+) -> tuple[list[tuple[str, tuple[int, ...], np.dtype[Any], int]], int]:
+    """(name, shape, dtype, byte offset) of every shared array, 8-byte aligned, and the
+    total size in bytes."""
+    fields: list[tuple[str, tuple[int, ...], np.dtype[Any]]] = []
+    for key, space in obs_space.spaces.items():
+        assert space.shape is not None and space.dtype is not None
+        fields.append((f"obs.{key}", (num_envs, *space.shape), np.dtype(space.dtype)))
+    for name, dtype in _RESULT_FIELDS:
+        fields.append((name, (num_envs,), np.dtype(dtype)))
+    out = []
+    offset = 0
+    for name, shape, dtype in fields:
+        out.append((name, shape, dtype, offset))
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        offset += (nbytes + 7) & ~7
+    return out, offset
+
+
+def _views(
+    shm: SharedMemory, layout: list[tuple[str, tuple[int, ...], np.dtype[Any], int]]
+) -> dict[str, np.ndarray]:
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        for name, shape, dtype, offset in layout
+    }
+
+
+def _worker(  # noqa: C901
+    conn: Connection,
+    shm_name: str,
+    layout: list[tuple[str, tuple[int, ...], np.dtype[Any], int]],
+    lo: int,
+    hi: int,
+    seeds: list[int | None],
+    env_kwargs: dict[str, Any],
+) -> None:
+    shm = SharedMemory(name=shm_name)
+    env = None
+    try:
+        shared = {name: view[lo:hi] for name, view in _views(shm, layout).items()}
+        obs_keys = [name[4:] for name in shared if name.startswith("obs.")]
+        env = VectorColumnPopperEnv(hi - lo, seed=seeds, copy=False, **env_kwargs)
+
+        def publish(obs: dict[str, Any], info: dict[str, Any]) -> None:
+            for key in obs_keys:
+                shared[f"obs.{key}"][...] = obs[key]
+            for key in _INFO_FIELDS:
+                shared[key][...] = info[key]
+
+        while True:
+            cmd, payload = conn.recv()
+            reply: Any = None
+            try:
+                if cmd == _STEP:
+                    obs, reward, terminated, truncated, info = env.step(shared["actions"])
+                    shared["reward"][...] = reward
+                    shared["terminated"][...] = terminated
+                    shared["truncated"][...] = truncated
+                    publish(obs, info)
+                elif cmd == _RESET:
+                    seed, mask = payload
+                    options = None if mask is None else {"reset_mask": mask}
+                    obs, info = env.reset(seed=seed, options=options)
+                    publish(obs, info)
+                elif cmd == _PROFILE:
+                    reply = _profile(env, payload)
+                elif cmd == _EVENTS:
+                    reply = env.event_counts()
+                elif cmd == _CLOSE:
+                    conn.send((True, None))
+                    break
+                else:
+                    raise RuntimeError(f"Unknown command: {cmd!r}")
+            except Exception as e:
+                conn.send((False, f"{type(e).__name__}: {e}"))
+            else:
+                conn.send((True, reply))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        if env is not None:
+            env.close()
+        shm.close()
+
+
+def _profile(env: VectorColumnPopperEnv, op: str) -> ProfileReport:
+    if op == "enable":
+        env.enable_profiling()
+    elif op == "disable":
+        env.disable_profiling()
+    return env.profile_report()
+
+
+class ProcessVectorColumnPopperEnv(VectorEnv[dict[str, Any], np.ndarray, np.ndarray]):
+    """`VectorColumnPopperEnv` sharded across worker processes.
+
+    `num_workers` defaults to `min(num_envs, os.cpu_count())`; `context` names the
+    multiprocessing start method (default: the platform default). Other keyword arguments
+    are forwarded to each worker's `VectorColumnPopperEnv`. With `copy=False`, the returned
+    observation, reward and info arrays are views of the shared block and are overwritten
+    by the next `step()` or `reset()`.
+
+    `step_async(actions)` / `step_wait()` split a step so the caller can work while the
+    workers run; `step()` does both. Profiling (`enable_profiling()`, or `profile=True`)
+    runs in the workers; `profile_report()` merges their stats, and `event_counts()` their
+    game-event counts.
+    """
+
+    metadata = {"render_modes": [], "autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(
+        self,
+        num_envs: int,
+        *,
+        num_workers: int | None = None,
+        seed: int | Sequence[int | None] | None = None,
+        context: str | None = None,
+        copy: bool = True,
+        include_time_left_norm: bool = False,
+        **env_kwargs: Any,
+    ) -> None:
+        if num_envs < 1:
+            raise ValueError("num_envs must be >= 1")
+        self.num_envs = int(num_envs)
+        workers = num_workers or min(self.num_envs, os.cpu_count() or 1)
+        if not 1 <= workers <= self.num_envs:
+            raise ValueError(f"num_workers must be in [1, {self.num_envs}]")
+        self.num_workers = int(workers)
+        self.copy = copy
+        env_kwargs["include_time_left_norm"] = include_time_left_norm
+        # Per-env curves are sliced like the seeds
+        curves = env_kwargs.pop("schedule_curves", None)
+        if curves is not None and len(curves) != self.num_envs:
+            raise ValueError(f"Expected {self.num_envs} schedule curves, got {len(curves)}")
+
+        # The spaces come from a one-env template; it is never stepped
+        template = VectorColumnPopperEnv(1, **env_kwargs)
+        obs_space = template.single_observation_space
+        assert isinstance(obs_space, spaces.Dict)
+        self.single_observation_space = obs_space
+        self.single_action_space = template.single_action_space
+        template.close()
+        self.observation_space = batch_space(self.single_observation_space, self.num_envs)
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+
+        seeds = self._expand_seeds(seed)
+        bounds = np.linspace(0, self.num_envs, self.num_workers + 1).astype(int)
+        self._slices = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:], strict=True)]
+
+        self._waiting = False
+        self._conns: list[Connection] = []
+        self._procs: list[Any] = []
+        layout, size = _layout(obs_space, self.num_envs)
+        self._shm = SharedMemory(create=True, size=size)
+        self._closed_workers = False
+        self._shared = _views(self._shm, layout)
+        self._obs_keys = [name[4:] for name in self._shared if name.startswith("obs.")]
+
+        ctx: Any = mp.get_context(context)
+        for lo, hi in self._slices:
+            parent, child = ctx.Pipe()
+            kwargs = dict(env_kwargs)
+            if curves is not None:
+                kwargs["schedule_curves"] = list(curves[lo:hi])
+            proc = ctx.Process(
+                target=_worker,
+                args=(child, self._shm.name, layout, lo, hi, seeds[lo:hi], kwargs),
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def _expand_seeds(self, seed: int | Sequence[int | None] | None) -> list[int | None]:
+        if seed is None:
+            return [None] * self.num_envs
+        if isinstance(seed, (int, np.integer)):
+            return [int(seed) + i for i in range(self.num_envs)]
+        seeds = list(seed)
+        if len(seeds) != self.num_envs:
+            raise ValueError(f"Expected {self.num_envs} seeds, got {len(seeds)}")
+        return [None if s is None else int(s) for s in seeds]
+
+    # Gym vector API
+    def reset(
+        self,
+        *,
+        seed: int | Sequence[int | None] | None = None,
+        options: dict[str, Any] | None = None,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        self._check_idle()
+        seeds = None if seed is None else self._expand_seeds(seed)
+        mask = None if options is None else options.get("reset_mask")
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+        for conn, (lo, hi) in zip(self._conns, self._slices, strict=True):
+            conn.send(
+                (
+                    _RESET,
+                    (
+                        None if seeds is None else seeds[lo:hi],
+                        None if mask is None else mask[lo:hi],
+                    ),
+                )
+            )
+        self._collect()
+        return self._obs(), self._info()
+
+    def step(
+        self, actions: np.ndarray
+    ) -> tuple[dict[str, Any], np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._check_idle()
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Expected actions of shape ({self.num_envs},)")
+        if ((actions < 0) | (actions > 3)).any():
+            raise ValueError("Actions must be in [0, 3]")
+        self._shared["actions"][...] = actions
+        for conn in self._conns:
+            conn.send((_STEP, None))
+        self._waiting = True
+
+    def step_wait(
+        self,
+    ) -> tuple[dict[str, Any], np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        if not self._waiting:
+            raise RuntimeError("step_wait() called without a pending step_async()")
+        self._waiting = False
+        self._collect()
+        shared = self._shared
+        return (
+            self._obs(),
+            self._out(shared["reward"]),
+            self._out(shared["terminated"]),
+            self._out(shared["truncated"]),
+            self._info(),
+        )
+
+    def close_extras(self, **kwargs: Any) -> None:
+        if getattr(self, "_closed_workers", True):
+            return
+        self._closed_workers = True
+        if self._waiting:
+            try:
+                self._collect()
+            except RuntimeError:
+                pass
+        for conn in self._conns:
+            try:
+                conn.send((_CLOSE, None))
+                conn.recv()
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+            conn.close()
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        # Drop our views before releasing the buffer they point into
+        self._shared = {}
+        self._shm.close()
+        self._shm.unlink()
+
+    # Profiling (see `envs.profiling`); the stats live in the workers
+    def enable_profiling(self) -> None:
+        self._profile("enable")
+
+    def disable_profiling(self) -> None:
+        self._profile("disable")
+
+    def profile_report(self) -> ProfileReport:
+        return ProfileReport.merge(self._profile("report"))
+
+    def _profile(self, op: str) -> list[Any]:
+        self._check_idle()
+        for conn in self._conns:
+            conn.send((_PROFILE, op))
+        return self._collect()
+
+    def event_counts(self) -> EventCounts:
+        """Game-event counts of all workers' envs (see `envs.events`)."""
+        self._check_idle()
+        for conn in self._conns:
+            conn.send((_EVENTS, None))
+        return EventCounts.merge(self._collect())
+
+    # Helpers
+    def _check_idle(self) -> None:
+        if self._closed_workers:
+            raise RuntimeError("Env is closed")
+        if self._waiting:
+            raise RuntimeError("A step_async() is pending; call step_wait() first")
+
+    def _collect(self) -> list[Any]:
+        """Wait for every worker's reply (the barrier) and raise the first error."""
+        errors, replies = [], []
+        for i, conn in enumerate(self._conns):
+            ok, message = conn.recv()
+            if not ok:
+                errors.append(f"worker {i}: {message}")
+            replies.append(message)
+        if errors:
+            raise RuntimeError("; ".join(errors))
+        return replies
+
+    def _out(self, array: np.ndarray) -> np.ndarray:
+        return array.copy() if self.copy else array
+
+    def _obs(self) -> dict[str, Any]:
+        return {key: self._out(self._shared[f"obs.{key}"]) for key in self._obs_keys}
+
+    def _info(self) -> dict[str, Any]:
+        return {key: self._out(self._shared[key]) for key in _INFO_FIELDS}
+
+
+__all__ = ["ProcessVectorColumnPopperEnv"]
@@ -0,0 +1,240 @@
+"""Opt-in per-phase timing of env resets and steps.
+
+An env splits its work into phases:
+
+- `reset`: resetting boards
+- `step`: the step call outside the other phases (dispatch, bookkeeping, flags)
+- `action`: applying picks, drops and manual-fall rewards
+- `pop`: clearing triples after a drop
+- `schedule`: advancing the fall schedule
+- `fall`: fall ticks (shift plus spawn)
+- `obs`, `info`: building the observation and info
+
+Enabling profiling on an env puts timed wrappers around its phase methods as instance
+attributes that shadow the class methods, and disabling deletes them again. Copies and
+pickles of a profiling env re-install the wrappers on themselves. A disabled
+env runs the plain class methods: there is no flag check left to pay for. Each wrapper
+adds its call's own time (`perf_counter_ns`, nested phases excluded) and a call count to
+the env's `PhaseProfiler`.
+
+```python
+with profile(env, path="profile.json") as prof:
+    ...  # reset / step as usual
+print(prof.report().format())
+```
+
+`ProfileReport`s add up, so reports of several envs, threads or worker processes merge
+into one. Their JSON form (`write`) is stable for diffing between releases.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from ..version import __version__ as PKG_VERSION
+from ._unwrap import env_targets
+
+PHASES = ("reset", "step", "action", "pop", "schedule", "fall", "obs", "info")
+
+
+class PhaseProfiler:
+    """Per-phase self time (ns) and call counters for one env (one thread)."""
+
+    __slots__ = ("ns", "calls", "_child")
+
+    def __init__(self) -> None:
+        self.ns = [0] * len(PHASES)
+        self.calls = [0] * len(PHASES)
+        # Time spent in nested phases of the call in progress
+        self._child = 0
+
+    def clear(self) -> None:
+        self.ns[:] = [0] * len(PHASES)
+        self.calls[:] = [0] * len(PHASES)
+
+    def wrap(self, phase: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """`fn` timed as `phase`."""
+        i = PHASES.index(phase)
+        ns, calls, clock = self.ns, self.calls, time.perf_counter_ns
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            outer = self._child
+            self._child = 0
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                ns[i] += elapsed - self._child
+                calls[i] += 1
+                self._child = outer + elapsed
+
+        return timed
+
+    def report(self) -> ProfileReport:
+        return ProfileReport(
+            {p: (c, n) for p, c, n in zip(PHASES, self.calls, self.ns, strict=True)}
+        )
+
+
+class ProfileReport:
+    """Calls and total self time per phase; `+` merges reports."""
+
+    def __init__(self, phases: dict[str, tuple[int, int]] | None = None) -> None:
+        self.phases = {p: (0, 0) for p in PHASES}
+        for phase, (calls, ns) in (phases or {}).items():
+            self.phases[phase] = (int(calls), int(ns))
+
+    def __add__(self, other: ProfileReport) -> ProfileReport:
+        return ProfileReport(
+            {
+                p: (self.phases[p][0] + other.phases[p][0], self.phases[p][1] + other.phases[p][1])
+                for p in PHASES
+            }
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ProfileReport) and self.phases == other.phases
+
+    @classmethod
+    def merge(cls, reports: Iterable[ProfileReport]) -> ProfileReport:
+        total = cls()
+        for report in reports:
+            total = total + report
+        return total
+
+    @property
+    def steps(self) -> int:
+        return self.phases["step"][0]
+
+    @property
+    def total_ns(self) -> int:
+        return sum(ns for _, ns in self.phases.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Per phase: `calls`, `total_ns`, `mean_ns` (per call), `ns_per_step` and `share`
+        of the total time; the per-step figures are comparable across run lengths."""
+        total = self.total_ns
+        steps = self.steps
+        phases = {}
+        for phase, (calls, ns) in self.phases.items():
+            phases[phase] = {
+                "calls": calls,
+                "total_ns": ns,
+                "mean_ns": ns / calls if calls else 0.0,
+                "ns_per_step": ns / steps if steps else 0.0,
+                "share": ns / total if total else 0.0,
+            }
+        return {"version": PKG_VERSION, "steps": steps, "total_ns": total, "phases": phases}
+
+    def format(self) -> str:
+        """Human-readable table."""
+        lines = [f"{'phase':<9}{'calls':>10}{'mean ns':>11}{'ns/step':>11}{'share':>8}"]
+        for phase, row in self.as_dict()["phases"].items():
+            lines.append(
+                f"{phase:<9}{row['calls']:>10}{row['mean_ns']:>11.0f}"
+                f"{row['ns_per_step']:>11.0f}{row['share']:>8.1%}"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.as_dict(), indent=2) + "\n", encoding="utf-8")
+
+    @classmethod
+    def read(cls, path: str | Path) -> ProfileReport:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls({p: (row["calls"], row["total_ns"]) for p, row in data["phases"].items()})
+
+
+class ProfilingMixin:
+    """`enable_profiling` / `disable_profiling` / `profile_report` for an env class whose
+    `_PROFILE_HOOKS` maps phases to its method names."""
+
+    _PROFILE_HOOKS: dict[str, str] = {}
+    _profilers: list[PhaseProfiler]
+
+    def _profile_targets(self) -> list[Any]:
+        """Objects that run phases on their own thread (each gets its own profiler)."""
+        return [self]
+
+    def enable_profiling(self) -> None:
+        """Start (or restart from zero) timing phases."""
+        self.disable_profiling()
+        self._profilers = [PhaseProfiler() for _ in self._profile_targets()]
+        self._wrap_targets()
+
+    def _wrap_targets(self) -> None:
+        for target, profiler in zip(self._profile_targets(), self._profilers, strict=True):
+            for phase, name in self._PROFILE_HOOKS.items():
+                # Bound class method, not a wrapper left by an earlier enable
+                method = getattr(type(target), name).__get__(target)
+                setattr(target, name, profiler.wrap(phase, method))
+
+    # The wrappers close over this object's bound methods: copies and pickles drop them,
+    # and a copy of a profiling env wraps its own methods with its copy of the stats
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        for name in self._PROFILE_HOOKS.values():
+            state.pop(name, None)
+        state["_profile_rewrap"] = "_profilers" in state and self.profiling
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        rewrap = state.pop("_profile_rewrap", False)
+        self.__dict__.update(state)
+        if rewrap:
+            self._wrap_targets()
+
+    def disable_profiling(self) -> None:
+        """Remove the wrappers; collected stats stay readable until the next enable."""
+        for target in self._profile_targets():
+            for name in self._PROFILE_HOOKS.values():
+                target.__dict__.pop(name, None)
+
+    @property
+    def profiling(self) -> bool:
+        name = next(iter(self._PROFILE_HOOKS.values()))
+        return name in self.__dict__
+
+    def profile_report(self) -> ProfileReport:
+        """Stats since profiling was last enabled (empty if it never was)."""
+        return ProfileReport.merge(p.report() for p in getattr(self, "_profilers", []))
+
+
+class profile:
+    """Context manager: profile `envs` (Column Popper envs, their wrappers, or a
+    `SyncVectorEnv` of them) for the duration of the block.
+
+    `report()` merges every env's stats, also after the block. With `path`, the merged
+    report is written there as JSON on exit.
+    """
+
+    def __init__(self, *envs: Any, path: str | Path | None = None) -> None:
+        self.envs = [t for env in envs for t in env_targets(env, "enable_profiling", "profiling")]
+        self.path = path
+        self._final: ProfileReport | None = None
+
+    def __enter__(self) -> profile:
+        self._final = None
+        for env in self.envs:
+            env.enable_profiling()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._final = self.report()
+        for env in self.envs:
+            env.disable_profiling()
+        if self.path is not None:
+            self._final.write(self.path)
+
+    def report(self) -> ProfileReport:
+        if self._final is not None:
+            return self._final
+        return ProfileReport.merge(env.profile_report() for env in self.envs)
+
+
+__all__ = ["PHASES", "PhaseProfiler", "ProfileReport", "ProfilingMixin", "profile"]
@@ -0,0 +1,60 @@
+"""Immutable env snapshots for planning and branching.
+
+`ColumnPopperEnv.get_state()` returns an `EnvState` and `set_state()` restores it into any
+env with the same board backend and spawn mode. Snapshots hold only immutable values
+(bytes, tuples, numbers and a shared, never-mutated spawn block), so taking one never
+copies more than the board cells and one snapshot may be restored any number of times.
+
+`VectorColumnPopperEnv.get_state()` returns a `VectorEnvState` of read-only array copies
+for a subset of envs; a one-env state can be broadcast into many envs to branch it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+import numpy as np
+
+
+class EnvState(NamedTuple):
+    # A NamedTuple rather than a frozen dataclass: construction is ~6x cheaper, which
+    # matters when a search takes a snapshot per node
+    board_backend: str
+    board: tuple[Any, ...]  # backend-specific cells, occupancy index and spawn position
+    selection: tuple[int, int]
+    sel_pos: tuple[int, int]  # [row, col], -1 when nothing is held
+    score: float
+    schedule: tuple[float, float, float, float]  # elapsed, time_left, interval, accumulator
+    terminated: bool
+    seed: int | None
+
+
+@dataclass(frozen=True)
+class VectorEnvState:
+    boards: np.ndarray  # (K, H, W) int32
+    selection: np.ndarray  # (K, 2)
+    sel_pos: np.ndarray  # (K, 2) [row, col]
+    score: np.ndarray
+    elapsed: np.ndarray
+    time_left: np.ndarray
+    fall_interval: np.ndarray
+    accum: np.ndarray
+    needs_reset: np.ndarray
+    words: np.ndarray  # (K, 2 * block) buffered PCG64 outputs as 32-bit words
+    cursor: np.ndarray  # index of the next word in `words`
+    rng_states: tuple[Any, ...]  # generator state after each env's last refill
+    seeds: tuple[int | None, ...]
+
+    @property
+    def num_envs(self) -> int:
+        return int(self.boards.shape[0])
+
+
+def freeze(array: np.ndarray) -> np.ndarray:
+    """Mark a freshly copied array read-only and return it."""
+    array.flags.writeable = False
+    return array
+
+
+__all__ = ["EnvState", "VectorEnvState", "freeze"]
@@ -0,0 +1,779 @@
+from __future__ import annotations
+
+import copy as _copy
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from ..core.bitboard import pack_board, unpack_board
+from ..core.board import Board
+from ..core.schedule import DEFAULT_CURVE, SIM_DT, compile_schedule, stack_timelines
+from ..core.spawn import spawn_tables
+from ..core.tables import PopTable
+from ..rewards.presets import RewardPreset, get_preset
+from .events import (
+    DROPS,
+    EVENTS,
+    INVALID_DROPS,
+    INVALID_PICKS,
+    MANUAL_FALLS,
+    OVERFLOWS,
+    PICKS,
+    POPS,
+    SCHEDULED_FALLS,
+    STEPS,
+    TRUNCATIONS,
+    EventCounts,
+)
+from .profiling import ProfilingMixin
+from .state import VectorEnvState, freeze
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+# Raw 64-bit PCG64 outputs buffered per env; each one yields two 32-bit words
+_RAW_BLOCK = 512
+# Refill before a fall tick could run past the end of the buffer (3 words + rejections)
+_RAW_MARGIN = 8
+# Per-env state arrays and lists; threaded shards hold views of these (see `_make_shards`)
+_ENV_ARRAYS = (
+    "boards",
+    "selection",
+    "sel_pos",
+    "score",
+    "elapsed",
+    "time_left",
+    "fall_interval",
+    "_accum",
+    "_sched_step",
+    "_curve_id",
+    "_curve_base",
+    "_needs_reset",
+    "_words",
+    "_cursor",
+    "_start_board",
+    "_start_words",
+    "_start_cursor",
+    "_events",
+    "_events_finished",
+    "_events_abandoned",
+    "_episodes_finished",
+)
+_ENV_LISTS = ("_seeds", "_bitgens", "_rng_state", "_start_seed", "_start_state")
+
+
+class _ListView:
+    """Index-shifted window onto a list, so a shard shares its parent's per-env lists."""
+
+    __slots__ = ("_items", "_offset")
+
+    def __init__(self, items: list[Any], offset: int) -> None:
+        self._items = items
+        self._offset = offset
+
+    def __getitem__(self, i: int) -> Any:
+        return self._items[self._offset + i]
+
+    def __setitem__(self, i: int, value: Any) -> None:
+        self._items[self._offset + i] = value
+
+
+class VectorColumnPopperEnv(ProfilingMixin, VectorEnv[dict[str, Any], np.ndarray, np.ndarray]):
+    """Natively batched Column Popper: N boards stepped with NumPy masks.
+
+    All boards live in one `(N, 12, 3)` array alongside `(N, 2)` selection, selected
+    position, score and schedule accumulators. Each env draws spawn values from its own
+    PCG64 stream exactly like `Board.spawn_value_for_column` does in its default `compat`
+    spawn mode (stream `pcg64-choice-v1`, see `core.spawn`), so env `i` reproduces a
+    `ColumnPopperEnv` seeded with `seeds[i]` bit-for-bit.
+
+    Time always advances in simulated mode (0.1s per step), read from precomputed fall
+    timelines (see `core.schedule`); `schedule_curves` gives each env its own curve.
+    Finished envs are reset on
+    the following `step()` call (Gymnasium's next-step autoreset): the action for that
+    env is ignored and the reset observation is returned with zero reward.
+
+    With `num_threads > 1`, `step()` splits the envs into contiguous shards, one per
+    thread, each stepping its slice of the shared arrays (and copying its slice of the
+    observation). NumPy releases the GIL inside large array operations, so this only pays
+    off once shards hold a few thousand boards; results are identical to one thread.
+    With profiling, each shard keeps its own phase stats (merged in `profile_report()`)
+    and the parent's `step` phase includes waiting for the shards.
+
+    `event_counts()` sums the per-env game-event counters (see `envs.events`) over all
+    envs; the ignored step of an autoreset is not counted.
+    """
+
+    metadata = {"render_modes": [], "autoreset_mode": AutoresetMode.NEXT_STEP}
+    # Phase -> method timed when profiling is enabled (see `envs.profiling`)
+    _PROFILE_HOOKS = {
+        "reset": "_reset_envs",
+        "step": "step",
+        "action": "_step_core",
+        "pop": "_pop_triples",
+        "schedule": "_advance_schedule",
+        "fall": "_fall_tick",
+        "obs": "_obs",
+        "info": "_info",
+    }
+
+    def __init__(
+        self,
+        num_envs: int,
+        *,
+        seed: int | Sequence[int | None] | None = None,
+        game_duration: float = 60.0,
+        strict_invalid: bool = False,
+        include_time_left_norm: bool = False,
+        reward_preset: RewardPreset | None = None,
+        initial_fall_interval: float = 3.0,
+        schedule_curve: list[tuple[float, float]] | None = None,
+        schedule_curves: Sequence[list[tuple[float, float]]] | None = None,
+        copy: bool = True,
+        use_pop_table: bool = False,
+        num_threads: int = 1,
+        profile: bool = False,
+    ) -> None:
+        if num_envs < 1:
+            raise ValueError("num_envs must be >= 1")
+        if num_threads < 1:
+            raise ValueError("num_threads must be >= 1")
+        self.num_envs = int(num_envs)
+        self.strict_invalid = strict_invalid
+        self.game_duration = float(game_duration)
+        self.include_time_left_norm = include_time_left_norm
+        self.rewards = reward_preset or get_preset("default")
+        self.copy = copy
+        self._initial_fall_interval = float(initial_fall_interval)
+        self._seeds = self._expand_seeds(seed)
+        curves = self._expand_curves(schedule_curve, schedule_curves)
+
+        ref = Board()
+        self.height, self.width = ref.height, ref.width
+        self._spawn_values, self._spawn_sizes = spawn_tables(ref.number_pool)
+        # Optional table-driven pops over packed column codes (see core.tables)
+        self._pop_table = PopTable.load(ref.height) if use_pop_table else None
+
+        n, h, w = self.num_envs, self.height, self.width
+        self.boards = np.zeros((n, h, w), dtype=np.int32)
+        self.selection = np.zeros((n, 2), dtype=np.int32)
+        self.sel_pos = np.full((n, 2), -1, dtype=np.int32)  # [row, col]
+        self.score = np.zeros((n,), dtype=np.float64)
+        self.elapsed = np.zeros((n,), dtype=np.float64)
+        self.time_left = np.zeros((n,), dtype=np.float64)
+        self.fall_interval = np.zeros((n,), dtype=np.float64)
+        self._accum = np.zeros((n,), dtype=np.float64)
+        # Schedule state is row `_sched_step[i]` of timeline `_curve_id[i]`
+        keys = sorted(set(curves))
+        self._timelines = stack_timelines(
+            [
+                compile_schedule(self.game_duration, self._initial_fall_interval, key).timeline(
+                    SIM_DT
+                )
+                for key in keys
+            ]
+        )
+        self._curve_id = np.array([keys.index(c) for c in curves], dtype=np.intp)
+        # Offset of each env's curve in the flattened per-curve timeline columns
+        self._curve_base = self._curve_id * self._timelines.falls.shape[1]
+        self._sched_step = np.zeros((n,), dtype=np.intp)
+        self._needs_reset = np.zeros((n,), dtype=bool)
+        self._rows = np.arange(n)
+
+        # Spawn word streams: each PCG64 output split into its low and high 32-bit words,
+        # in the order `Generator.choice` consumes them. `_rng_state[i]` is env i's
+        # generator state right after its last block draw; a `None` bit generator is
+        # rebuilt from it on the next refill.
+        self._bitgens: list[np.random.PCG64 | None] = [None] * n
+        self._rng_state: list[Any] = [None] * n
+        self._words = np.zeros((n, 2 * _RAW_BLOCK), dtype=np.uint32)
+        self._cursor = np.zeros((n,), dtype=np.int64)  # index of the next word in _words
+        self._word_limit = 2 * (_RAW_BLOCK - _RAW_MARGIN)
+        # Lemire rejection threshold of the candidate count per avoided value
+        self._spawn_thresholds = (np.uint64(1 << 32) - self._spawn_sizes) % self._spawn_sizes
+        self._col_offsets = np.arange(w)
+        self._pop_pos = np.arange(h - 2)
+        # Base reward per action outcome: invalid pick, valid pick/drop, full drop, manual
+        rw = self.rewards
+        self._base_reward = np.array(
+            [
+                rw.step_cost,
+                rw.step_cost + rw.valid_action,
+                rw.step_cost + rw.invalid_full_drop,
+                rw.step_cost + rw.valid_action + rw.manual_fall_bonus,
+            ]
+        )
+        # Post-reset snapshot per seeded env: autoreset replays the same seed, so the
+        # initial board and word block are copied instead of re-seeding PCG64
+        self._start_seed: list[int | None] = [None] * n
+        self._start_state: list[Any] = [None] * n
+        self._start_board = np.zeros((n, h, w), dtype=np.int32)
+        self._start_words = np.zeros((n, 2 * _RAW_BLOCK), dtype=np.uint32)
+        self._start_cursor = np.zeros((n,), dtype=np.int64)
+        # Game-event counters per env (see `envs.events`), as in `ColumnPopperEnv`
+        self._events = np.zeros((n, len(EVENTS)), dtype=np.int64)
+        self._events_finished = np.zeros((n, len(EVENTS)), dtype=np.int64)
+        self._events_abandoned = np.zeros((n, len(EVENTS)), dtype=np.int64)
+        self._episodes_finished = np.zeros((n,), dtype=np.int64)
+
+        single_spaces: dict[str, spaces.Space[Any]] = {
+            "board": spaces.Box(low=0, high=9, shape=(h, w), dtype=np.int32),
+            "selection": spaces.Box(low=0, high=9, shape=(2,), dtype=np.int32),
+            "sel_pos": spaces.Box(
+                low=np.array([-1, -1], dtype=np.int32),
+                high=np.array([h - 1, w - 1], dtype=np.int32),
+                dtype=np.int32,
+            ),
+        }
+        if include_time_left_norm:
+            single_spaces["time_left_norm"] = spaces.Box(
+                low=0.0, high=1.0, shape=(1,), dtype=np.float32
+            )
+        self.single_observation_space = spaces.Dict(single_spaces)
+        self.single_action_space = spaces.Discrete(4)
+        self.observation_space = batch_space(self.single_observation_space, n)
+        self.action_space = batch_space(self.single_action_space, n)
+
+        self.num_threads = min(int(num_threads), n)
+        self._lo, self._hi = 0, n  # slice of the parent env this one covers
+        self._shards: list[VectorColumnPopperEnv] = []
+        self._pool: ThreadPoolExecutor | None = None
+        if self.num_threads > 1:
+            self._shards = self._make_shards(self.num_threads)
+            self._pool = ThreadPoolExecutor(self.num_threads, thread_name_prefix="column_popper")
+        if profile:
+            self.enable_profiling()
+
+    def _profile_targets(self) -> list[Any]:
+        return [self, *self._shards]
+
+    def _make_shards(self, k: int) -> list[VectorColumnPopperEnv]:
+        """Split into `k` shards whose per-env state are views of this env's arrays."""
+        bounds = np.linspace(0, self.num_envs, k + 1).astype(int)
+        shards = []
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist(), strict=True):
+            shard = _copy.copy(self)
+            shard.num_envs = hi - lo
+            shard._rows = np.arange(hi - lo)
+            shard._lo, shard._hi = lo, hi
+            shard._shards, shard._pool = [], None
+            for name in _ENV_ARRAYS:
+                setattr(shard, name, getattr(self, name)[lo:hi])
+            for name in _ENV_LISTS:
+                setattr(shard, name, _ListView(getattr(self, name), lo))
+            shards.append(shard)
+        return shards
+
+    def _expand_curves(
+        self,
+        curve: list[tuple[float, float]] | None,
+        curves: Sequence[list[tuple[float, float]]] | None,
+    ) -> list[tuple[tuple[float, float], ...]]:
+        # An empty or missing curve means the default ramp, as in `ColumnPopperEnv`
+        if curves is None:
+            return [tuple(curve or DEFAULT_CURVE)] * self.num_envs
+        if curve is not None:
+            raise ValueError("Pass schedule_curve or schedule_curves, not both")
+        if len(curves) != self.num_envs:
+            raise ValueError(f"Expected {self.num_envs} schedule curves, got {len(curves)}")
+        return [tuple(c or DEFAULT_CURVE) for c in curves]
+
+    def _expand_seeds(self, seed: int | Sequence[int | None] | None) -> list[int | None]:
+        if seed is None:
+            return [None] * self.num_envs
+        if isinstance(seed, (int, np.integer)):
+            return [int(seed) + i for i in range(self.num_envs)]
+        seeds = list(seed)
+        if len(seeds) != self.num_envs:
+            raise ValueError(f"Expected {self.num_envs} seeds, got {len(seeds)}")
+        return [None if s is None else int(s) for s in seeds]
+
+    # Gym vector API
+    def reset(
+        self,
+        *,
+        seed: int | Sequence[int | None] | None = None,
+        options: dict[str, Any] | None = None,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        if seed is not None:
+            # In place: threaded shards hold views of this list
+            self._seeds[:] = self._expand_seeds(seed)
+        mask = None if options is None else options.get("reset_mask")
+        if mask is None:
+            idx = self._rows
+        else:
+            idx = np.flatnonzero(np.asarray(mask, dtype=bool))
+        # Steps of the episodes cut short here
+        self._events_abandoned[idx] += self._events[idx]
+        self._events[idx] = 0
+        self._reset_envs(idx)
+        return self._obs(), self._info(np.zeros((self.num_envs,), dtype=np.int64))
+
+    def step(
+        self, actions: np.ndarray
+    ) -> tuple[dict[str, Any], np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Expected actions of shape ({self.num_envs},)")
+        # Negative actions wrap around to huge unsigned values
+        if (actions.view(np.uint64) > 3).any():
+            raise ValueError("Actions must be in [0, 3]")
+        if self._pool is not None:
+            return self._step_threaded(actions)
+        reward, terminated, truncated, pops = self._step_core(actions)
+        return self._obs(), reward, terminated, truncated, self._info(pops)
+
+    def _step_threaded(
+        self, actions: np.ndarray
+    ) -> tuple[dict[str, Any], np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        n = self.num_envs
+        reward = np.empty((n,), dtype=np.float64)
+        terminated = np.empty((n,), dtype=bool)
+        truncated = np.empty((n,), dtype=bool)
+        pops = np.empty((n,), dtype=np.int64)
+        # Each thread copies its slice of the observation into these
+        out = {k: np.empty_like(v) for k, v in self._obs_views().items()} if self.copy else {}
+
+        def run(shard: VectorColumnPopperEnv) -> None:
+            lo, hi = shard._lo, shard._hi
+            res = shard._step_core(actions[lo:hi])
+            reward[lo:hi], terminated[lo:hi], truncated[lo:hi], pops[lo:hi] = res
+            if self.copy:
+                for k, v in shard._obs_views().items():
+                    out[k][lo:hi] = v
+
+        assert self._pool is not None
+        for future in [self._pool.submit(run, shard) for shard in self._shards]:
+            future.result()
+        if not self.copy:
+            out = self._obs_views()
+        return out, reward, terminated, truncated, self._info(pops)
+
+    def _step_core(
+        self, actions: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Advance every env by `actions`; returns (reward, terminated, truncated, pops).
+
+        Envs due for autoreset skip the step entirely (their results would be discarded)
+        and are reset at the end instead.
+        """
+        events = self._events
+        restarting = self._needs_reset
+        restart = np.flatnonzero(restarting)
+        live = ~restarting if restart.size else None
+
+        col_action = actions < 3
+        manual = ~col_action
+        if live is not None:
+            col_action &= live
+            manual &= live
+        pick, okp, okd, full, pops = self._apply_actions(actions, col_action)
+
+        # Outcome code 0..3 indexes `_base_reward`; the four outcomes are disjoint
+        outcome = (okp | okd).view(np.int8) + 2 * full.view(np.int8) + 3 * manual.view(np.int8)
+        reward = self._base_reward[outcome]
+        terminated = full & self.strict_invalid
+        if pops.any():
+            gained = np.flatnonzero(pops)
+            gain = self.rewards.pop_cell * pops[gained]
+            reward[gained] += gain
+            self.score[gained] += gain
+            events[gained, POPS] += pops[gained]
+
+        # Advance the schedule (0.1s per action), then apply manual or scheduled falls
+        falls = self._advance_schedule()
+        ticks = np.where(manual, 1, falls)
+        if live is not None:
+            ticks[restart] = 0
+        overflowed = self._apply_falls(ticks, manual)
+        if overflowed.size:
+            reward[overflowed] += self.rewards.overflow
+            terminated[overflowed] = True
+            events[overflowed, OVERFLOWS] += 1
+
+        truncated = self.time_left <= 0.0
+        truncated &= ~terminated
+        if live is not None:
+            truncated &= live
+        if truncated.any():
+            reward[truncated] += self.rewards.time_up
+            events[:, TRUNCATIONS] += truncated
+
+        events[:, STEPS] += 1 if live is None else live
+        events[:, PICKS] += okp
+        events[:, INVALID_PICKS] += pick ^ okp
+        events[:, DROPS] += okd
+        events[:, INVALID_DROPS] += full
+
+        # Next-step autoreset: envs that finished last call are reset instead of stepped
+        if restart.size:
+            self._reset_envs(restart)
+            reward[restart] = 0.0
+        done = terminated | truncated
+        self._count_events(done)
+        # In place: threaded shards hold views of this array
+        self._needs_reset[:] = done
+        return reward, terminated, truncated, pops
+
+    def _apply_actions(
+        self, actions: np.ndarray, col_action: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Picks and drops of the `col_action` envs on column `actions[i]`.
+
+        Returns masks of attempted picks, valid picks, valid drops and drops into a full
+        column, and the cells popped per env.
+        """
+        boards, selection, sel_pos = self.boards, self.selection, self.sel_pos
+        h, w = self.height, self.width
+        pops = np.zeros((self.num_envs,), dtype=np.int64)
+        cols = np.minimum(actions, w - 1)
+        occupied = boards[self._rows, :, cols] != 0
+        selected = selection[:, 0] != 0
+        pick = col_action & ~selected
+        drop = col_action & selected
+        # A drop back into its own column first lifts the held cell out of it
+        src_r, src_c = sel_pos[:, 0], sel_pos[:, 1]
+        src_valid = (src_r >= 0) & (src_r < h)
+        same = np.flatnonzero(drop & (cols == src_c) & src_valid)
+        if same.size:
+            occupied[same, src_r[same]] = False
+        okp = pick & occupied.any(axis=1)
+        column_full = occupied.all(axis=1)
+        okd = drop & ~column_full
+        full = drop & column_full
+
+        # Drop: place the held value into the top-most empty cell of the target column
+        dropped = np.flatnonzero(okd)
+        if dropped.size:
+            c = cols[dropped]
+            top = occupied[dropped].argmin(axis=1)
+            r, sc = src_r[dropped], src_c[dropped]
+            lift = src_valid[dropped] & (sc >= 0) & (sc < w)
+            boards[dropped[lift], r[lift], sc[lift]] = 0
+            boards[dropped, top, c] = selection[dropped, 1]
+            selection[dropped] = 0
+            sel_pos[dropped] = -1
+            pops[dropped] = self._pop_triples(dropped, c)
+
+        # Pick: bottom-most occupied cell of the target column (not removed until drop)
+        picked = np.flatnonzero(okp)
+        if picked.size:
+            c = cols[picked]
+            bottom = (h - 1) - occupied[picked, ::-1].argmax(axis=1)
+            selection[picked, 0] = 1
+            selection[picked, 1] = boards[picked, bottom, c]
+            sel_pos[picked, 0] = bottom
+            sel_pos[picked, 1] = c
+        return pick, okp, okd, full, pops
+
+    def _apply_falls(self, ticks: np.ndarray, manual: np.ndarray) -> np.ndarray:
+        """Apply `ticks[i]` fall ticks to env `i`, stopping at overflow.
+
+        Counts the applied ticks as manual or scheduled falls and returns the indices of
+        the envs that overflowed.
+        """
+        idx = np.flatnonzero(ticks)
+        overflowed = [idx[:0]]
+        tick = 0
+        while idx.size:
+            over = self._fall_tick(idx)
+            kind = np.where(manual[idx], MANUAL_FALLS, SCHEDULED_FALLS)
+            self._events[idx, kind] += 1
+            tick += 1
+            if over.any():
+                overflowed.append(idx[over])
+                idx = idx[~over]
+            idx = idx[ticks[idx] > tick]
+        return overflowed[0] if len(overflowed) == 1 else np.concatenate(overflowed)
+
+    def _count_events(self, done: np.ndarray) -> None:
+        """Move the episode counters of `done` envs to the finished totals."""
+        if done.any():
+            self._events_finished[done] += self._events[done]
+            self._episodes_finished[done] += 1
+            self._events[done] = 0
+
+    def event_counts(self) -> EventCounts:
+        """Game-event counts of all envs since construction (see `envs.events`)."""
+        return EventCounts(
+            int(self._episodes_finished.sum()),
+            self._events_finished.sum(axis=0),
+            self._events_abandoned.sum(axis=0) + self._events.sum(axis=0),
+        )
+
+    def get_state(self, indices: Sequence[int] | np.ndarray | None = None) -> VectorEnvState:
+        """Immutable snapshot of the envs in `indices` (default: all), in that order."""
+        idx = self._rows if indices is None else np.asarray(indices, dtype=np.intp).reshape(-1)
+        rows = idx.tolist()
+        return VectorEnvState(
+            boards=freeze(self.boards[idx]),
+            selection=freeze(self.selection[idx]),
+            sel_pos=freeze(self.sel_pos[idx]),
+            score=freeze(self.score[idx]),
+            elapsed=freeze(self.elapsed[idx]),
+            time_left=freeze(self.time_left[idx]),
+            fall_interval=freeze(self.fall_interval[idx]),
+            accum=freeze(self._accum[idx]),
+            needs_reset=freeze(self._needs_reset[idx]),
+            words=freeze(self._words[idx]),
+            cursor=freeze(self._cursor[idx]),
+            rng_states=tuple(self._rng_state[i] for i in rows),
+            seeds=tuple(self._seeds[i] for i in rows),
+        )
+
+    def set_state(
+        self, state: VectorEnvState, indices: Sequence[int] | np.ndarray | None = None
+    ) -> None:
+        """Restore `state` into the envs in `indices` (default: all).
+
+        A one-env state is broadcast, so `set_state(env.get_state([i]))` branches env `i`
+        into every env. The next `step()` continues from the restored states.
+        """
+        idx = self._rows if indices is None else np.asarray(indices, dtype=np.intp).reshape(-1)
+        k = state.num_envs
+        if k != 1 and k != idx.size:
+            raise ValueError(f"State holds {k} envs, cannot restore into {idx.size}")
+        self.boards[idx] = state.boards
+        self.selection[idx] = state.selection
+        self.sel_pos[idx] = state.sel_pos
+        self.score[idx] = state.score
+        self.elapsed[idx] = state.elapsed
+        self.time_left[idx] = state.time_left
+        self.fall_interval[idx] = state.fall_interval
+        self._accum[idx] = state.accum
+        steps = np.searchsorted(self._timelines.elapsed, state.elapsed)
+        self._sched_step[idx] = np.minimum(steps, self._timelines.last_step)
+        self._needs_reset[idx] = state.needs_reset
+        self._words[idx] = state.words
+        self._cursor[idx] = state.cursor
+        for j, i in enumerate(idx.tolist()):
+            src = 0 if k == 1 else j
+            self._rng_state[i] = state.rng_states[src]
+            self._bitgens[i] = None
+            self._seeds[i] = state.seeds[src]
+
+    def close_extras(self, **kwargs: Any) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self._shards = []
+        self._bitgens = []
+
+    # Helpers
+    def _obs(self) -> dict[str, Any]:
+        obs = self._obs_views()
+        if self.copy:
+            obs = {k: np.array(v, copy=True) for k, v in obs.items()}
+        return obs
+
+    def _obs_views(self) -> dict[str, Any]:
+        obs: dict[str, Any] = {
+            "board": self.boards,
+            "selection": self.selection,
+        }
+        if self.include_time_left_norm:
+            norm = np.clip(self.time_left / self.game_duration, 0.0, 1.0)
+            obs["time_left_norm"] = norm.astype(np.float32).reshape(self.num_envs, 1)
+        obs["sel_pos"] = self.sel_pos
+        return obs
+
+    def _info(self, pops: np.ndarray) -> dict[str, Any]:
+        return {
+            "score": self.score.copy(),
+            "time_left": np.maximum(0.0, self.time_left),
+            "pops_this_step": pops,
+            "fall_interval": self.fall_interval.copy(),
+        }
+
+    def _reset_envs(self, idx: np.ndarray) -> None:
+        if idx.size == 0:
+            return
+        self.selection[idx] = 0
+        self.sel_pos[idx] = -1
+        self.score[idx] = 0.0
+        self.elapsed[idx] = 0.0
+        self.time_left[idx] = self.game_duration
+        self.fall_interval[idx] = self._initial_fall_interval
+        self._accum[idx] = 0.0
+        self._sched_step[idx] = 0
+        self._needs_reset[idx] = False
+
+        cached = np.array(
+            [
+                self._seeds[i] is not None and self._start_seed[i] == self._seeds[i]
+                for i in idx.tolist()
+            ],
+            dtype=bool,
+        )
+        hit = idx[cached]
+        if hit.size:
+            self.boards[hit] = self._start_board[hit]
+            self._words[hit] = self._start_words[hit]
+            self._cursor[hit] = self._start_cursor[hit]
+            for i in hit.tolist():
+                self._bitgens[i] = None
+                self._rng_state[i] = self._start_state[i]
+
+        fresh = idx[~cached]
+        if fresh.size == 0:
+            return
+        self.boards[fresh] = 0
+        for i in fresh.tolist():
+            bitgen = np.random.PCG64(self._seeds[i])
+            self._bitgens[i] = bitgen
+            self._words[i] = _split_words(bitgen.random_raw(self._words.shape[1] // 2))
+            self._rng_state[i] = bitgen.state
+            self._cursor[i] = 0
+        # Ensure first row is visible
+        self._fall_tick(fresh)
+        for i in fresh.tolist():
+            seed = self._seeds[i]
+            self._start_seed[i] = seed
+            if seed is None:
+                continue
+            self._start_state[i] = self._rng_state[i]
+            self._start_board[i] = self.boards[i]
+            self._start_words[i] = self._words[i]
+            self._start_cursor[i] = self._cursor[i]
+
+    def _advance_schedule(self) -> np.ndarray:
+        """Advance every env one step along its timeline and return its fall counts.
+
+        Steps past the end of the table (only reachable by envs stepped again after
+        time-up, whose results autoreset discards) repeat the last row.
+        """
+        tl = self._timelines
+        step = self._sched_step
+        np.add(step, 1, out=step)
+        np.minimum(step, tl.last_step, out=step)
+        # Indices are in range; "clip" lets `take` write into `out` without a buffer
+        np.take(tl.elapsed, step, out=self.elapsed, mode="clip")
+        np.take(tl.time_left, step, out=self.time_left, mode="clip")
+        flat = self._curve_base + step
+        np.take(tl.fall_interval, flat, out=self.fall_interval, mode="clip")
+        np.take(tl.accum, flat, out=self._accum, mode="clip")
+        falls: np.ndarray = np.take(tl.falls, flat, mode="clip")
+        return falls
+
+    def _fall_tick(self, idx: np.ndarray) -> np.ndarray:
+        """Shift the boards in `idx` down one row and spawn a new top row.
+
+        Returns a boolean array (aligned with `idx`) flagging overflow.
+        """
+        whole = idx.size == self.num_envs
+        sub = self.boards if whole else self.boards[idx]
+        overflow: np.ndarray = (sub[:, -1, :] != 0).any(axis=1)
+        sub[:, 1:, :] = sub[:, :-1, :]
+        below = sub[:, 1, :]
+        # A value repeated in the two cells below the spawn is avoided (0 = nothing)
+        avoid = below * (below == sub[:, 2, :])
+        sub[:, 0, :] = self._spawn_values[avoid, self._draw_spawns(idx, avoid)]
+        if not whole:
+            self.boards[idx] = sub
+
+        rows = self.sel_pos[idx, 0]
+        held = (rows >= 0) & (self.sel_pos[idx, 1] >= 0)
+        if held.any():
+            self.sel_pos[idx, 0] = np.where(held, np.minimum(rows + 1, self.height - 1), rows)
+        return overflow
+
+    def _draw_spawns(self, idx: np.ndarray, avoid: np.ndarray) -> np.ndarray:
+        """Candidate index per column for the boards in `idx` (shape of `avoid`).
+
+        Each column draws in [0, n) via Lemire's method on the env's next 32-bit word,
+        columns left to right. All columns are drawn at once from consecutive words; the
+        envs with a rejected word (probability about 2**-32 each) redo their columns one
+        word at a time, so every env consumes its stream exactly as `Generator.choice`.
+        """
+        cursor = self._cursor
+        pos = cursor[idx]
+        low = pos >= self._word_limit
+        if low.any():
+            for i in idx[low].tolist():
+                self._refill(i)
+            pos = cursor[idx]
+        n = self._spawn_sizes[avoid]
+        m = self._words[idx[:, None], pos[:, None] + self._col_offsets] * n
+        threshold = self._spawn_thresholds[avoid]
+        reject = (m & _MASK32) < threshold
+        choice: np.ndarray = (m >> np.uint64(32)).astype(np.intp)
+        cursor[idx] = pos + self.width
+        if reject.any():
+            for j in np.flatnonzero(reject.any(axis=1)).tolist():
+                i, at = int(idx[j]), int(pos[j])
+                for col in range(self.width):
+                    size, low = int(n[j, col]), int(threshold[j, col])
+                    while True:
+                        word = int(self._words[i, at]) * size
+                        at += 1
+                        if (word & 0xFFFFFFFF) >= low:
+                            break
+                    choice[j, col] = word >> 32
+                cursor[i] = at
+        return choice
+
+    def _refill(self, i: int) -> None:
+        """Drop env `i`'s consumed raw outputs and append fresh ones from its generator."""
+        start = int(self._cursor[i]) >> 1
+        keep = self._words.shape[1] - 2 * start
+        self._words[i, :keep] = self._words[i, 2 * start :]
+        bitgen = self._bitgen(i)
+        self._words[i, keep:] = _split_words(bitgen.random_raw(start))
+        self._rng_state[i] = bitgen.state
+        self._cursor[i] &= 1
+
+    def _bitgen(self, i: int) -> np.random.PCG64:
+        bitgen = self._bitgens[i]
+        if bitgen is None:
+            bitgen = np.random.PCG64(0)
+            bitgen.state = self._rng_state[i]
+            self._bitgens[i] = bitgen
+        return bitgen
+
+    def _pop_triples(self, idx: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Vectorized `Board.pop_triples_in_column` on column `cols[j]` of board `idx[j]`."""
+        column = self.boards[idx, :, cols]
+        if self._pop_table is not None:
+            codes = pack_board(column[:, :, None])[:, 0]
+            new_codes, popped = self._pop_table.pop_codes(codes)
+            hit = popped > 0
+            if hit.any():
+                cleared = unpack_board(new_codes[hit][:, None], self.height)[:, :, 0]
+                self.boards[idx[hit], :, cols[hit]] = cleared
+            return popped
+        v = column[:, :-2]
+        triple = (v != 0) & (v == column[:, 1:-1]) & (v == column[:, 2:])
+        popped = np.zeros((idx.size,), dtype=np.int64)
+        hits = np.flatnonzero(triple.any(axis=1))
+        if hits.size == 0:
+            return popped
+        # Greedy top-down scan: within a run of consecutive triple starts, every third
+        # one (counting from the run's first) pops, and the runs are at least 3 apart
+        triple = triple[hits]
+        first = triple.copy()
+        first[:, 1:] &= ~triple[:, :-1]
+        pos = self._pop_pos
+        run_start = np.maximum.accumulate(np.where(first, pos, 0), axis=1)
+        starts = triple & ((pos - run_start) % 3 == 0)
+        cleared = np.zeros((hits.size, self.height), dtype=bool)
+        for k in range(3):
+            cleared[:, k : k + starts.shape[1]] |= starts
+        column = column[hits]
+        column[cleared] = 0
+        self.boards[idx[hits], :, cols[hits]] = column
+        popped[hits] = 3 * starts.sum(axis=1)
+        return popped
+
+
+def _split_words(raw: np.ndarray) -> np.ndarray:
+    """32-bit words of PCG64 outputs, low half first."""
+    words = np.empty((2 * raw.size,), dtype=np.uint32)
+    words[0::2] = raw & _MASK32
+    words[1::2] = raw >> np.uint64(32)
+    return words
+
+
+__all__ = ["VectorColumnPopperEnv"]
@@ -0,0 +1,441 @@
+"""Seed-sweep policy evaluation.
+
+`evaluate(policy, seeds)` plays one episode per seed and returns an `EpisodeResult` per
+seed. Seeds are split into shards that run on a process pool (or in-process with
+`workers=0`). Each shard steps a `VectorColumnPopperEnv` of up to `batch` boards, so the
+policy is called once per step on a batch of observations; a finished board is reset with
+the shard's next seed. Env `i` of the vector env is bit-for-bit a `ColumnPopperEnv` with
+its seed, so a seed's result does not depend on the batch size or the sharding.
+
+A policy is a callable mapping a batched observation dict (leading env axis) to one action
+per env, or a string spec resolved in each worker by `load_policy`:
+
+- `"random"`: `hashed_random_policy`, pseudo-random but a pure function of the observation
+- `"package.module:name"`: an importable policy callable
+- a path to a saved stable-baselines3 model (`.zip`), queried with deterministic actions
+
+With a `cache_dir`, results are appended to a JSONL file named after the policy hash (its
+code and the state it reads, or an explicit `policy_version`) and the env config as shards
+finish, and a later run over the same policy and config only
+plays the seeds that file does not hold yet. `summarize` reports means, percentiles and
+95% confidence intervals.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import inspect
+import json
+import math
+import multiprocessing as mp
+import pickle
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .envs.vector_env import VectorColumnPopperEnv
+from .rewards.presets import get_preset
+from .version import __version__ as PKG_VERSION
+
+Policy = Callable[[dict[str, np.ndarray]], Any]
+PolicySpec = str | Policy
+PERCENTILES = (5, 25, 50, 75, 95)
+# Two-sided 95% normal quantile
+_Z95 = 1.959963984540054
+
+
+@dataclass(frozen=True)
+class EpisodeResult:
+    seed: int
+    score: float
+    length: int
+    total_reward: float
+    # With the default `strict_invalid=False` only an overflow terminates an episode
+    terminated: bool
+    truncated: bool
+
+
+def hashed_random_policy(obs: dict[str, np.ndarray]) -> np.ndarray:
+    """Uniform-looking actions that are a pure function of each observation.
+
+    Unlike a seeded generator this gives the same action for the same board wherever and
+    in whatever batch it is evaluated, which keeps results cacheable per seed.
+    """
+    board = obs["board"].reshape(len(obs["board"]), -1).astype(np.uint64)
+    weights = np.arange(1, board.shape[1] + 1, dtype=np.uint64) * np.uint64(0x9E3779B1)
+    h = (board * weights).sum(axis=1) + obs["selection"][:, 1].astype(np.uint64)
+    h ^= h >> np.uint64(13)
+    h *= np.uint64(0xC2B2AE35)
+    h ^= h >> np.uint64(16)
+    actions: np.ndarray = (h % np.uint64(4)).astype(np.int64)
+    return actions
+
+
+class _SB3Policy:
+    """Deterministic actions from a saved stable-baselines3 model."""
+
+    def __init__(self, path: str) -> None:
+        try:
+            from stable_baselines3 import PPO
+        except ImportError as e:  # pragma: no cover
+            raise RuntimeError(
+                "Evaluating a saved model needs stable-baselines3 "
+                "(pip install stable-baselines3[extra])"
+            ) from e
+        self.model = PPO.load(path, device="cpu")
+
+    def __call__(self, obs: dict[str, np.ndarray]) -> np.ndarray:
+        actions, _ = self.model.predict(obs, deterministic=True)
+        return np.asarray(actions)
+
+
+def _resolve(spec: str) -> Any:
+    if spec == "random":
+        return hashed_random_policy
+    module, sep, name = spec.partition(":")
+    if not sep:
+        raise ValueError(f"Policy spec {spec!r} is not 'random', 'module:name' or a .zip model")
+    obj: Any = importlib.import_module(module)
+    for part in name.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+@lru_cache(maxsize=8)
+def load_policy(spec: str) -> Policy:
+    """The policy callable for a string spec (loaded once per process)."""
+    if spec.endswith(".zip"):
+        return _SB3Policy(spec)
+    policy: Policy = _resolve(spec)
+    return policy
+
+
+def policy_hash(policy: PolicySpec, version: str | None = None) -> str:
+    """Identifies a policy for caching.
+
+    A saved model is identified by its file's bytes. A callable is identified by its name,
+    its source and the values it reads: defaults, closure cells, module globals, helper
+    functions of its own module, and the attributes of a callable object (arrays by
+    content). `version` replaces all but the name, e.g. for weights loaded at call time;
+    a callable holding state that cannot be hashed deterministically requires it.
+    """
+    if isinstance(policy, str) and policy.endswith(".zip"):
+        return hashlib.sha256(Path(policy).read_bytes()).hexdigest()[:16]
+    obj = _resolve(policy) if isinstance(policy, str) else policy
+    h = hashlib.sha256(_qualname(obj).encode())
+    if version is not None:
+        h.update(f"\nversion {version}".encode())
+    else:
+        func = obj.func if isinstance(obj, partial) else obj
+        _hash_value(h, obj, getattr(func, "__module__", None), set())
+    return h.hexdigest()[:16]
+
+
+def _qualname(obj: Any) -> str:
+    return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', type(obj).__name__)}"
+
+
+def _hash_source(h: Any, obj: Any) -> None:
+    try:
+        h.update(inspect.getsource(obj).encode())
+    except (OSError, TypeError):
+        pass
+
+
+def _hash_value(h: Any, value: Any, root: str | None, seen: set[int]) -> None:
+    """Feed `value` into `h`; code outside module `root` is identified by name only."""
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, np.ndarray):
+        h.update(f"ndarray:{value.dtype.str}{value.shape};".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple, set, frozenset, dict)):
+        _hash_container(h, value, root, seen)
+    elif id(value) in seen or _is_library_code(value, root):
+        h.update(f"ref:{_qualname(value)};".encode())
+    else:
+        seen.add(id(value))
+        _hash_object(h, value, root, seen)
+
+
+def _is_library_code(value: Any, root: str | None) -> bool:
+    if inspect.ismodule(value) or inspect.isbuiltin(value) or isinstance(value, np.ufunc):
+        return True
+    code = inspect.isfunction(value) or inspect.ismethod(value) or inspect.isclass(value)
+    return code and getattr(value, "__module__", None) != root
+
+
+def _hash_container(h: Any, value: Any, root: str | None, seen: set[int]) -> None:
+    h.update(f"{type(value).__name__}:{len(value)};".encode())
+    if isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            _hash_value(h, key, root, seen)
+            _hash_value(h, value[key], root, seen)
+        return
+    for item in sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value:
+        _hash_value(h, item, root, seen)
+
+
+def _hash_object(h: Any, value: Any, root: str | None, seen: set[int]) -> None:
+    if isinstance(value, partial):
+        h.update(b"partial;")
+        _hash_value(h, [value.func, value.args, value.keywords], root, seen)
+        return
+    if inspect.ismethod(value):
+        _hash_value(h, value.__self__, root, seen)
+        value = value.__func__
+    if inspect.isfunction(value):
+        h.update(f"function:{_qualname(value)};".encode())
+        _hash_source(h, value)
+        _hash_value(h, value.__defaults__, root, seen)
+        _hash_value(h, value.__kwdefaults__, root, seen)
+        _hash_value(h, [c.cell_contents for c in value.__closure__ or ()], root, seen)
+        names = _global_names(value.__code__) & value.__globals__.keys()
+        _hash_value(h, {n: value.__globals__[n] for n in names}, root, seen)
+    elif inspect.isclass(value):
+        h.update(f"class:{_qualname(value)};".encode())
+        _hash_source(h, value)
+    elif type(value).__module__ == root and hasattr(value, "__dict__"):
+        _hash_value(h, type(value), root, seen)
+        _hash_value(h, vars(value), root, seen)
+    else:
+        # Library objects (e.g. a model holding weights) are hashed by their pickle
+        try:
+            h.update(pickle.dumps(value, protocol=4))
+        except Exception as e:
+            raise ValueError(
+                f"Cannot hash policy state {_qualname(type(value))}; pass a policy version"
+            ) from e
+
+
+def _global_names(code: Any) -> set[str]:
+    """Global names read by `code` and the functions nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _global_names(const)
+    return names
+
+
+def config_hash(env_kwargs: dict[str, Any]) -> str:
+    """Identifies an env config (and package version) for caching."""
+    key = json.dumps({"version": PKG_VERSION, **env_kwargs}, sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _make_env(n: int, seeds: list[int], env_kwargs: dict[str, Any]) -> VectorColumnPopperEnv:
+    kwargs = dict(env_kwargs)
+    preset = kwargs.pop("reward_preset", None)
+    if preset is not None:
+        kwargs["reward_preset"] = get_preset(preset)
+    # JSON-friendly config: curves may arrive as lists of [time, interval] pairs
+    if kwargs.get("schedule_curve") is not None:
+        kwargs["schedule_curve"] = [(float(t), float(i)) for t, i in kwargs["schedule_curve"]]
+    return VectorColumnPopperEnv(n, seed=seeds, **kwargs)
+
+
+def run_seeds(
+    policy: Policy, seeds: Sequence[int], env_kwargs: dict[str, Any], batch: int = 64
+) -> Iterator[EpisodeResult]:
+    """Play one episode per seed, `batch` at a time; results come in completion order."""
+    seeds = [int(s) for s in seeds]
+    n = min(batch, len(seeds))
+    if n == 0:
+        return
+    env = _make_env(n, seeds[:n], env_kwargs)
+    try:
+        current = seeds[:n]
+        pending = iter(seeds[n:])
+        obs, _ = env.reset()
+        total = np.zeros((n,), dtype=np.float64)
+        length = np.zeros((n,), dtype=np.int64)
+        active = np.ones((n,), dtype=bool)
+        while active.any():
+            actions = np.asarray(policy(obs), dtype=np.int64).reshape(n)
+            obs, reward, terminated, truncated, info = env.step(np.where(active, actions, 0))
+            total += reward
+            length += 1
+            done = (terminated | truncated) & active
+            if not done.any():
+                continue
+            restart = np.zeros((n,), dtype=bool)
+            for i in np.flatnonzero(done).tolist():
+                yield EpisodeResult(
+                    seed=current[i],
+                    score=float(info["score"][i]),
+                    length=int(length[i]),
+                    total_reward=float(total[i]),
+                    terminated=bool(terminated[i]),
+                    truncated=bool(truncated[i]),
+                )
+                nxt = next(pending, None)
+                if nxt is None:
+                    active[i] = False
+                else:
+                    current[i] = nxt
+                    restart[i] = True
+            if restart.any():
+                obs, _ = env.reset(seed=current, options={"reset_mask": restart})
+                total[restart] = 0.0
+                length[restart] = 0
+    finally:
+        env.close()
+
+
+def _run_shard(
+    policy: PolicySpec, seeds: list[int], env_kwargs: dict[str, Any], batch: int
+) -> list[EpisodeResult]:
+    fn = load_policy(policy) if isinstance(policy, str) else policy
+    return list(run_seeds(fn, seeds, env_kwargs, batch))
+
+
+def _play(
+    policy: PolicySpec,
+    shards: list[list[int]],
+    env_kwargs: dict[str, Any],
+    batch: int,
+    workers: int,
+    context: str | None,
+) -> Iterator[list[EpisodeResult]]:
+    """Each shard's results, as shards finish."""
+    if workers <= 0:
+        for shard in shards:
+            yield _run_shard(policy, shard, env_kwargs, batch)
+        return
+    ctx: Any = mp.get_context(context)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(_run_shard, policy, shard, env_kwargs, batch) for shard in shards]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def cache_path(
+    cache_dir: str | Path,
+    policy: PolicySpec,
+    env_kwargs: dict[str, Any],
+    policy_version: str | None = None,
+) -> Path:
+    key = f"{policy_hash(policy, policy_version)}-{config_hash(env_kwargs)}"
+    return Path(cache_dir) / f"{key}.jsonl"
+
+
+def load_results(path: str | Path) -> dict[int, EpisodeResult]:
+    """Results recorded in a JSONL results file, by seed (a torn last line is skipped)."""
+    out: dict[int, EpisodeResult] = {}
+    path = Path(path)
+    if not path.exists():
+        return out
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = EpisodeResult(**json.loads(line))
+            except (ValueError, TypeError):
+                continue
+            out[result.seed] = result
+    return out
+
+
+def evaluate(
+    policy: PolicySpec,
+    seeds: Iterable[int],
+    *,
+    env_kwargs: dict[str, Any] | None = None,
+    workers: int = 0,
+    batch: int = 64,
+    shard_size: int | None = None,
+    cache_dir: str | Path | None = None,
+    policy_version: str | None = None,
+    context: str | None = None,
+    on_result: Callable[[EpisodeResult], None] | None = None,
+) -> list[EpisodeResult]:
+    """One `EpisodeResult` per seed, in the order of `seeds`.
+
+    `workers=0` plays every shard in this process. `shard_size` (default: enough shards
+    for four per worker, at least `batch` seeds each) is the number of seeds per pool task.
+    `on_result` sees each newly played episode as its shard finishes. `policy_version`
+    keys the cache instead of the policy's code and state (see `policy_hash`).
+    """
+    env_kwargs = dict(env_kwargs or {})
+    seeds = [int(s) for s in seeds]
+    done: dict[int, EpisodeResult] = {}
+    sink = None
+    if cache_dir is not None:
+        path = cache_path(cache_dir, policy, env_kwargs, policy_version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        done = load_results(path)
+        sink = open(path, "a", encoding="utf-8")
+    todo = list(dict.fromkeys(s for s in seeds if s not in done))
+    if shard_size is None:
+        shard_size = max(batch, math.ceil(len(todo) / max(1, 4 * workers)))
+    shards = [todo[i : i + shard_size] for i in range(0, len(todo), shard_size)]
+
+    try:
+        for results in _play(policy, shards, env_kwargs, batch, workers, context):
+            for r in results:
+                done[r.seed] = r
+                if on_result is not None:
+                    on_result(r)
+            if sink is not None:
+                sink.write("".join(json.dumps(asdict(r)) + "\n" for r in results))
+                sink.flush()
+    finally:
+        if sink is not None:
+            sink.close()
+    return [done[s] for s in seeds]
+
+
+def _stats(values: np.ndarray) -> dict[str, Any]:
+    n = len(values)
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if n > 1 else 0.0
+    half = _Z95 * std / math.sqrt(n)
+    out: dict[str, Any] = {"mean": mean, "std": std, "ci95": [mean - half, mean + half]}
+    for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES).tolist(), strict=True):
+        out[f"p{p}"] = float(v)
+    out["min"], out["max"] = float(values.min()), float(values.max())
+    return out
+
+
+def _rate(hits: int, n: int) -> dict[str, Any]:
+    # Wilson score interval: sensible even when the rate is 0 or 1
+    p = hits / n
+    denom = 1 + _Z95**2 / n
+    centre = (p + _Z95**2 / (2 * n)) / denom
+    half = _Z95 * math.sqrt(p * (1 - p) / n + _Z95**2 / (4 * n * n)) / denom
+    return {"rate": p, "ci95": [max(0.0, centre - half), min(1.0, centre + half)]}
+
+
+def summarize(results: Sequence[EpisodeResult]) -> dict[str, Any]:
+    """Mean, std, 95% CI (normal approximation) and percentiles of score, length and total
+    reward, plus overflow (terminated) and time-up (truncated) rates with Wilson 95% CIs."""
+    n = len(results)
+    if n == 0:
+        return {"episodes": 0}
+    return {
+        "episodes": n,
+        "score": _stats(np.array([r.score for r in results])),
+        "length": _stats(np.array([r.length for r in results], dtype=np.float64)),
+        "total_reward": _stats(np.array([r.total_reward for r in results])),
+        "overflow_rate": _rate(sum(r.terminated for r in results), n),
+        "truncation_rate": _rate(sum(r.truncated for r in results), n),
+    }
+
+
+__all__ = [
+    "EpisodeResult",
+    "cache_path",
+    "config_hash",
+    "evaluate",
+    "hashed_random_policy",
+    "load_policy",
+    "load_results",
+    "policy_hash",
+    "run_seeds",
+    "summarize",
+]
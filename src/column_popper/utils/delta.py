@@ -0,0 +1,110 @@
+"""Delta-encoded observations for JSONL output.
+
+Consecutive observations differ in a few board cells, so a delta stream sends the full
+observation only in keyframes and otherwise an `obs_delta` of what changed since the
+previous observation:
+
+- `board`: `[row, col, value]` for every changed cell (omitted when none changed)
+- any other obs field (`selection`, `sel_pos`, `time_left_norm`): its full new value, only
+  when it changed
+
+A keyframe (`obs`) starts every episode and follows every `keyframe_interval` deltas, so
+a reader can resynchronise without replaying from the episode start. `DeltaDecoder` is the
+reference decoder; `expand` turns a delta stream back into the plain one.
+"""
+
+from __future__ import annotations
+
+import copy
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+
+class DeltaEncoder:
+    """Chooses, per observation, between a keyframe and a delta against the previous one."""
+
+    def __init__(self, keyframe_interval: int = 100) -> None:
+        if keyframe_interval < 0:
+            raise ValueError("keyframe_interval must be >= 0")
+        # 0 = keyframes only at episode start
+        self.keyframe_interval = int(keyframe_interval)
+        self._prev: dict[str, list[Any]] | None = None
+        self._since = 0
+
+    def reset(self) -> None:
+        """Start a new episode: the next observation is a keyframe."""
+        self._prev = None
+
+    def encode(self, obs: dict[str, Any]) -> tuple[str, Any]:
+        """`("obs", obs)` for a keyframe, else `("obs_delta", delta)` with a JSON-ready delta."""
+        # Flat Python lists: comparing and diffing 36 cells is cheaper than in NumPy
+        flat = {k: v.ravel().tolist() for k, v in obs.items()}
+        prev = self._prev
+        self._prev = flat
+        interval = self.keyframe_interval
+        if prev is None or (interval and self._since >= interval):
+            self._since = 0
+            return "obs", obs
+        self._since += 1
+        delta: dict[str, Any] = {}
+        for key, values in flat.items():
+            before = prev[key]
+            if values == before:
+                continue
+            value = obs[key]
+            if key == "board":
+                w = value.shape[1]
+                delta[key] = [
+                    [i // w, i % w, v]
+                    for i, (v, b) in enumerate(zip(values, before, strict=True))
+                    if v != b
+                ]
+            else:
+                delta[key] = values if value.ndim == 1 else value.tolist()
+        return "obs_delta", delta
+
+
+class DeltaDecoder:
+    """Reference decoder: rebuilds each observation (as JSON lists) from `obs` / `obs_delta`."""
+
+    def __init__(self) -> None:
+        self.obs: dict[str, Any] | None = None
+
+    def update(self, msg: dict[str, Any]) -> dict[str, Any] | None:
+        """Apply the observation carried by `msg` (if any) and return the current one."""
+        if "obs" in msg:
+            self.obs = copy.deepcopy(msg["obs"])
+        elif "obs_delta" in msg:
+            if self.obs is None:
+                raise ValueError("obs_delta before any keyframe")
+            for key, value in msg["obs_delta"].items():
+                if key == "board":
+                    board = self.obs["board"]
+                    for r, c, v in value:
+                        board[r][c] = v
+                else:
+                    self.obs[key] = value
+        return self.obs
+
+
+def expand(messages: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Plain messages from a delta stream: `obs_delta` becomes `obs`, and a `step_request`
+    without an observation gets the `obs` and `info` of the message before it.
+    """
+    decoder = DeltaDecoder()
+    info: Any = None
+    for msg in messages:
+        if "obs_delta" in msg:
+            obs = decoder.update(msg)
+            msg = {k: v for k, v in msg.items() if k != "obs_delta"}
+            msg["obs"] = copy.deepcopy(obs)
+        elif "obs" in msg:
+            decoder.update(msg)
+        elif msg.get("type") == "step_request" and decoder.obs is not None:
+            msg = {**msg, "obs": copy.deepcopy(decoder.obs), "info": info}
+        if "info" in msg:
+            info = msg["info"]
+        yield msg
+
+
+__all__ = ["DeltaDecoder", "DeltaEncoder", "expand"]
@@ -0,0 +1,167 @@
+"""Fast JSONL framing for the rollout and stream CLIs.
+
+`encode_obs` produces exactly the text `json.dumps` gives for an observation converted
+with `.tolist()`, without building the nested lists: integer arrays such as the 12x3 board
+and the selection pairs fill one `%`-format template compiled per observation layout. `dumps`
+encodes the rest of a frame with `json.dumps` and appends such pre-encoded values, so a
+frame is byte-identical to `json.dumps` of its plain form.
+
+`BulkReader` serves `readline()` from large chunks of stdin and `FrameWriter` buffers
+output, flushing when its buffer passes a size cap or `flush_interval` seconds have gone by.
+`BulkReader` calls `on_wait` (usually `FrameWriter.flush`) before every read that may
+block, so an interactive client always sees the pending request before it has to answer.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any, TextIO
+
+import numpy as np
+
+READ_CHUNK = 1 << 16
+FLUSH_BYTES = 1 << 16
+
+
+def _float(x: float) -> str:
+    if math.isfinite(x):
+        return float.__repr__(x)
+    return json.dumps(x)
+
+
+def _template(shape: tuple[int, ...], item: str) -> str:
+    if not shape:
+        return item
+    inner = _template(shape[1:], item)
+    return "[" + ", ".join([inner] * shape[0]) + "]"
+
+
+@lru_cache(maxsize=256)
+def _key(name: str) -> str:
+    return json.dumps(name) + ": "
+
+
+@lru_cache(maxsize=64)
+def _obs_template(layout: tuple[tuple[str, str, tuple[int, ...]], ...]) -> str:
+    parts = []
+    for key, kind, shape in layout:
+        parts.append(_key(key) + _template(shape, "%d" if kind in "iu" else "%s"))
+    return "{" + ", ".join(parts) + "}"
+
+
+def encode_obs(obs: dict[str, Any]) -> str:
+    """`json.dumps` of an observation dict with its arrays converted by `.tolist()`."""
+    layout = []
+    values: list[Any] = []
+    for key, value in obs.items():
+        kind = value.dtype.kind if isinstance(value, np.ndarray) else ""
+        if kind in ("i", "u") and value.size:
+            values.extend(value.ravel().tolist())
+        elif kind == "f" and value.size:
+            values.extend([_float(x) for x in value.ravel().tolist()])
+        else:
+            return json.dumps(
+                {k: v.tolist() if hasattr(v, "tolist") else v for k, v in obs.items()}
+            )
+        layout.append((key, kind, value.shape))
+    return _obs_template(tuple(layout)) % tuple(values)
+
+
+def dumps(msg: dict[str, Any], **encoded: str) -> str:
+    """`json.dumps({**msg, **decoded})`, where `encoded` maps further keys to JSON text.
+
+    The JSON text (e.g. from `encode_obs`) is inserted as-is, after the keys of `msg`.
+    """
+    if not encoded:
+        return json.dumps(msg)
+    tail = ", ".join([_key(k) + v for k, v in encoded.items()])
+    if not msg:
+        return "{" + tail + "}"
+    return json.dumps(msg)[:-1] + ", " + tail + "}"
+
+
+class BulkReader:
+    """`readline()` over a text stream, reading it in large chunks.
+
+    Lines are split on `\\n` (a trailing `\\r` stays in the line, as callers strip it).
+    After end of input `readline()` returns `""`, like a text file.
+    """
+
+    def __init__(self, stream: TextIO, on_wait: Callable[[], None] | None = None) -> None:
+        self._stream = stream
+        self._raw: Any = getattr(stream, "buffer", None)
+        self._on_wait = on_wait
+        self._lines: deque[str] = deque()
+        self._tail = b""
+        self._eof = False
+
+    def readline(self) -> str:
+        lines = self._lines
+        while not lines and not self._eof:
+            if self._on_wait is not None:
+                self._on_wait()
+            self._fill()
+        return lines.popleft() if lines else ""
+
+    def buffered(self, limit: int) -> list[str]:
+        """Up to `limit` complete lines that have already been read; never blocks."""
+        lines = self._lines
+        return [lines.popleft() for _ in range(min(limit, len(lines)))]
+
+    def _fill(self) -> None:
+        if self._raw is not None:
+            # read1 returns whatever is available, blocking only when nothing is
+            chunk = self._raw.read1(READ_CHUNK)
+            data = self._tail + chunk
+            if not chunk:
+                self._eof = True
+                self._tail = b""
+                if data:
+                    self._lines.append(data.decode("utf-8", "replace"))
+                return
+            head, sep, self._tail = data.rpartition(b"\n")
+            if sep:
+                text = head.decode("utf-8", "replace")
+                self._lines.extend(line + "\n" for line in text.split("\n"))
+            return
+        chunk_lines = self._stream.readlines(READ_CHUNK)
+        if not chunk_lines:
+            self._eof = True
+            return
+        self._lines.extend(chunk_lines)
+
+
+class FrameWriter:
+    """Buffered line writer; a write flushes once `flush_interval` seconds have passed.
+
+    `flush_interval=0` flushes after every write.
+    """
+
+    def __init__(self, stream: TextIO, flush_interval: float = 0.05) -> None:
+        self._stream = stream
+        self._interval = float(flush_interval)
+        self._parts: list[str] = []
+        self._size = 0
+        self._last = time.monotonic()
+
+    def write(self, line: str) -> None:
+        self._parts.append(line)
+        self._size += len(line)
+        if self._size >= FLUSH_BYTES or time.monotonic() - self._last >= self._interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            self._stream.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+        self._stream.flush()
+        self._last = time.monotonic()
+
+
+__all__ = ["BulkReader", "FrameWriter", "dumps", "encode_obs"]
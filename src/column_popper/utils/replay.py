@@ -0,0 +1,306 @@
+"""Compact binary replay logs.
+
+An episode is fully determined by its seed, the env configuration and the action sequence,
+so a replay stores only those (plus optional per-step state digests for verification)
+instead of full observation frames.
+
+File layout (little-endian)::
+
+    b"CPRL"  u8 format version  u32 header length  header (UTF-8 JSON)
+    episode records, each:
+        i64 seed  u8 flags  u32 steps
+        ceil(steps / 4) bytes of actions, four 2-bit actions per byte (first in the low bits)
+        steps * u32 state digests            (only when FLAG_DIGESTS is set)
+
+The header holds the package version, spawn stream, `ColumnPopperEnv` kwargs and reward
+preset. `replay_episode` re-simulates an episode with a bare `ColumnPopperEnv` and, when
+digests are present, checks the state after every step. Unseeded episodes start from an
+unrecorded random state, so they cannot be written; `FLAG_NO_SEED` is only read, from files
+written before that check.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from collections.abc import Iterator, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+
+from ..core.spawn import SPAWN_STREAMS
+from ..rewards.presets import RewardPreset
+from ..version import __version__ as PKG_VERSION
+
+MAGIC = b"CPRL"
+FORMAT_VERSION = 1
+FLAG_NO_SEED = 1
+FLAG_DIGESTS = 2
+_PREAMBLE = struct.Struct("<4sBI")
+_EPISODE = struct.Struct("<qBI")
+# ColumnPopperEnv kwargs recorded in the header (everything that affects the simulation)
+ENV_KEYS = (
+    "game_duration",
+    "strict_invalid",
+    "include_time_left_norm",
+    "initial_fall_interval",
+    "schedule_curve",
+    "board_backend",
+    "spawn_mode",
+)
+
+
+class ReplayError(ValueError):
+    """Malformed replay file or a replay that diverges from its recorded digests."""
+
+
+@dataclass(frozen=True)
+class ReplayHeader:
+    env_kwargs: dict[str, Any]
+    reward_preset: RewardPreset
+    pkg_version: str = PKG_VERSION
+    spawn_stream: str = SPAWN_STREAMS["compat"]
+
+    @classmethod
+    def for_env(cls, env: Any) -> ReplayHeader:
+        """Header describing `env` (a `ColumnPopperEnv`, possibly wrapped)."""
+        base = env.unwrapped
+        if base.use_wall_time:
+            raise ValueError("Replays require simulated time (use_wall_time=False)")
+        return cls(
+            env_kwargs={
+                "game_duration": base.game_duration,
+                "strict_invalid": base.strict_invalid,
+                "include_time_left_norm": base.include_time_left_norm,
+                "initial_fall_interval": base._initial_fall_interval,
+                "schedule_curve": [list(item) for item in base._schedule_curve],
+                "board_backend": base.board_backend,
+                "spawn_mode": base.spawn_mode,
+            },
+            reward_preset=base.rewards,
+            spawn_stream=base.board.spawn_stream,
+        )
+
+    def make_env(self, **overrides: Any) -> Any:
+        """A `ColumnPopperEnv` configured like the recording env."""
+        from ..envs.column_popper_env import ColumnPopperEnv
+
+        kwargs = dict(self.env_kwargs)
+        kwargs["schedule_curve"] = [tuple(item) for item in kwargs["schedule_curve"]]
+        kwargs.update(overrides)
+        return ColumnPopperEnv(reward_preset=self.reward_preset, **kwargs)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "pkg_version": self.pkg_version,
+                "spawn_stream": self.spawn_stream,
+                "env": self.env_kwargs,
+                "reward_preset": asdict(self.reward_preset),
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, s: str) -> ReplayHeader:
+        d = json.loads(s)
+        unknown = set(d["env"]) - set(ENV_KEYS)
+        if unknown:
+            raise ReplayError(f"Unknown env kwargs in replay header: {sorted(unknown)}")
+        return cls(
+            env_kwargs=d["env"],
+            reward_preset=RewardPreset(**d["reward_preset"]),
+            pkg_version=d["pkg_version"],
+            spawn_stream=d["spawn_stream"],
+        )
+
+
+@dataclass(frozen=True)
+class ReplayEpisode:
+    seed: int | None
+    actions: np.ndarray  # (steps,) uint8 in [0, 3]
+    digests: np.ndarray | None = None  # (steps,) uint32 state digest after each step
+
+    @property
+    def steps(self) -> int:
+        return int(self.actions.shape[0])
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    steps: int
+    total_reward: float
+    score: float
+    terminated: bool
+    truncated: bool
+
+
+def state_digest(obs: dict[str, Any], score: float) -> int:
+    """CRC32 of the board, selection, held position and score; independent of backend."""
+    crc = zlib.crc32(np.ascontiguousarray(obs["board"], dtype=np.int32).tobytes())
+    crc = zlib.crc32(np.asarray(obs["selection"], dtype=np.int32).tobytes(), crc)
+    crc = zlib.crc32(np.asarray(obs["sel_pos"], dtype=np.int32).tobytes(), crc)
+    return zlib.crc32(struct.pack("<d", score), crc)
+
+
+def pack_actions(actions: Sequence[int] | np.ndarray) -> bytes:
+    a = np.asarray(actions, dtype=np.uint8)
+    if a.size and int(a.max()) > 3:
+        raise ValueError("Actions must be in [0, 3]")
+    padded = np.zeros(((a.size + 3) // 4) * 4, dtype=np.uint8)
+    padded[: a.size] = a
+    quads = padded.reshape(-1, 4)
+    packed = quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)
+    return packed.astype(np.uint8).tobytes()
+
+
+def unpack_actions(data: bytes, steps: int) -> np.ndarray:
+    packed = np.frombuffer(data, dtype=np.uint8)
+    shifts = np.array([0, 2, 4, 6], dtype=np.uint8)
+    actions: np.ndarray = ((packed[:, None] >> shifts) & 3).reshape(-1)[:steps]
+    return actions
+
+
+class ReplayWriter:
+    """Append episodes to a replay file; use as a context manager."""
+
+    def __init__(self, path: str | Path, header: ReplayHeader) -> None:
+        self.header = header
+        self._f: BinaryIO = open(path, "wb")
+        payload = header.to_json().encode("utf-8")
+        self._f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(payload)))
+        self._f.write(payload)
+
+    def write_episode(self, episode: ReplayEpisode) -> None:
+        if episode.seed is None:
+            raise ValueError("Unseeded episodes cannot be replayed; record them with a seed")
+        flags = 0
+        if episode.digests is not None:
+            if episode.digests.shape != episode.actions.shape:
+                raise ValueError("Expected one digest per action")
+            flags |= FLAG_DIGESTS
+        self._f.write(_EPISODE.pack(int(episode.seed), flags, episode.steps))
+        self._f.write(pack_actions(episode.actions))
+        if episode.digests is not None:
+            self._f.write(np.asarray(episode.digests, dtype="<u4").tobytes())
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> ReplayWriter:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def read_replay(path: str | Path) -> tuple[ReplayHeader, list[ReplayEpisode]]:
+    """Parse a replay file into its header and episodes."""
+    data = Path(path).read_bytes()
+    if len(data) < _PREAMBLE.size:
+        raise ReplayError("Truncated replay preamble")
+    magic, version, header_len = _PREAMBLE.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ReplayError("Not a Column Popper replay file")
+    if version != FORMAT_VERSION:
+        raise ReplayError(f"Unsupported replay format version {version}")
+    pos = _PREAMBLE.size
+    header = ReplayHeader.from_json(data[pos : pos + header_len].decode("utf-8"))
+    pos += header_len
+    return header, list(_iter_episodes(data, pos))
+
+
+def _iter_episodes(data: bytes, pos: int) -> Iterator[ReplayEpisode]:
+    while pos < len(data):
+        if pos + _EPISODE.size > len(data):
+            raise ReplayError("Truncated episode record")
+        seed, flags, steps = _EPISODE.unpack_from(data, pos)
+        pos += _EPISODE.size
+        nbytes = (steps + 3) // 4
+        end = pos + nbytes + (4 * steps if flags & FLAG_DIGESTS else 0)
+        if end > len(data):
+            raise ReplayError("Truncated episode record")
+        actions = unpack_actions(data[pos : pos + nbytes], steps)
+        pos += nbytes
+        digests = None
+        if flags & FLAG_DIGESTS:
+            digests = np.frombuffer(data, dtype="<u4", count=steps, offset=pos)
+            pos += 4 * steps
+        yield ReplayEpisode(None if flags & FLAG_NO_SEED else seed, actions, digests)
+
+
+def record_episode(
+    env: Any, seed: int, actions: Sequence[int] | np.ndarray, digests: bool = True
+) -> ReplayEpisode:
+    """Play `actions` from `env.reset(seed=seed)` and return the episode with digests.
+
+    Stops early if the episode ends before the actions run out.
+    """
+    if seed is None:
+        raise ValueError("Unseeded episodes cannot be replayed; record them with a seed")
+    base = env.unwrapped
+    env.reset(seed=seed)
+    played: list[int] = []
+    out: list[int] = []
+    for action in actions:
+        obs, _, terminated, truncated, _ = env.step(int(action))
+        played.append(int(action))
+        if digests:
+            out.append(state_digest(obs, base.score))
+        if terminated or truncated:
+            break
+    return ReplayEpisode(
+        seed,
+        np.array(played, dtype=np.uint8),
+        np.array(out, dtype=np.uint32) if digests else None,
+    )
+
+
+def replay_episode(
+    header: ReplayHeader, episode: ReplayEpisode, *, verify: bool = True, env: Any = None
+) -> ReplayResult:
+    """Re-simulate `episode`; with `verify`, raise `ReplayError` at the first digest mismatch.
+
+    Pass `env` (from `header.make_env()`) to reuse one env across episodes.
+    """
+    if header.spawn_stream != SPAWN_STREAMS[header.env_kwargs.get("spawn_mode", "compat")]:
+        raise ReplayError(
+            f"Replay uses spawn stream {header.spawn_stream!r}, which this version cannot replay"
+        )
+    if episode.seed is None:
+        raise ReplayError("Episode was recorded without a seed and cannot be re-simulated")
+    if env is None:
+        env = header.make_env(info_level="none", reuse_obs=True)
+    env.reset(seed=episode.seed)
+    digests = episode.digests if verify else None
+    expected = digests.tolist() if digests is not None else None
+    step = env.step
+    total = 0.0
+    terminated = truncated = False
+    n = 0
+    for n, action in enumerate(episode.actions.tolist(), start=1):
+        obs, reward, terminated, truncated, _ = step(action)
+        total += reward
+        if expected is not None and state_digest(obs, env.score) != expected[n - 1]:
+            raise ReplayError(f"State digest mismatch at step {n - 1}")
+        if (terminated or truncated) and n < episode.steps:
+            raise ReplayError(f"Episode ended at step {n - 1} with actions left")
+    return ReplayResult(n, total, float(env.score), bool(terminated), bool(truncated))
+
+
+__all__ = [
+    "ReplayEpisode",
+    "ReplayError",
+    "ReplayHeader",
+    "ReplayResult",
+    "ReplayWriter",
+    "pack_actions",
+    "read_replay",
+    "record_episode",
+    "replay_episode",
+    "state_digest",
+    "unpack_actions",
+]
@@ -0,0 +1,194 @@
+"""Columnar rollout shards.
+
+A shard is an `.npz` archive of step-aligned columns for one or more whole episodes:
+
+- `board` (T, 12, 3) uint8, `selection` (T, 2) uint8, `sel_pos` (T, 2) int8: the observation
+  after each step (plus `time_left_norm` (T, 1) float32 when recorded)
+- `action` (T,) uint8, `reward` (T,) float64, `terminated` / `truncated` (T,) bool,
+  `score` (T,) float64
+- `episode` (E,) int64 and `episode_seed` (E,) int64 (-1 when unseeded) per episode, with
+  `episode_start` (E + 1,) step offsets: episode `i` is rows `episode_start[i]:episode_start[i + 1]`
+
+`ShardWriter` buffers episodes and writes a shard once it holds at least `shard_steps` steps
+(episodes are never split). It refuses a directory that already holds shards, since
+`iter_shards` would mix the two runs. Shards are deflate-compressed by default; with
+`compress=False` members are stored uncompressed and `load_shard` memory-maps them in place
+instead of reading them.
+"""
+
+from __future__ import annotations
+
+import os
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+
+STEP_COLUMNS: dict[str, tuple[tuple[int, ...], Any]] = {
+    "board": ((12, 3), np.uint8),
+    "selection": ((2,), np.uint8),
+    "sel_pos": ((2,), np.int8),
+    "time_left_norm": ((1,), np.float32),
+    "action": ((), np.uint8),
+    "reward": ((), np.float64),
+    "terminated": ((), np.bool_),
+    "truncated": ((), np.bool_),
+    "score": ((), np.float64),
+}
+SHARD_PATTERN = "shard-{:05d}.npz"
+
+
+class EpisodeBuffer:
+    """Growable per-episode column buffers; `add` copies one step into each column."""
+
+    def __init__(self, include_time: bool = False, capacity: int = 1024) -> None:
+        self.columns = {
+            name: np.zeros((capacity, *shape), dtype=dtype)
+            for name, (shape, dtype) in STEP_COLUMNS.items()
+            if include_time or name != "time_left_norm"
+        }
+        self.size = 0
+
+    def add(
+        self,
+        obs: dict[str, Any],
+        action: int,
+        reward: float,
+        terminated: bool,
+        truncated: bool,
+        score: float,
+    ) -> None:
+        i = self.size
+        cols = self.columns
+        if i == len(cols["action"]):
+            for name, col in cols.items():
+                grown = np.zeros((2 * len(col), *col.shape[1:]), dtype=col.dtype)
+                grown[:i] = col
+                cols[name] = grown
+        cols["board"][i] = obs["board"]
+        cols["selection"][i] = obs["selection"]
+        cols["sel_pos"][i] = obs["sel_pos"]
+        if "time_left_norm" in cols:
+            cols["time_left_norm"][i] = obs["time_left_norm"]
+        cols["action"][i] = action
+        cols["reward"][i] = reward
+        cols["terminated"][i] = terminated
+        cols["truncated"][i] = truncated
+        cols["score"][i] = score
+        self.size = i + 1
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Trimmed copies of the recorded columns."""
+        return {name: col[: self.size].copy() for name, col in self.columns.items()}
+
+    def clear(self) -> None:
+        self.size = 0
+
+
+class ShardWriter:
+    """Accumulate episodes and write them to `directory` in shards of >= `shard_steps` steps.
+
+    Raises `FileExistsError` if `directory` already contains shards.
+    """
+
+    def __init__(
+        self, directory: str | os.PathLike[str], shard_steps: int = 100_000, compress: bool = True
+    ) -> None:
+        if shard_steps < 1:
+            raise ValueError("shard_steps must be >= 1")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if existing_shards(self.directory):
+            raise FileExistsError(f"{self.directory} already contains rollout shards")
+        self.shard_steps = int(shard_steps)
+        self.compress = compress
+        self.paths: list[Path] = []
+        self._episodes: list[tuple[int, int, dict[str, np.ndarray]]] = []
+        self._pending = 0
+
+    def add_episode(self, episode: int, seed: int | None, columns: dict[str, np.ndarray]) -> None:
+        self._episodes.append((episode, -1 if seed is None else int(seed), columns))
+        self._pending += len(columns["action"])
+        if self._pending >= self.shard_steps:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered episodes (if any) as one shard."""
+        if not self._episodes:
+            return
+        lengths = [len(cols["action"]) for _, _, cols in self._episodes]
+        out = {
+            name: np.concatenate([cols[name] for _, _, cols in self._episodes])
+            for name in self._episodes[0][2]
+        }
+        out["episode"] = np.array([e for e, _, _ in self._episodes], dtype=np.int64)
+        out["episode_seed"] = np.array([s for _, s, _ in self._episodes], dtype=np.int64)
+        out["episode_start"] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        path = self.directory / SHARD_PATTERN.format(len(self.paths))
+        save: Any = np.savez_compressed if self.compress else np.savez
+        save(path, **out)
+        self.paths.append(path)
+        self._episodes = []
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> ShardWriter:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def load_shard(path: str | os.PathLike[str], mmap: bool = True) -> dict[str, np.ndarray]:
+    """Load every column of a shard.
+
+    With `mmap`, uncompressed members are returned as read-only `np.memmap` views of the
+    file; deflate-compressed members are always decompressed into memory.
+    """
+    path = Path(path)
+    out: dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            name = info.filename.removesuffix(".npy")
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                out[name] = _memmap_member(path, f, info)
+            else:
+                with zf.open(info) as member:
+                    out[name] = np.lib.format.read_array(member)
+    return out
+
+
+def _memmap_member(path: Path, f: Any, info: zipfile.ZipInfo) -> np.ndarray:
+    # Local file header: 30 fixed bytes, then the name and extra field
+    f.seek(info.header_offset + 26)
+    name_len, extra_len = np.frombuffer(f.read(4), dtype="<u2")
+    f.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+    if dtype.hasobject:
+        raise ValueError(f"Cannot memory-map object array {info.filename!r}")
+    order: Literal["C", "F"] = "F" if fortran else "C"
+    if int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype=dtype, order=order)
+    return np.memmap(path, dtype=dtype, mode="r", offset=int(f.tell()), shape=shape, order=order)
+
+
+def existing_shards(directory: str | os.PathLike[str]) -> list[Path]:
+    """Paths of the shards in `directory` in write order (empty if it does not exist)."""
+    return sorted(Path(directory).glob("shard-*.npz"))
+
+
+def iter_shards(directory: str | os.PathLike[str], mmap: bool = True) -> Iterator[dict[str, Any]]:
+    """Load the shards in `directory` in write order."""
+    for path in existing_shards(directory):
+        yield load_shard(path, mmap=mmap)
+
+
+__all__ = ["EpisodeBuffer", "ShardWriter", "existing_shards", "iter_shards", "load_shard"]
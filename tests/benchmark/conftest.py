@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.fixture
+def record_stat(benchmark):
+    """Store `derive(mean round time)` in `benchmark.extra_info[key]`.
+
+    Under `--benchmark-disable` the benchmark collects no stats, so nothing is recorded.
+    """
+
+    def record(key, derive):
+        if benchmark.stats:
+            benchmark.extra_info[key] = derive(benchmark.stats.stats.mean)
+
+    return record
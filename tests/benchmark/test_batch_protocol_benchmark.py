@@ -0,0 +1,46 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import numpy as np
+import pytest
+
+from column_popper.cli import protocol
+
+ENV_STEPS = 4096
+
+
+@pytest.mark.parametrize("num_envs", [1, 16, 64])
+def test_batch_session_env_steps_per_sec_benchmark(benchmark, record_stat, num_envs):
+    """Env steps per second through protocol messages (build and parse, no transport).
+
+    `num_envs=1` is the single-env `StreamSession`; larger batches share one message per
+    step across all envs.
+    """
+    steps = ENV_STEPS // num_envs
+    rng = np.random.default_rng(0)
+    lines = [
+        " ".join(map(str, rng.choice(4, size=num_envs, p=[0.33, 0.33, 0.33, 0.01]).tolist())) + "\n"
+        for _ in range(steps)
+    ]
+
+    def run():
+        if num_envs == 1:
+            env = protocol.make_env(3, False, "full")
+            session = protocol.StreamSession(env, episodes=10_000, seed=3, fast=True)
+        else:
+            env = protocol.make_vector_env(num_envs, include_time=False)
+            session = protocol.BatchStreamSession(env, episodes=10_000, seed=3)
+        nbytes = sum(map(len, session.start()))
+        for line in lines:
+            nbytes += sum(map(len, session.feed(line)))
+        env.close()
+        return nbytes
+
+    nbytes = benchmark(run)
+    record_stat("env_steps_per_sec", lambda mean: steps * num_envs / mean)
+    benchmark.extra_info["bytes_per_env_step"] = nbytes / (steps * num_envs)
@@ -0,0 +1,109 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import numpy as np
+import pytest
+
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+BACKENDS = ["array", "ring", "bitboard", "lookup"]
+ROUNDS = 2000
+
+
+@pytest.fixture(scope="module", autouse=True)
+def table_cache(tmp_path_factory):
+    # The lookup backend builds a 64 MiB pop table; keep it out of the user's cache
+    from column_popper.core import tables
+
+    mp = pytest.MonkeyPatch()
+    mp.setenv("COLUMN_POPPER_CACHE", str(tmp_path_factory.mktemp("tables")))
+    yield
+    mp.undo()
+    tables._loaded.clear()
+
+
+def _env(backend, grid):
+    env = ColumnPopperEnv(seed=3, board_backend=backend)
+    env.reset()
+    env.board.grid = grid
+    env.board.reindex()
+    return env
+
+
+def _dense_grid():
+    # Every column full: four stacked triples in column 0, none in the others
+    grid = np.zeros((12, 3), dtype=np.int32)
+    grid[:, 0] = [1, 1, 1, 2, 2, 2, 3, 3, 3, 1, 1, 1]
+    grid[:, 1] = [1, 2] * 6
+    grid[:, 2] = [3, 3, 1] * 4
+    return grid
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("col", [0, 2], ids=["four_triples", "no_triples"])
+def test_pop_triples_dense_benchmark(benchmark, backend, col):
+    env = _env(backend, _dense_grid())
+    board = env.board
+    state = board.get_state()
+    popped = benchmark.pedantic(
+        board.pop_triples_in_column,
+        args=(col,),
+        setup=lambda: board.set_state(state),
+        rounds=ROUNDS,
+    )
+    assert popped == (12 if col == 0 else 0)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_fall_tick_benchmark(benchmark, backend):
+    grid = np.zeros((12, 3), dtype=np.int32)
+    grid[8:, :] = [[1, 2, 3], [2, 3, 1], [3, 1, 2], [1, 2, 3]]
+    env = _env(backend, grid)
+    state = env.get_state()
+    overflow = benchmark.pedantic(env._fall_tick, setup=lambda: env.set_state(state), rounds=ROUNDS)
+    assert overflow
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("constrained", [False, True])
+def test_spawn_value_benchmark(benchmark, backend, constrained):
+    grid = np.zeros((12, 3), dtype=np.int32)
+    if constrained:
+        # Rows 1 and 2 match, so the draw must avoid their value
+        grid[1:3, 0] = 2
+    env = _env(backend, grid)
+    value = benchmark(env.board.spawn_value_for_column, 0)
+    assert value in (1, 2, 3)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_board_fall_benchmark(benchmark, backend):
+    # The shift alone: the ring backend moves its head instead of copying columns
+    grid = np.zeros((12, 3), dtype=np.int32)
+    grid[8:, :] = [[1, 2, 3], [2, 3, 1], [3, 1, 2], [1, 2, 3]]
+    board = _env(backend, grid).board
+    state = board.get_state()
+    overflow = benchmark.pedantic(board.fall, setup=lambda: board.set_state(state), rounds=ROUNDS)
+    assert overflow
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_env_step_by_backend_benchmark(benchmark, backend):
+    # Whole steps, including building the observation from `grid`
+    env = ColumnPopperEnv(seed=3, board_backend=backend)
+    env.reset()
+    actions = np.random.default_rng(0).choice(4, size=4096, p=[0.3, 0.3, 0.3, 0.1]).tolist()
+    state = {"i": 0}
+
+    def _do_step():
+        _, _, terminated, truncated, _ = env.step(actions[state["i"] % len(actions)])
+        state["i"] += 1
+        if terminated or truncated:
+            env.reset()
+
+    benchmark(_do_step)
@@ -0,0 +1,55 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import io
+import os
+
+import numpy as np
+import pytest
+
+from column_popper.cli import protocol, rollout
+
+
+class _Sink(io.TextIOWrapper):
+    """Counts lines and characters written; flushes go to the null device."""
+
+    def __init__(self) -> None:
+        super().__init__(open(os.devnull, "wb", buffering=0), encoding="utf-8")
+        self.lines = 0
+        self.chars = 0
+
+    def write(self, s: str) -> int:
+        self.lines += s.count("\n")
+        self.chars += len(s)
+        return super().write(s)
+
+
+@pytest.mark.parametrize("cli", ["rollout", "protocol"])
+@pytest.mark.parametrize("encoding", ["full", "delta"])
+def test_delta_bytes_and_frames_per_sec_benchmark(
+    benchmark, record_stat, monkeypatch, cli, encoding
+):
+    main = rollout.main if cli == "rollout" else protocol.main
+    actions = np.random.default_rng(0).choice(4, size=5000, p=[0.33, 0.33, 0.33, 0.01])
+    data = ("\n".join(map(str, actions.tolist())) + "\n").encode()
+    argv = ["--episodes=10", "--seed=3", "--include-time", "--throughput"]
+    if encoding == "delta":
+        argv.append("--delta")
+    sink = _Sink()
+    monkeypatch.setattr("sys.stdout", sink)
+
+    def run():
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BufferedReader(io.BytesIO(data))))
+        sink.lines = sink.chars = 0
+        return main(argv)
+
+    assert benchmark(run) == 0
+    benchmark.extra_info["bytes_per_line"] = sink.chars / sink.lines
+    benchmark.extra_info["bytes_total"] = sink.chars
+    record_stat("lines_per_sec", lambda mean: sink.lines / mean)
+    sink.close()
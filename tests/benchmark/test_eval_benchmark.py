@@ -0,0 +1,20 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import pytest
+
+from column_popper.eval import evaluate
+
+EPISODES = 128
+
+
+@pytest.mark.parametrize("batch", [1, 64])
+def test_eval_episodes_per_sec_benchmark(benchmark, record_stat, batch):
+    results = benchmark(lambda: evaluate("random", range(EPISODES), batch=batch))
+    assert len(results) == EPISODES
+    record_stat("episodes_per_sec", lambda mean: EPISODES / mean)
@@ -0,0 +1,78 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import io
+import json
+import os
+
+import numpy as np
+import pytest
+
+from column_popper.cli import protocol, rollout
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+from column_popper.utils.jsonl import dumps, encode_obs
+
+
+class _Sink(io.TextIOWrapper):
+    """Counts lines written; each flush is a real write to the null device."""
+
+    def __init__(self) -> None:
+        super().__init__(open(os.devnull, "wb", buffering=0), encoding="utf-8")
+        self.lines = 0
+
+    def write(self, s: str) -> int:
+        self.lines += s.count("\n")
+        return super().write(s)
+
+
+@pytest.mark.parametrize("cli", ["rollout", "protocol"])
+@pytest.mark.parametrize("mode", ["default", "throughput"])
+def test_jsonl_frames_per_sec_benchmark(benchmark, record_stat, monkeypatch, cli, mode):
+    main = rollout.main if cli == "rollout" else protocol.main
+    actions = np.random.default_rng(0).choice(4, size=5000, p=[0.33, 0.33, 0.33, 0.01])
+    data = ("\n".join(map(str, actions.tolist())) + "\n").encode()
+    argv = ["--episodes=10", "--seed=3"] + (["--throughput"] if mode == "throughput" else [])
+    sink = _Sink()
+    monkeypatch.setattr("sys.stdout", sink)
+
+    def run():
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BufferedReader(io.BytesIO(data))))
+        sink.lines = 0
+        return main(argv)
+
+    assert benchmark(run) == 0
+    benchmark.extra_info["frames"] = sink.lines
+    record_stat("frames_per_sec", lambda mean: sink.lines / mean)
+    sink.close()
+
+
+@pytest.mark.parametrize("encoder", ["json", "template"])
+@pytest.mark.parametrize("include_time", [False, True])
+def test_frame_encoding_benchmark(benchmark, encoder, include_time):
+    # One rollout frame, encoded the way `cli.rollout` does in default / --throughput mode
+    env = ColumnPopperEnv(seed=3, include_time_left_norm=include_time)
+    env.reset()
+    for a in (0, 1, 3, 2):
+        obs, reward, terminated, truncated, info = env.step(a)
+    frame = {
+        "episode": 0,
+        "step": 4,
+        "action": 2,
+        "reward": reward,
+        "terminated": terminated,
+        "truncated": truncated,
+        "info": info,
+    }
+
+    def encode():
+        if encoder == "json":
+            return json.dumps({**frame, "obs": rollout._to_jsonable(obs)})
+        return dumps(frame, obs=encode_obs(obs))
+
+    line = benchmark(encode)
+    assert json.loads(line)["obs"]["board"] == obs["board"].tolist()
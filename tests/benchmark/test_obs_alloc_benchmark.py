@@ -0,0 +1,71 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import statistics
+import tracemalloc
+
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+# Bytes; steady-state steps should stay well inside these regardless of step count
+RETAINED_BUDGET = 2048
+TRANSIENT_BUDGET = 1024
+
+
+def _env(reuse_obs):
+    env = ColumnPopperEnv(
+        seed=1, reuse_obs=reuse_obs, include_time_left_norm=True, game_duration=1e9
+    )
+    env.reset()
+    return env
+
+
+def _action(i):
+    return 3 if i % 7 == 0 else i % 3
+
+
+def _retained_bytes(env, steps):
+    """Bytes still held by env code after `steps` steps whose observations are all kept."""
+    for i in range(200):
+        env.step(_action(i))
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        kept = [env.step(_action(i))[0] for i in range(steps)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # Amortized spawn-buffer refills replace (not grow) a fixed-size block
+    filters = [
+        tracemalloc.Filter(True, "*column_popper*"),
+        tracemalloc.Filter(False, "*column_popper/core/spawn.py"),
+    ]
+    diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "filename")
+    del kept
+    return sum(stat.size_diff for stat in diff)
+
+
+def test_reuse_obs_steady_state_allocations(benchmark):
+    env = _env(reuse_obs=True)
+    assert _retained_bytes(env, 1000) < RETAINED_BUDGET
+    # Control: fresh observations grow with the number of kept steps
+    assert _retained_bytes(_env(reuse_obs=False), 1000) > 100 * RETAINED_BUDGET
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        for i in range(1000):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            env.step(_action(i))
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    assert statistics.median(peaks) < TRANSIENT_BUDGET
+
+    counter = iter(range(10**9))
+    benchmark(lambda: env.step(_action(next(counter))))
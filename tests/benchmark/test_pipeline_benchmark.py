@@ -0,0 +1,74 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+SRC = str(Path(__file__).resolve().parents[2] / "src")
+
+
+def _lockstep(proc, actions):
+    """Answer each step_request after reading it; returns the number of steps."""
+    it = iter(actions)
+    steps = 0
+    for line in proc.stdout:
+        if line.startswith(b'{"type": "step_request"'):
+            proc.stdin.write(b"%d\n" % next(it, 0))
+            proc.stdin.flush()
+        elif line.startswith(b'{"type": "step_result"'):
+            steps += 1
+    return steps
+
+
+def _pipelined(proc, actions, episodes):
+    """Send every action up front from a thread, then read results as they come.
+
+    Each episode gets an equal block of the actions, acknowledged with a `done` line; the
+    part of a block left when its episode ends is discarded.
+    """
+    blocks = np.array_split(np.asarray(actions), episodes)
+
+    def send():
+        try:
+            proc.stdin.write(b"".join(b"".join(b"%d\n" % a for a in b) + b"done\n" for b in blocks))
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    sender = threading.Thread(target=send)
+    sender.start()
+    steps = sum(line.startswith(b'{"type": "step_result"') for line in proc.stdout)
+    sender.join()
+    return steps
+
+
+@pytest.mark.parametrize("mode", ["lockstep", "pipeline"])
+def test_pipe_steps_per_sec_benchmark(benchmark, record_stat, mode):
+    actions = np.random.default_rng(0).choice(4, size=100_000, p=[0.33, 0.33, 0.33, 0.01]).tolist()
+    argv = [sys.executable, "-m", "column_popper.cli.protocol", "--episodes=100", "--throughput"]
+    if mode == "pipeline":
+        argv.append("--pipeline=64")
+    env = {**os.environ, "PYTHONPATH": SRC}
+    steps = []
+
+    def run():
+        proc = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+        if mode == "pipeline":
+            steps.append(_pipelined(proc, actions, 100))
+        else:
+            steps.append(_lockstep(proc, actions))
+        proc.wait()
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+    record_stat("steps_per_sec", lambda mean: np.mean(steps) / mean)
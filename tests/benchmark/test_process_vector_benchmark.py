@@ -0,0 +1,38 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import os
+
+import numpy as np
+import pytest
+
+from column_popper.envs.process_vector_env import ProcessVectorColumnPopperEnv
+
+NUM_ENVS = 1024
+
+
+@pytest.mark.parametrize("num_workers", [1, 2, 4, 8])
+def test_process_vector_env_scaling_benchmark(benchmark, record_stat, num_workers):
+    if num_workers > (os.cpu_count() or 1):
+        pytest.skip(f"needs {num_workers} cores")
+    env = ProcessVectorColumnPopperEnv(NUM_ENVS, num_workers=num_workers, seed=123, copy=False)
+    try:
+        env.reset()
+        rng = np.random.default_rng(0)
+        actions = rng.integers(0, 4, size=(64, NUM_ENVS))
+        state = {"i": 0}
+
+        def _do_step():
+            env.step(actions[state["i"] % len(actions)])
+            state["i"] += 1
+
+        benchmark(_do_step)
+        benchmark.extra_info["num_workers"] = num_workers
+        record_stat("env_steps_per_sec", lambda mean: round(NUM_ENVS / mean))
+    finally:
+        env.close()
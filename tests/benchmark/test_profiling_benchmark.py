@@ -0,0 +1,28 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import numpy as np
+import pytest
+
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+
+@pytest.mark.parametrize("profile", [False, True], ids=["disabled", "enabled"])
+def test_profiling_overhead_benchmark(benchmark, record_stat, profile):
+    env = ColumnPopperEnv(seed=0, profile=profile)
+    actions = np.random.default_rng(0).integers(0, 4, size=2000).tolist()
+
+    def run():
+        env.reset(seed=0)
+        for a in actions:
+            _, _, terminated, truncated, _ = env.step(a)
+            if terminated or truncated:
+                env.reset()
+
+    benchmark(run)
+    record_stat("ns_per_step", lambda mean: mean / len(actions) * 1e9)
@@ -0,0 +1,25 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import numpy as np
+import pytest
+
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+from column_popper.utils.replay import ReplayHeader, record_episode, replay_episode
+
+
+@pytest.mark.parametrize("verify", [False, True])
+def test_replay_episode_benchmark(benchmark, verify):
+    env = ColumnPopperEnv(seed=0)
+    header = ReplayHeader.for_env(env)
+    actions = np.random.default_rng(0).choice(4, size=600, p=[0.33, 0.33, 0.33, 0.01])
+    episode = record_episode(env, 7, actions)
+    replay_env = header.make_env(info_level="none", reuse_obs=True)
+
+    result = benchmark(replay_episode, header, episode, verify=verify, env=replay_env)
+    benchmark.extra_info["steps"] = result.steps
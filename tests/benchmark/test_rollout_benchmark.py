@@ -0,0 +1,33 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import io
+
+import numpy as np
+import pytest
+
+from column_popper.cli import rollout
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "npz-deflate", "npz-none"])
+def test_rollout_format_benchmark(benchmark, monkeypatch, tmp_path, fmt):
+    actions = np.random.default_rng(0).choice(4, size=3000, p=[0.33, 0.33, 0.33, 0.01])
+    text = "\n".join(map(str, actions.tolist())) + "\n"
+    args = ["--episodes=5", "--seed=3", "--info-level=minimal"]
+    if fmt != "jsonl":
+        args += ["--format=npz", f"--compress={fmt.split('-')[1]}"]
+    monkeypatch.setattr("sys.stdout", io.StringIO())
+    rounds = iter(range(10**9))
+
+    def run():
+        monkeypatch.setattr("sys.stdin", io.StringIO(text))
+        # Each round writes into a fresh directory (the writer refuses existing shards)
+        out = [f"--out-dir={tmp_path / str(next(rounds))}"] if fmt != "jsonl" else []
+        return rollout.main(args + out)
+
+    assert benchmark(run) == 0
@@ -0,0 +1,25 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import pytest
+
+from column_popper.core.schedule import Schedule
+
+
+@pytest.mark.parametrize("fixed_dt", [None, 0.1])
+def test_schedule_episode_benchmark(benchmark, fixed_dt):
+    curve = [(20.0, 2.0), (40.0, 1.0)]
+
+    def _episode():
+        sched = Schedule(game_duration=60.0, initial_interval=3.0, curve=curve, fixed_dt=fixed_dt)
+        falls = 0
+        while not sched.truncated:
+            falls += sched.advance_step(dt=0.1)
+        return falls
+
+    assert benchmark(_episode) > 0
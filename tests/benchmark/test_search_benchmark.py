@@ -0,0 +1,31 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import pytest
+
+from column_popper.agents.search import ExpectimaxPlanner, MCTSPlanner, SearchConfig
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+
+@pytest.mark.parametrize("planner_cls", [MCTSPlanner, ExpectimaxPlanner])
+def test_search_nodes_per_sec_benchmark(benchmark, record_stat, planner_cls):
+    env = ColumnPopperEnv(seed=9)
+    env.reset()
+    for i in range(30):
+        env.step(i % 4)
+    config = SearchConfig(max_nodes=1000, max_depth=8, seed=0)
+    root = planner_cls.for_env(env, config).model.root(env)
+
+    def _search():
+        # Fresh table per round so every round does the full node budget
+        return planner_cls.for_env(env, config).search(root)
+
+    result = benchmark(_search)
+    assert result.nodes > 0
+    benchmark.extra_info["nodes"] = result.nodes
+    record_stat("nodes_per_sec", lambda mean: round(result.nodes / mean))
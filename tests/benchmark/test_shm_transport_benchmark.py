@@ -0,0 +1,48 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import time
+
+import numpy as np
+import pytest
+
+from column_popper.client import connect
+
+EPISODES = 5
+
+
+@pytest.mark.parametrize("transport", ["pipe", "shm"])
+def test_transport_step_latency_benchmark(benchmark, record_stat, transport):
+    """Round trip per step: send an action, receive its step_result and the next request."""
+    actions = np.random.default_rng(0).choice(4, size=100_000, p=[0.33, 0.33, 0.33, 0.01])
+    latencies: list[float] = []
+
+    def setup():
+        client = connect(transport, episodes=EPISODES, seed=1, include_time=True)
+        # Process start-up is excluded: wait for the first step_request
+        while client.recv()["type"] != "step_request":
+            pass
+        return (client,), {}
+
+    def play(client):
+        it = iter(actions.tolist())
+        t0 = time.perf_counter()
+        client.send(next(it))
+        for msg in client:
+            if msg["type"] == "step_request":
+                latencies.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                client.send(next(it))
+        client.close()
+
+    rounds = 3
+    benchmark.pedantic(play, setup=setup, rounds=rounds)
+    lat = np.array(latencies)
+    record_stat("steps_per_sec", lambda mean: len(lat) / rounds / mean)
+    benchmark.extra_info["p50_us"] = float(np.percentile(lat, 50) * 1e6)
+    benchmark.extra_info["p99_us"] = float(np.percentile(lat, 99) * 1e6)
@@ -0,0 +1,31 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import pytest
+
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+
+def _env(backend):
+    env = ColumnPopperEnv(seed=5, board_backend=backend)
+    env.reset()
+    for i in range(40):
+        env.step(i % 4)
+    return env
+
+
+@pytest.mark.parametrize("backend", ["array", "bitboard"])
+def test_get_state_benchmark(benchmark, backend):
+    benchmark(_env(backend).get_state)
+
+
+@pytest.mark.parametrize("backend", ["array", "bitboard"])
+def test_set_state_benchmark(benchmark, backend):
+    env = _env(backend)
+    state = env.get_state()
+    benchmark(env.set_state, state)
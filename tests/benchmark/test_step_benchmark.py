@@ -7,8 +7,16 @@ except Exception:  # pragma: no cover
 
 
 import gymnasium as gym
+import numpy as np
+import pytest
 
 import column_popper.envs  # noqa: F401
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+# Rounds for single-call benchmarks that restore a snapshot before every call
+ROUNDS = 2000
+# Bottom-up contents: column 0 half full, column 1 full (no triples), column 2 low
+_SCENARIO = {0: [1, 2, 3, 1, 2, 3], 1: [1, 2] * 6, 2: [3, 1]}
 
 
 def test_env_step_benchmark(benchmark):
@@ -24,3 +32,92 @@ def test_env_step_benchmark(benchmark):
         benchmark(_do_step)
     finally:
         env.close()
+
+
+def test_reset_benchmark(benchmark):
+    env = ColumnPopperEnv(seed=123)
+    benchmark(env.reset, seed=123)
+
+
+def _scenario_env(holding):
+    env = ColumnPopperEnv(seed=11)
+    env.reset()
+    grid = np.zeros((12, 3), dtype=np.int32)
+    for col, values in _SCENARIO.items():
+        grid[12 - len(values) :, col] = values[::-1]
+    env.board.grid = grid
+    env.board.reindex()
+    if holding:
+        env.step(0)
+    return env
+
+
+# (action, holding a cell before the step, holding one after it)
+ACTIONS = {
+    "pick": (0, False, True),
+    "drop_same_column": (0, True, False),
+    "drop_cross_column": (2, True, False),
+    "drop_full_column": (1, True, True),
+    "manual_fall": (3, False, False),
+}
+
+
+@pytest.mark.parametrize("kind", list(ACTIONS))
+def test_action_benchmark(benchmark, kind):
+    action, holding, held_after = ACTIONS[kind]
+    env = _scenario_env(holding)
+    snapshot = env.get_state()
+
+    benchmark.pedantic(
+        env.step, args=(action,), setup=lambda: env.set_state(snapshot), rounds=ROUNDS
+    )
+    # The snapshot really exercises the intended branch
+    assert bool(env.selection[0]) == held_after
+
+
+@pytest.mark.parametrize("include_time", [False, True])
+@pytest.mark.parametrize("reuse_obs", [False, True])
+def test_obs_building_benchmark(benchmark, include_time, reuse_obs):
+    env = ColumnPopperEnv(seed=5, include_time_left_norm=include_time, reuse_obs=reuse_obs)
+    env.reset()
+    obs = benchmark(env._obs)
+    assert set(obs) == set(env.observation_space.spaces)
+
+
+@pytest.mark.parametrize("checker", [False, True])
+def test_gym_make_benchmark(benchmark, checker):
+    def make():
+        env = gym.make("SpecKitAI/ColumnPopper-v1", disable_env_checker=not checker, seed=1)
+        env.close()
+
+    benchmark(make)
+
+
+def _scripted(obs):
+    # Pick from the fullest column, drop into the emptiest one
+    fill = (obs["board"] != 0).sum(axis=0)
+    if obs["selection"][0]:
+        return int(np.argmin(fill))
+    return int(np.argmax(fill)) if fill.any() else 3
+
+
+@pytest.mark.parametrize("policy", ["random", "scripted"])
+def test_episode_throughput_benchmark(benchmark, record_stat, policy):
+    env = ColumnPopperEnv(seed=0)
+    rng = np.random.default_rng(0)
+    steps = [0]
+
+    def run():
+        obs, _ = env.reset(seed=0)
+        n = 0
+        while True:
+            action = int(rng.integers(4)) if policy == "random" else _scripted(obs)
+            obs, _, terminated, truncated, _ = env.step(action)
+            n += 1
+            if terminated or truncated:
+                steps[0] = n
+                return
+
+    benchmark(run)
+    benchmark.extra_info["steps_per_episode"] = steps[0]
+    record_stat("steps_per_sec", lambda mean: steps[0] / mean)
@@ -0,0 +1,53 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from column_popper.cli.serve import ServerConfig, StreamServer
+
+STEPS = 50
+
+
+async def _client(path, latencies):
+    reader, writer = await asyncio.open_unix_connection(path)
+    for _ in range(3):  # meta, reset, first step_request
+        await reader.readline()
+    for i in range(STEPS):
+        t0 = time.perf_counter()
+        writer.write(b"3\n" if i % 4 == 3 else b"0\n")
+        await writer.drain()
+        await reader.readline()  # step_result
+        line = await reader.readline()  # step_request, or done at episode end
+        latencies.append(time.perf_counter() - t0)
+        if line.startswith(b'{"type": "done"'):
+            break
+    writer.close()
+
+
+@pytest.mark.parametrize("sessions", [10, 200])
+def test_stream_server_sessions_benchmark(benchmark, record_stat, tmp_path, sessions):
+    path = str(tmp_path / "bench.sock")
+    latencies: list[float] = []
+
+    async def round_trip():
+        server = StreamServer(ServerConfig(episodes=1, seed=0, distinct_seeds=True))
+        srv = await server.start(path=path)
+        async with srv:
+            await asyncio.gather(*(_client(path, latencies) for _ in range(sessions)))
+
+    rounds = 3
+    benchmark.pedantic(lambda: asyncio.run(round_trip()), rounds=rounds, iterations=1)
+    # Clients share the server's event loop, so latencies include client-side work
+    lat = np.array(latencies)
+    record_stat("steps_per_sec", lambda mean: len(lat) / rounds / mean)
+    benchmark.extra_info["p50_ms"] = float(np.percentile(lat, 50) * 1e3)
+    benchmark.extra_info["p99_ms"] = float(np.percentile(lat, 99) * 1e3)
@@ -0,0 +1,56 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import numpy as np
+import pytest
+
+from column_popper.core.bitboard import pack_column, pop_triples, pop_triples_codes
+from column_popper.core.board import _pop_triples
+from column_popper.core.tables import PopTable, load_pop_table
+
+
+@pytest.fixture(scope="module")
+def columns(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    # Dense columns over a small alphabet so a good share of them pop
+    cols = rng.integers(1, 3, size=(4096, 12)).astype(np.int32)
+    codes = np.array([pack_column(c) for c in cols], dtype=np.uint32)
+    table = PopTable(load_pop_table(12, tmp_path_factory.mktemp("tables")))
+    return cols, codes, table
+
+
+@pytest.mark.benchmark(group="pop-column")
+def test_pop_scan(benchmark, columns):
+    cols, _, _ = columns
+    benchmark(lambda: [_pop_triples(c.copy()) for c in cols[:256]])
+
+
+@pytest.mark.benchmark(group="pop-column")
+def test_pop_bitops(benchmark, columns):
+    _, codes, _ = columns
+    values = codes[:256].tolist()
+    benchmark(lambda: [pop_triples(c) for c in values])
+
+
+@pytest.mark.benchmark(group="pop-column")
+def test_pop_table(benchmark, columns):
+    _, codes, table = columns
+    values = codes[:256].tolist()
+    benchmark(lambda: [table.pop(c) for c in values])
+
+
+@pytest.mark.benchmark(group="pop-batch")
+def test_pop_batch_bitops(benchmark, columns):
+    _, codes, _ = columns
+    benchmark(pop_triples_codes, codes)
+
+
+@pytest.mark.benchmark(group="pop-batch")
+def test_pop_batch_table(benchmark, columns):
+    _, codes, table = columns
+    benchmark(table.pop_codes, codes)
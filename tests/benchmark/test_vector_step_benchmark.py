@@ -0,0 +1,31 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import numpy as np
+
+from column_popper.envs.vector_env import VectorColumnPopperEnv
+
+
+def test_vector_env_step_benchmark(benchmark):
+
+    num_envs = 1024
+    env = VectorColumnPopperEnv(num_envs, seed=123, copy=False)
+    try:
+        env.reset()
+        rng = np.random.default_rng(0)
+        actions = rng.integers(0, 4, size=(64, num_envs))
+        state = {"i": 0}
+
+        def _do_step():
+            env.step(actions[state["i"] % len(actions)])
+            state["i"] += 1
+
+        benchmark(_do_step)
+        benchmark.extra_info["env_steps_per_call"] = num_envs
+    finally:
+        env.close()
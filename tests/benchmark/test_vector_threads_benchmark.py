@@ -0,0 +1,35 @@
+try:
+    import pytest_benchmark  # noqa: F401
+except Exception:  # pragma: no cover
+    import pytest
+
+    pytest.skip("pytest-benchmark not installed", allow_module_level=True)
+
+
+import numpy as np
+import pytest
+
+from column_popper.envs.vector_env import VectorColumnPopperEnv
+
+
+# Small batches lose to thread dispatch overhead; large ones spend most of the step in
+# NumPy calls that release the GIL. Compare env_steps_per_sec across num_threads.
+@pytest.mark.parametrize("num_envs", [256, 4096, 32768])
+@pytest.mark.parametrize("num_threads", [1, 2, 4])
+def test_vector_env_threaded_step_benchmark(benchmark, record_stat, num_envs, num_threads):
+    env = VectorColumnPopperEnv(num_envs, seed=123, num_threads=num_threads)
+    try:
+        env.reset()
+        rng = np.random.default_rng(0)
+        actions = rng.integers(0, 4, size=(16, num_envs))
+        state = {"i": 0}
+
+        def _do_step():
+            env.step(actions[state["i"] % len(actions)])
+            state["i"] += 1
+
+        benchmark(_do_step)
+        benchmark.extra_info["num_threads"] = num_threads
+        record_stat("env_steps_per_sec", lambda mean: round(num_envs / mean))
+    finally:
+        env.close()
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from column_popper.envs import vector_env
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+from column_popper.envs.vector_env import VectorColumnPopperEnv
+
+
+def _rollout(env, actions):
+    out = []
+    for a in actions:
+        obs, rew, term, trunc, info = env.step(int(a))
+        out.append((obs["board"].tobytes(), obs["sel_pos"].tolist(), rew, term, trunc, dict(info)))
+        if term or trunc:
+            break
+    return out
+
+
+@pytest.mark.parametrize("backend", ["array", "ring", "bitboard"])
+@pytest.mark.parametrize("spawn_mode", ["compat", "fast", "choice"])
+def test_set_state_replays_identical_trajectory(backend, spawn_mode):
+    kwargs = {"board_backend": backend, "spawn_mode": spawn_mode, "initial_fall_interval": 0.3}
+    env = ColumnPopperEnv(seed=8, **kwargs)
+    env.reset()
+    actions = np.random.default_rng(1).integers(0, 4, size=2000)
+    _rollout(env, actions[:40])
+    state = env.get_state()
+    first = _rollout(env, actions[40:])
+    env.set_state(state)
+    assert _rollout(env, actions[40:]) == first
+    # The snapshot is reusable and restores into another env instance
+    other = ColumnPopperEnv(seed=99, **kwargs)
+    other.reset()
+    other.set_state(state)
+    assert _rollout(other, actions[40:]) == first
+    with pytest.raises(ValueError):
+        ColumnPopperEnv(board_backend="bitboard" if backend != "bitboard" else "array").set_state(
+            state
+        )
+
+
+def _vector_rollout(venv, actions):
+    out = []
+    for a in actions:
+        obs, rew, term, trunc, _ = venv.step(a)
+        out.append((obs["board"].copy(), rew.copy(), term.copy(), trunc.copy()))
+    return out
+
+
+def test_vector_set_state_restores_and_broadcasts(monkeypatch):
+    # Tiny word blocks so restored envs rebuild their generators across refills
+    monkeypatch.setattr(vector_env, "_RAW_BLOCK", 12)
+    venv = VectorColumnPopperEnv(6, seed=20, initial_fall_interval=0.2)
+    venv.reset()
+    rng = np.random.default_rng(2)
+    _vector_rollout(venv, rng.integers(0, 4, size=(30, 6)))
+    state = venv.get_state()
+    assert not state.boards.flags.writeable
+    actions = rng.integers(0, 4, size=(300, 6))
+    first = _vector_rollout(venv, actions)
+    venv.set_state(state)
+    second = _vector_rollout(venv, actions)
+    for a, b in zip(first, second, strict=True):
+        for x, y in zip(a, b, strict=True):
+            np.testing.assert_array_equal(x, y)
+
+    # Branch env 3 into every env: each replays env 3's original continuation
+    venv.set_state(state)
+    venv.set_state(venv.get_state([3]))
+    same = np.tile(actions[:, 3:4], (1, 6))
+    for (boards, *_), (ref, *_) in zip(_vector_rollout(venv, same), first, strict=True):
+        assert (boards == ref[3]).all()
+    with pytest.raises(ValueError):
+        venv.set_state(venv.get_state([0, 1]), indices=[0, 1, 2])
+    venv.close()
+
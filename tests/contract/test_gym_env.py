@@ -1,5 +1,6 @@
 import gymnasium as gym
 import numpy as np
+import pytest
 from gymnasium.spaces import Box, Dict, Discrete
 
 import column_popper.envs  # noqa: F401
@@ -94,3 +95,66 @@ def test_env_determinism_with_seed():
     finally:
         env1.close()
         env2.close()
+
+
+@pytest.mark.parametrize("backend", ["ring", "bitboard"])
+def test_env_board_backends_agree(backend):
+
+    env_id = "SpecKitAI/ColumnPopper-v1"
+    rng = np.random.default_rng(3)
+    actions = rng.integers(0, 4, size=400)
+
+    env1 = gym.make(env_id, disable_env_checker=True, board_backend="array")
+    env2 = gym.make(env_id, disable_env_checker=True, board_backend=backend)
+    try:
+        o1, _ = env1.reset(seed=9)
+        o2, _ = env2.reset(seed=9)
+        np.testing.assert_array_equal(o1["board"], o2["board"])
+        for a in actions:
+            o1, r1, t1, tr1, _ = env1.step(int(a))
+            o2, r2, t2, tr2, _ = env2.step(int(a))
+            for k in o1:
+                np.testing.assert_array_equal(o1[k], o2[k])
+            assert (r1, t1, tr1) == (r2, t2, tr2)
+            if t1 or tr1:
+                env1.reset()
+                env2.reset()
+    finally:
+        env1.close()
+        env2.close()
+
+
+def test_env_action_masks_follow_column_fill():
+    from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+    env = ColumnPopperEnv(seed=4)
+    env.reset()
+    # Every column holds its first spawned row; all picks and the manual fall are valid
+    assert env.action_masks().tolist() == [True, True, True, True]
+    for r in range(12):
+        env.board.set_cell(r, 1, 0)
+    assert env.action_masks().tolist() == [True, False, True, True]
+    env.step(0)
+    for r in range(12):
+        env.board.set_cell(r, 2, 3)
+    # Holding a value: column 2 is full, column 0 (the source) always accepts the drop
+    assert env.action_masks().tolist() == [True, True, False, True]
+
+
+def test_env_reuse_obs_buffers_match_fresh_obs():
+    from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+    fresh = ColumnPopperEnv(seed=6, include_time_left_norm=True)
+    reused = ColumnPopperEnv(seed=6, include_time_left_norm=True, reuse_obs=True)
+    o1, _ = fresh.reset()
+    o2, _ = reused.reset()
+    first = reused.copy_obs(o2)
+    for a in [0, 1, 3, 2, 2, 3, 0, 0]:
+        o1, *_ = fresh.step(a)
+        step_obs, *_ = reused.step(a)
+        assert step_obs is o2
+        assert reused.observation_space.contains(step_obs)
+        for k in o1:
+            np.testing.assert_array_equal(o1[k], step_obs[k])
+    # The copy taken after reset is detached from the reused buffers
+    assert not np.array_equal(first["board"], o2["board"])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from column_popper.envs.process_vector_env import ProcessVectorColumnPopperEnv
+from column_popper.envs.vector_env import VectorColumnPopperEnv
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_process_vector_env_matches_in_process_env(num_workers):
+    kwargs = dict(include_time_left_norm=True, initial_fall_interval=0.5)
+    penv = ProcessVectorColumnPopperEnv(7, num_workers=num_workers, seed=40, **kwargs)
+    venv = VectorColumnPopperEnv(7, seed=40, **kwargs)
+    rng = np.random.default_rng(1)
+    try:
+        pobs, pinfo = penv.reset()
+        vobs, vinfo = venv.reset()
+        assert penv.observation_space.contains(pobs)
+        for _ in range(600):
+            actions = rng.integers(0, 4, size=7)
+            pres = penv.step(actions)
+            vres = venv.step(actions)
+            for k in vres[0]:
+                np.testing.assert_array_equal(pres[0][k], vres[0][k])
+            for p, v in zip(pres[1:4], vres[1:4], strict=True):
+                np.testing.assert_array_equal(p, v)
+            for k in vres[4]:
+                np.testing.assert_array_equal(pres[4][k], vres[4][k])
+    finally:
+        penv.close()
+        venv.close()
+
+
+def test_process_vector_env_partial_reset_and_errors():
+    env = ProcessVectorColumnPopperEnv(4, num_workers=2, seed=[1, 2, 3, 4])
+    try:
+        obs, _ = env.reset()
+        first = obs["board"].copy()
+        env.step(np.array([3, 3, 3, 3]))
+        obs, _ = env.reset(options={"reset_mask": np.array([False, False, True, False])})
+        np.testing.assert_array_equal(obs["board"][2], first[2])
+        assert not np.array_equal(obs["board"][3], first[3])
+
+        with pytest.raises(ValueError):
+            env.step(np.array([0, 4, 0, 0]))
+        env.step_async(np.zeros(4, dtype=np.int64))
+        with pytest.raises(RuntimeError):
+            env.reset()
+        obs, reward, terminated, truncated, info = env.step_wait()
+        assert reward.shape == (4,) and info["score"].shape == (4,)
+    finally:
+        env.close()
+    with pytest.raises(RuntimeError):
+        env.step(np.zeros(4, dtype=np.int64))
@@ -0,0 +1,195 @@
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import column_popper.envs  # noqa: F401
+from column_popper.envs import vector_env
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+from column_popper.envs.vector_env import VectorColumnPopperEnv
+
+
+def _assert_matches_single_envs(num_envs, steps, actions_p=None, **kwargs):
+    venv = VectorColumnPopperEnv(num_envs, seed=100, **kwargs)
+    envs = [ColumnPopperEnv(seed=100 + i, **kwargs) for i in range(num_envs)]
+    rng = np.random.default_rng(0)
+    try:
+        vobs, _ = venv.reset()
+        for i, env in enumerate(envs):
+            obs, _ = env.reset()
+            for k in obs:
+                np.testing.assert_array_equal(obs[k], vobs[k][i])
+
+        done = [False] * num_envs
+        for _ in range(steps):
+            actions = rng.choice(4, size=num_envs, p=actions_p)
+            vobs, vrew, vterm, vtrunc, vinfo = venv.step(actions)
+            for i, env in enumerate(envs):
+                if done[i]:
+                    # Next-step autoreset: the vector env ignores the action and resets
+                    obs, info = env.reset()
+                    rew, term, trunc, pops = 0.0, False, False, 0
+                else:
+                    obs, rew, term, trunc, info = env.step(int(actions[i]))
+                    pops = info["pops_this_step"]
+                done[i] = term or trunc
+                for k in obs:
+                    np.testing.assert_array_equal(obs[k], vobs[k][i])
+                assert rew == vrew[i]
+                assert term == vterm[i]
+                assert trunc == vtrunc[i]
+                assert info["score"] == vinfo["score"][i]
+                assert pops == vinfo["pops_this_step"][i]
+    finally:
+        venv.close()
+
+
+def test_vector_env_matches_single_env_per_seed():
+    _assert_matches_single_envs(8, 2000, include_time_left_norm=True)
+
+
+def test_vector_env_matches_single_env_long_episodes():
+    # Few manual falls so episodes run to truncation through every curve segment
+    _assert_matches_single_envs(4, 1500, actions_p=[0.33, 0.33, 0.33, 0.01])
+
+
+def test_vector_env_matches_single_env_strict_invalid():
+    _assert_matches_single_envs(4, 800, strict_invalid=True, initial_fall_interval=0.25)
+
+
+def test_vector_env_matches_single_env_across_word_refills(monkeypatch):
+    monkeypatch.setattr(vector_env, "_RAW_BLOCK", 12)
+    _assert_matches_single_envs(4, 1500, actions_p=[0.3, 0.3, 0.3, 0.1])
+
+
+def test_vector_env_spaces_and_partial_reset():
+    env = gym.make_vec(
+        "SpecKitAI/ColumnPopper-v1",
+        num_envs=3,
+        vectorization_mode="vector_entry_point",
+        seed=5,
+    )
+    try:
+        assert env.num_envs == 3
+        assert env.single_action_space.n == 4
+        obs, info = env.reset(seed=[1, 2, 3])
+        assert obs["board"].shape == (3, 12, 3)
+        assert obs["board"].dtype == np.int32
+        assert obs["selection"].shape == (3, 2)
+        assert env.observation_space.contains(obs)
+
+        env.step(np.array([3, 3, 3]))
+        before = obs["board"].copy()
+        obs, _ = env.reset(options={"reset_mask": np.array([True, False, False])})
+        single = ColumnPopperEnv(seed=1)
+        np.testing.assert_array_equal(obs["board"][0], single.reset()[0]["board"])
+        np.testing.assert_array_equal(obs["board"][0], before[0])
+        assert not np.array_equal(obs["board"][1], before[1])
+
+        with pytest.raises(ValueError):
+            env.step(np.array([0, 4, 0]))
+    finally:
+        env.close()
+
+
+@pytest.mark.parametrize("copy", [True, False])
+def test_vector_env_threaded_matches_single_thread(copy):
+    kwargs = dict(seed=5, include_time_left_norm=True, initial_fall_interval=0.3)
+    threaded = VectorColumnPopperEnv(37, num_threads=4, copy=copy, **kwargs)
+    plain = VectorColumnPopperEnv(37, **kwargs)
+    rng = np.random.default_rng(0)
+    try:
+        threaded.reset()
+        plain.reset()
+        for t in range(1500):
+            actions = rng.integers(0, 4, size=37)
+            tres = threaded.step(actions)
+            pres = plain.step(actions)
+            for k in pres[0]:
+                np.testing.assert_array_equal(tres[0][k], pres[0][k])
+            for a, b in zip(tres[1:4], pres[1:4], strict=True):
+                np.testing.assert_array_equal(a, b)
+            np.testing.assert_array_equal(tres[4]["score"], pres[4]["score"])
+            if t == 500:
+                # Snapshots and partial reseeding go through the shared per-env state
+                state = plain.get_state([3])
+                threaded.set_state(state)
+                plain.set_state(state)
+                mask = {"reset_mask": np.arange(37) % 2 == 0}
+                threaded.reset(seed=9, options=mask)
+                plain.reset(seed=9, options=mask)
+    finally:
+        threaded.close()
+        plain.close()
+
+
+def test_vector_env_per_env_schedule_curves():
+    curves = [[(5.0, 0.2)], [(20.0, 2.0), (40.0, 1.0)], [(90.0, 3.0)], [(1.0, 0.5), (3.0, 0.1)]]
+    venv = VectorColumnPopperEnv(4, seed=70, schedule_curves=curves, initial_fall_interval=0.8)
+    envs = [
+        ColumnPopperEnv(seed=70 + i, schedule_curve=c, initial_fall_interval=0.8)
+        for i, c in enumerate(curves)
+    ]
+    try:
+        venv.reset()
+        for env in envs:
+            env.reset()
+        done = [False] * 4
+        for t in range(700):
+            action = 3 if t % 50 == 0 else t % 3
+            vobs, vrew, vterm, vtrunc, _ = venv.step(np.full(4, action))
+            for i, env in enumerate(envs):
+                if done[i]:
+                    obs, _ = env.reset()
+                    rew = 0.0
+                else:
+                    obs, rew, _, _, _ = env.step(action)
+                done[i] = bool(vterm[i] or vtrunc[i])
+                np.testing.assert_array_equal(obs["board"], vobs["board"][i])
+                assert rew == vrew[i]
+    finally:
+        venv.close()
+    with pytest.raises(ValueError):
+        VectorColumnPopperEnv(2, schedule_curves=[[]])
+
+
+def test_vector_pops_match_board_greedy_scan():
+    from column_popper.core.board import _pop_triples
+
+    env = VectorColumnPopperEnv(500, seed=0)
+    env.reset()
+    rng = np.random.default_rng(3)
+    # Two values and few holes, so long runs with several greedy triples are common
+    env.boards[:] = rng.choice([0, 1, 1, 1, 2, 2], size=env.boards.shape)
+    expected = env.boards.copy()
+    cols = rng.integers(0, 3, size=500)
+    idx = np.arange(500)
+    want = [_pop_triples(expected[i, :, c]) for i, c in zip(idx, cols, strict=True)]
+    np.testing.assert_array_equal(env._pop_triples(idx, cols), want)
+    np.testing.assert_array_equal(env.boards, expected)
+    assert max(want) >= 9
+    env.close()
+
+
+def test_vector_spawn_redraws_rejected_words():
+    env = VectorColumnPopperEnv(2, seed=0)
+    env.reset()
+    env.boards[:] = 0
+    at = int(env._cursor[0])
+    # A zero word is rejected for three candidates (Lemire threshold 1); the columns then
+    # take the next words in order
+    env._words[0, at : at + 4] = [0, 1, 0x80000000, 0xFFFFFFFF]
+    env._fall_tick(np.array([0, 1]))
+    assert env.boards[0, 0].tolist() == [1, 2, 3]
+    assert env._cursor[0] == at + 4
+    assert env._cursor[1] == at + 3
+
+
+def test_vector_empty_curves_mean_the_default_ramp():
+    from column_popper.core.schedule import DEFAULT_CURVE
+
+    assert ColumnPopperEnv(schedule_curve=[])._schedule_curve == list(DEFAULT_CURVE)
+    venv = VectorColumnPopperEnv(3, schedule_curves=[[], list(DEFAULT_CURVE), [(5.0, 1.0)]])
+    # The empty curve shares the default ramp's timeline
+    ids = venv._curve_id.tolist()
+    assert ids[0] == ids[1] != ids[2]
+    venv.close()
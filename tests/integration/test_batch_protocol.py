@@ -0,0 +1,108 @@
+import asyncio
+import io
+import json
+
+import numpy as np
+import pytest
+
+from column_popper.cli import protocol
+from column_popper.cli.serve import ServerConfig, StreamServer
+
+
+def _actions(n, seed):
+    return np.random.default_rng(seed).choice(4, size=n, p=[0.3, 0.3, 0.3, 0.1]).tolist()
+
+
+def _single_steps(seed, episodes, actions):
+    """(episode, reward, terminated, truncated, info, obs) of every step of a 1-env session."""
+    env = protocol.make_env(seed, True, "full")
+    session = protocol.StreamSession(env, episodes=episodes, seed=seed)
+    session.start()
+    it = iter(actions)
+    steps = []
+    while not session.finished:
+        r = json.loads(session.step(next(it))[0])
+        steps.append(
+            (r["episode"], r["reward"], r["terminated"], r["truncated"], r["info"], r["obs"])
+        )
+    return steps
+
+
+@pytest.mark.parametrize("num_envs", [1, 3])
+def test_batch_envs_match_single_sessions(num_envs):
+    episodes, seed = 2, 11
+    env = protocol.make_vector_env(num_envs, include_time=True)
+    session = protocol.BatchStreamSession(env, episodes=episodes, seed=seed)
+    actions = [_actions(5000, i) for i in range(num_envs)]
+    cursor = [0] * num_envs
+    got = [[] for _ in range(num_envs)]
+    dones = []
+
+    lines = session.start()
+    meta, reset = json.loads(lines[0]), json.loads(lines[1])
+    assert meta["num_envs"] == num_envs
+    assert reset["info"]["seed"] == [seed + i * episodes for i in range(num_envs)]
+    request = json.loads(lines[2])
+    while not session.finished:
+        live = [e is not None for e in request["episode"]]
+        acts = [actions[i][cursor[i]] if live[i] else 0 for i in range(num_envs)]
+        lines = [json.loads(x) for x in session.feed(" ".join(map(str, acts)) + "\n")]
+        result = lines[0]
+        assert result["type"] == "step_result"
+        for i in range(num_envs):
+            if not live[i]:
+                assert result["reward"][i] == 0.0 and result["episode"][i] is None
+                continue
+            cursor[i] += 1
+            info = {k: v[i] for k, v in result["info"].items()}
+            obs = {k: v[i] for k, v in result["obs"].items()}
+            flags = (result["terminated"][i], result["truncated"][i])
+            got[i].append((result["episode"][i], result["reward"][i], *flags, info, obs))
+        dones += [(m["env"], m["episode"]) for m in lines if m["type"] == "done"]
+        if lines[-1]["type"] == "step_request":
+            request = lines[-1]
+            for i, s in zip(request["reset"], request["seed"], strict=True):
+                assert s == seed + i * episodes + request["episode"][i]
+                assert request["obs"]["board"][i] != result["obs"]["board"][i]
+
+    assert sorted(dones) == [(i, e) for i in range(num_envs) for e in range(episodes)]
+    for i in range(num_envs):
+        assert got[i] == _single_steps(seed + i * episodes, episodes, actions[i])
+
+
+def test_parse_actions():
+    parse = protocol.parse_actions
+    assert parse("1 2 3\n", 3).tolist() == [1, 2, 3]
+    assert parse("[3, 0, 2]", 3).tolist() == [3, 0, 2]
+    assert parse("1,x,9,2", 3).tolist() == [1, 0, 0]
+    assert parse("2", 3).tolist() == [2, 0, 0]
+    assert parse("", 2).tolist() == [0, 0]
+
+
+def test_cli_and_server_batch_sessions_match(monkeypatch, capsys):
+    k, seed = 4, 5
+    rows = [" ".join(map(str, a)) for a in zip(*[_actions(4000, i) for i in range(k)], strict=True)]
+    monkeypatch.setattr("sys.stdin", io.StringIO("".join(f"{r}\n" for r in rows)))
+    argv = [f"--batch={k}", "--episodes=1", f"--seed={seed}", "--info-level=minimal"]
+    assert protocol.main([*argv, "--throughput"]) == 0
+    expected = capsys.readouterr().out.encode()
+    assert json.loads(expected.splitlines()[-1])["type"] == "done"
+
+    server = StreamServer(ServerConfig(seed=seed, info_level="minimal", batch=k))
+
+    async def run():
+        srv = await server.start(host="127.0.0.1", port=0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            out = []
+            it = iter(rows)
+            while line := await reader.readline():
+                out.append(line)
+                if json.loads(line)["type"] == "step_request":
+                    writer.write(f"{next(it)}\n".encode())
+            writer.close()
+            return b"".join(out)
+
+    assert asyncio.run(run()) == expected
+    assert server.completed == 1
@@ -0,0 +1,136 @@
+import asyncio
+import io
+import json
+
+import numpy as np
+import pytest
+
+from column_popper.cli import protocol
+from column_popper.cli.serve import ServerConfig, StreamServer
+
+
+def _actions(n, seed):
+    return np.random.default_rng(seed).choice(4, size=n, p=[0.3, 0.3, 0.3, 0.1]).tolist()
+
+
+def _blocks(episodes, size, seed):
+    """Open-loop input: `size` actions per episode, each block acknowledged with `done`."""
+    return [[*_actions(size, seed + e), protocol.ACK_LINE] for e in range(episodes)]
+
+
+class _ChunkedRaw(io.RawIOBase):
+    """A raw stream that hands out at most `chunk` bytes per read, like a slow pipe."""
+
+    def __init__(self, data, chunk):
+        self._data, self._pos, self._chunk = data, 0, chunk
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        n = min(len(buf), self._chunk, len(self._data) - self._pos)
+        buf[:n] = self._data[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+
+def _run(monkeypatch, capsys, argv, lines, chunk=1 << 20):
+    data = "".join(f"{x}\n" for x in lines).encode()
+    raw = io.BufferedReader(_ChunkedRaw(data, chunk), buffer_size=chunk)
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(raw))
+    assert protocol.main(argv) == 0
+    return [json.loads(x) for x in capsys.readouterr().out.splitlines()]
+
+
+def _check_against_lockstep(monkeypatch, capsys, msgs, blocks, argv, depth):
+    """Each episode applies a prefix of its block; the rest of the block is reported as
+    discarded by the next reset, and replaying the applied actions one per step_request
+    gives the same transcript."""
+    assert msgs[0]["max_queue"] == depth
+    applied = []
+    episode = [[] for _ in blocks]
+    for m in msgs:
+        if m["type"] == "step_result":
+            episode[m["episode"]].append(m["action"])
+            applied.append(m["action"])
+        elif m["type"] == "reset" and m["episode"]:
+            played = episode[m["episode"] - 1]
+            assert m.pop("discarded") == len(blocks[m["episode"] - 1]) - 1 - len(played)
+    for block, played in zip(blocks, episode, strict=True):
+        assert played == block[: len(played)]
+    assert sum(m["type"] == "done" for m in msgs) == len(blocks)
+    lockstep = _run(monkeypatch, capsys, argv, applied)
+    assert msgs[1:] == lockstep[1:]
+
+
+@pytest.mark.parametrize("depth", [1, 8, 64])
+def test_cli_pipeline_matches_lockstep_replay(monkeypatch, capsys, depth):
+    argv = ["--episodes=3", "--seed=6"]
+    blocks = _blocks(3, 1000, depth)
+    msgs = _run(monkeypatch, capsys, [*argv, f"--pipeline={depth}"], sum(blocks, []))
+    _check_against_lockstep(monkeypatch, capsys, msgs, blocks, argv, depth)
+
+
+def test_cli_pipeline_output_does_not_depend_on_chunking(monkeypatch, capsys):
+    argv = ["--episodes=3", "--seed=6", "--pipeline=16", "--throughput"]
+    lines = sum(_blocks(3, 700, 0), [])
+    # A stray acknowledgement mid-episode is ignored, the same way for every chunk size
+    lines.insert(5, protocol.ACK_LINE)
+    runs = [_run(monkeypatch, capsys, argv, lines, chunk) for chunk in (3, 7, 64, 1 << 20)]
+    assert all(run == runs[0] for run in runs[1:])
+    assert all(m["discarded"] > 0 for m in runs[0] if m["type"] == "reset" and m["episode"])
+
+
+def test_cli_pipeline_end_of_input_acknowledges(monkeypatch, capsys):
+    # Without acknowledgements the rest of the input is discarded and later episodes play 0s
+    msgs = _run(monkeypatch, capsys, ["--episodes=2", "--seed=6", "--pipeline=4"], [1] * 2000)
+    reset = next(m for m in msgs if m["type"] == "reset" and m["episode"] == 1)
+    played = sum(m["type"] == "step_result" and m["episode"] == 0 for m in msgs)
+    assert reset["discarded"] == 2000 - played
+    assert {m["action"] for m in msgs if m["type"] == "step_result" and m["episode"] == 1} == {0}
+
+
+async def _server_transcript(server, lines, chunk):
+    """Send `lines` in `chunk`-byte writes a few ms apart; return the received messages."""
+    srv = await server.start(host="127.0.0.1", port=0)
+    port = srv.sockets[0].getsockname()[1]
+    async with srv:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        data = "".join(f"{x}\n" for x in lines).encode()
+
+        async def send():
+            for i in range(0, len(data), chunk):
+                writer.write(data[i : i + chunk])
+                await writer.drain()
+                await asyncio.sleep(0.002)
+
+        task = asyncio.create_task(send())
+        out = [json.loads(line) async for line in reader]
+        task.cancel()
+        writer.close()
+        return out
+
+
+def test_server_pipeline_open_loop_client(monkeypatch, capsys):
+    depth = 32
+    server = StreamServer(ServerConfig(episodes=3, seed=6, pipeline=depth))
+    blocks = _blocks(3, 1000, 1)
+    lines = sum(blocks, [])
+    runs = [asyncio.run(_server_transcript(server, lines, chunk)) for chunk in (1 << 16, 4096)]
+    assert server.completed == 2
+    assert runs[0] == runs[1]
+    argv = ["--episodes=3", "--seed=6"]
+    _check_against_lockstep(monkeypatch, capsys, runs[0], blocks, argv, depth)
+
+
+def test_session_queue_depth():
+    env = protocol.make_env(0, False, "full")
+    session = protocol.StreamSession(env, episodes=1, seed=0, max_queue=2)
+    session.start()
+    session.submit("1\n")
+    session.submit("x\n")
+    assert session.queue_full and list(session.queue) == [1, 0]
+    with pytest.raises(RuntimeError):
+        session.submit("2\n")
+    assert json.loads(session.step_queued()[0])["action"] == 1
+    env.close()
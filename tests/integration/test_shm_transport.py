@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+import pytest
+
+from column_popper.client import StreamClient, connect
+
+
+def _play(transport, **options):
+    rng = np.random.default_rng(0)
+    msgs = []
+    with connect(transport, **options) as client:
+        for msg in client:
+            msgs.append(msg)
+            if msg["type"] == "step_request":
+                client.send(int(rng.choice(4, p=[0.3, 0.3, 0.3, 0.1])))
+    return msgs
+
+
+def _plain(msgs):
+    return [
+        {k: ({a: b.tolist() for a, b in v.items()} if k == "obs" else v) for k, v in m.items()}
+        for m in msgs
+    ]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"episodes": 2, "seed": 3},
+        {"episodes": 3, "seed": 8, "include_time": True, "info_level": "minimal"},
+        {"episodes": 1, "seed": 0, "info_level": "none"},
+    ],
+)
+def test_shm_and_pipe_transports_yield_the_same_messages(options):
+    pipe = _play("pipe", **options)
+    shm = _play("shm", slots=4, **options)
+    assert [m["type"] for m in shm].count("done") == options["episodes"]
+    assert _plain(shm) == _plain(pipe)
+    obs = shm[1]["obs"]
+    assert obs["board"].dtype == np.int32 and obs["board"].shape == (12, 3)
+    assert list(map(list, map(dict.keys, shm))) == list(map(list, map(dict.keys, pipe)))
+
+
+def test_shm_client_close_stops_the_env_process():
+    client = connect("shm", episodes=5, seed=1)
+    assert client.recv()["type"] == "meta"
+    proc = client._proc
+    client.close()
+    assert not proc.is_alive()
+    client.close()
+
+
+def test_shm_env_process_exits_when_client_goes_away():
+    client = connect("shm", episodes=5, seed=1)
+    client.recv()
+    client._channel._closed[0] = 1  # as if the client had died without close()
+    deadline = time.monotonic() + 10
+    while client._proc.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not client._proc.is_alive()
+    client.close()
+
+
+def test_shm_send_fails_when_the_env_process_dies_with_a_full_action_ring():
+    client = connect("shm", episodes=5, seed=1, slots=1)
+    client._proc.terminate()
+    client._proc.join()
+    client.send(0)  # fills the one-slot action ring
+    start = time.monotonic()
+    with pytest.raises(ConnectionError):
+        client.send(0)
+    assert time.monotonic() - start < 10
+    client.close()
+
+
+def test_stream_client_is_abstract():
+    with pytest.raises(TypeError):
+        StreamClient(episodes=1, seed=0, include_time=False, info_level="full")
+
+
+def test_connect_rejects_unknown_transport():
+    with pytest.raises(ValueError):
+        connect("carrier-pigeon")
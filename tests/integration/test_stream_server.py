@@ -0,0 +1,130 @@
+import asyncio
+import io
+import json
+
+import numpy as np
+import pytest
+
+from column_popper.cli import protocol
+from column_popper.cli.serve import ServerConfig, StreamServer
+
+
+def _actions(n, seed):
+    return np.random.default_rng(seed).choice(4, size=n, p=[0.3, 0.3, 0.3, 0.1]).tolist()
+
+
+async def _client(reader, writer, actions):
+    """Answer every step_request with the next action; return the received bytes."""
+    out = []
+    it = iter(actions)
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        out.append(line)
+        if json.loads(line)["type"] == "step_request":
+            writer.write(f"{next(it, 0)}\n".encode())
+            await writer.drain()
+    writer.close()
+    return b"".join(out)
+
+
+def _cli_transcript(monkeypatch, capsys, actions, argv):
+    monkeypatch.setattr("sys.stdin", io.StringIO("".join(f"{a}\n" for a in actions)))
+    assert protocol.main([*argv, "--throughput"]) == 0
+    return capsys.readouterr().out.encode()
+
+
+@pytest.mark.parametrize("transport", ["tcp", "unix"])
+def test_concurrent_sessions_match_cli(tmp_path, monkeypatch, capsys, transport):
+    config = ServerConfig(episodes=2, seed=3, include_time=True, distinct_seeds=True)
+    server = StreamServer(config)
+    actions = [_actions(2000, k) for k in range(24)]
+
+    async def run():
+        if transport == "unix":
+            path = str(tmp_path / "s.sock")
+            srv = await server.start(path=path)
+
+            def connect():
+                return asyncio.open_unix_connection(path)
+
+        else:
+            srv = await server.start(host="127.0.0.1", port=0)
+            port = srv.sockets[0].getsockname()[1]
+
+            def connect():
+                return asyncio.open_connection("127.0.0.1", port)
+
+        async with srv:
+
+            async def one(acts):
+                return await _client(*(await connect()), acts)
+
+            results = await asyncio.gather(*(one(a) for a in actions))
+            while server.active:
+                await asyncio.sleep(0.01)
+            return results
+
+    results = asyncio.run(run())
+    assert server.completed == len(actions)
+    # Sessions are numbered in accept order; match each transcript to its seed by its first reset
+    for acts, got in zip(actions, results, strict=True):
+        seed = json.loads(got.splitlines()[1])["info"]["seed"]
+        argv = ["--episodes=2", f"--seed={seed}", "--include-time"]
+        assert got == _cli_transcript(monkeypatch, capsys, acts, argv)
+
+
+def test_disconnect_and_session_limit():
+    server = StreamServer(ServerConfig(max_sessions=1, idle_timeout=5.0))
+
+    async def run():
+        srv = await server.start(host="127.0.0.1", port=0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            r1, w1 = await asyncio.open_connection("127.0.0.1", port)
+            assert json.loads(await r1.readline())["type"] == "meta"
+            # A second connection over the limit is closed without a greeting
+            r2, w2 = await asyncio.open_connection("127.0.0.1", port)
+            assert await r2.read() == b""
+            w2.close()
+            w1.close()
+            for _ in range(200):
+                if not server.active:
+                    break
+                await asyncio.sleep(0.01)
+        assert server.active == 0
+        assert server.completed == 0
+
+    asyncio.run(run())
+
+
+def test_failed_env_construction_frees_the_session_slot(monkeypatch):
+    server = StreamServer(ServerConfig(max_sessions=1, idle_timeout=5.0))
+    make_env = protocol.make_env
+    calls = []
+
+    def flaky_make_env(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("env construction failed")
+        return make_env(*args)
+
+    monkeypatch.setattr("column_popper.cli.serve.make_env", flaky_make_env)
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, ctx: None)
+        srv = await server.start(host="127.0.0.1", port=0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            r1, w1 = await asyncio.open_connection("127.0.0.1", port)
+            assert await r1.read() == b""
+            w1.close()
+            assert server.active == 0
+            # The slot is free again, so the next connection gets a session
+            r2, w2 = await asyncio.open_connection("127.0.0.1", port)
+            assert json.loads(await r2.readline())["type"] == "meta"
+            w2.close()
+
+    asyncio.run(run())
+    assert len(calls) == 2
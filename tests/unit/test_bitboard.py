@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def test_pack_unpack_roundtrip_and_key():
+    from column_popper.core.bitboard import (
+        board_key,
+        pack_board,
+        pack_column,
+        unpack_board,
+        unpack_column,
+    )
+
+    rng = np.random.default_rng(0)
+    grid = rng.integers(0, 4, size=(12, 3)).astype(np.int32)
+    codes = pack_board(grid)
+    assert codes.dtype == np.uint32
+    assert [pack_column(grid[:, c]) for c in range(3)] == codes.tolist()
+    np.testing.assert_array_equal(unpack_board(codes), grid)
+    np.testing.assert_array_equal(unpack_column(int(codes[1])), grid[:, 1])
+    assert board_key(codes) < 1 << 72
+
+    batch = rng.integers(0, 4, size=(5, 12, 3)).astype(np.int32)
+    np.testing.assert_array_equal(unpack_board(pack_board(batch)), batch)
+
+
+def test_bit_ops_match_scan_based_rules():
+    from column_popper.core import bitboard as bb
+    from column_popper.core.board import _pop_triples
+
+    rng = np.random.default_rng(1)
+    # Small alphabets make runs (and therefore pops) common
+    columns = rng.integers(0, 3, size=(2000, 12)).astype(np.int32)
+    codes = np.array([bb.pack_column(c) for c in columns], dtype=np.uint32)
+    vec_codes, vec_popped = bb.pop_triples_codes(codes)
+    for column, code, vcode, vpopped in zip(columns, codes, vec_codes, vec_popped, strict=True):
+        expected = column.copy()
+        expected_popped = _pop_triples(expected)
+        new_code, popped = bb.pop_triples(int(code))
+        assert popped == expected_popped == vpopped
+        assert new_code == bb.pack_column(expected) == vcode
+
+        occupied = np.flatnonzero(column)
+        empty = np.flatnonzero(column == 0)
+        assert bb.fill_count(int(code)) == occupied.size
+        assert bb.bottom_occupied_row(int(code)) == (occupied[-1] if occupied.size else -1)
+        assert bb.top_empty_row(int(code)) == (empty[0] if empty.size else -1)
+        avoid = column[1] if column[1] != 0 and column[1] == column[2] else 0
+        assert bb.spawn_avoid(int(code)) == avoid
+
+        shifted, overflow = bb.shift_down(int(code))
+        assert overflow == (column[-1] != 0)
+        np.testing.assert_array_equal(bb.unpack_column(shifted)[1:], column[:-1])
+
+
+def test_bitboard_backend_matches_array_board():
+    from column_popper.core.bitboard import BitBoard
+    from column_popper.core.board import Board
+
+    array_board = Board(seed=5)
+    bit_board = BitBoard(seed=5)
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        assert array_board.fall() == bit_board.fall()
+        col = int(rng.integers(0, 3))
+        row = int(rng.integers(0, 12))
+        array_board.set_cell(row, col, 0)
+        bit_board.set_cell(row, col, 0)
+        assert array_board.top_empty_row(col) == bit_board.top_empty_row(col)
+        assert array_board.bottom_occupied_row(col) == bit_board.bottom_occupied_row(col)
+        assert array_board.fill_count(col) == bit_board.fill_count(col)
+        assert array_board.pop_triples_in_column(col) == bit_board.pop_triples_in_column(col)
+        np.testing.assert_array_equal(array_board.grid, bit_board.grid)
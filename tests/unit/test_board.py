@@ -1,3 +1,5 @@
+import copy
+
 import numpy as np
 
 
@@ -36,3 +38,70 @@ def test_board_spawn_constraints_and_pops():
     v = board.spawn_value_for_column(col)
     assert v in (1, 2, 3)
     assert v != 1, "Spawn must avoid forming instant triple"
+
+
+def test_ring_board_matches_array_board():
+    from column_popper.core.board import Board, RingBoard
+
+    array_board = Board(seed=5)
+    ring_board = RingBoard(seed=5)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        assert array_board.fall() == ring_board.fall()
+        col = int(rng.integers(0, 3))
+        row = int(rng.integers(0, 12))
+        value = int(rng.integers(0, 3))
+        # Stack a triple now and then, so pops also cross the ring's wrap-around point
+        for r in range(row, min(row + (3 if value else 1), 12)):
+            array_board.set_cell(r, col, value)
+            ring_board.set_cell(r, col, value)
+        assert array_board.top_empty_row(col) == ring_board.top_empty_row(col)
+        assert array_board.bottom_occupied_row(col) == ring_board.bottom_occupied_row(col)
+        assert array_board.pop_triples_in_column(col) == ring_board.pop_triples_in_column(col)
+        np.testing.assert_array_equal(array_board.grid, ring_board.grid)
+        # Both halves of the doubled buffer hold the same rows
+        np.testing.assert_array_equal(ring_board._cells[:12], ring_board._cells[12:])
+    assert ring_board._head != 0
+
+    # The grid is a read-only view of the live cells: a later fall shows through it
+    grid = ring_board.grid
+    assert not grid.flags.writeable and grid.base is not None
+    kept = grid.copy()
+    ring_board.fall()
+    assert not np.array_equal(ring_board.grid, kept)
+    copied = copy.deepcopy(ring_board)
+    np.testing.assert_array_equal(copied.grid, ring_board.grid)
+    # Loading a grid resets the ring
+    ring_board.grid = array_board.grid
+    np.testing.assert_array_equal(ring_board.grid, array_board.grid)
+
+
+def test_column_index_tracks_mutations():
+    from column_popper.core.board import Board, RingBoard
+
+    rng = np.random.default_rng(1)
+    for cls in (Board, RingBoard):
+        board = cls(seed=11)
+        for _ in range(300):
+            if rng.random() < 0.4:
+                board.fall()
+            col = int(rng.integers(0, 3))
+            row = int(rng.integers(0, 12))
+            board.set_cell(row, col, int(rng.integers(0, 4)))
+            board.pop_triples_in_column(col)
+
+            column_index = [
+                (board.top_empty_row(c), board.bottom_occupied_row(c), board.fill_count(c))
+                for c in range(3)
+            ]
+            board.reindex()
+            for c in range(3):
+                column = board.grid[:, c]
+                empty = np.flatnonzero(column == 0)
+                occupied = np.flatnonzero(column)
+                expected = (
+                    int(empty[0]) if empty.size else -1,
+                    int(occupied[-1]) if occupied.size else -1,
+                    int(occupied.size),
+                )
+                assert column_index[c] == expected
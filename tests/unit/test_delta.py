@@ -0,0 +1,78 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from column_popper.cli import protocol, rollout
+from column_popper.utils.delta import DeltaDecoder, DeltaEncoder, expand
+
+
+def _run(monkeypatch, capsys, main, argv, text):
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BufferedReader(io.BytesIO(text.encode()))))
+    assert main(argv) == 0
+    return capsys.readouterr().out
+
+
+def _actions():
+    actions = np.random.default_rng(2).choice(4, size=3000, p=[0.3, 0.3, 0.3, 0.1])
+    return "\n".join(map(str, actions.tolist())) + "\n"
+
+
+@pytest.mark.parametrize("main", [rollout.main, protocol.main])
+@pytest.mark.parametrize("interval", ["0", "7"])
+@pytest.mark.parametrize("extra", [[], ["--include-time", "--throughput"]])
+def test_delta_stream_expands_to_plain_stream(monkeypatch, capsys, main, interval, extra):
+    argv = ["--episodes=3", "--seed=4", *extra]
+    text = _actions()
+    plain = _run(monkeypatch, capsys, main, argv, text)
+    delta = _run(
+        monkeypatch, capsys, main, [*argv, "--delta", f"--keyframe-interval={interval}"], text
+    )
+    # Rollout frames are mostly reward/info; the protocol also drops the step_request obs
+    assert len(delta) < len(plain) * (0.5 if main is protocol.main else 0.8)
+
+    plain_msgs = [json.loads(x) for x in plain.splitlines()]
+    delta_msgs = [json.loads(x) for x in delta.splitlines()]
+    if main is protocol.main:
+        assert delta_msgs[0] == {**plain_msgs[0], "delta": True, "keyframe_interval": int(interval)}
+        plain_msgs, delta_msgs = plain_msgs[1:], delta_msgs[1:]
+        assert all("obs" not in m for m in delta_msgs if m["type"] == "step_request")
+    assert list(expand(delta_msgs)) == plain_msgs
+
+    # Episodes open with a keyframe (the reset message, or a rollout's first frame)
+    keyframes = [m for m in delta_msgs if "obs" in m]
+    first = [m for m in delta_msgs if m.get("type", "reset") == "reset" and m.get("step", 0) == 0]
+    assert all("obs" in m for m in first)
+    if interval == "7":
+        assert len(keyframes) > 2 * len(first)
+
+
+def test_delta_fast_mode_is_byte_identical(monkeypatch, capsys):
+    argv = ["--episodes=2", "--seed=1", "--include-time", "--delta"]
+    text = _actions()
+    slow = _run(monkeypatch, capsys, protocol.main, argv, text)
+    fast = _run(monkeypatch, capsys, protocol.main, [*argv, "--throughput"], text)
+    assert fast == slow
+
+
+def test_encoder_lists_changed_cells():
+    board = np.zeros((12, 3), dtype=np.int32)
+    enc = DeltaEncoder(keyframe_interval=2)
+    key, _ = enc.encode({"board": board, "sel_pos": np.array([-1, -1])})
+    assert key == "obs"
+    board2 = board.copy()
+    board2[3, 1], board2[0, 2] = 5, 1
+    key, delta = enc.encode({"board": board2, "sel_pos": np.array([-1, -1])})
+    assert (key, delta) == ("obs_delta", {"board": [[0, 2, 1], [3, 1, 5]]})
+    key, delta = enc.encode({"board": board2, "sel_pos": np.array([0, 2])})
+    assert (key, delta) == ("obs_delta", {"sel_pos": [0, 2]})
+    # Every `keyframe_interval` deltas, and after reset()
+    assert enc.encode({"board": board2, "sel_pos": np.array([0, 2])})[0] == "obs"
+    enc.reset()
+    assert enc.encode({"board": board2, "sel_pos": np.array([0, 2])})[0] == "obs"
+
+
+def test_decoder_needs_a_keyframe():
+    with pytest.raises(ValueError):
+        DeltaDecoder().update({"obs_delta": {}})
@@ -0,0 +1,180 @@
+import json
+import math
+import threading
+from functools import partial
+
+import numpy as np
+import pytest
+
+from column_popper.cli import evaluate as evaluate_cli
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+from column_popper.eval import (
+    EpisodeResult,
+    cache_path,
+    evaluate,
+    hashed_random_policy,
+    load_results,
+    policy_hash,
+    summarize,
+)
+
+SEEDS = list(range(100, 124))
+
+
+def _single_env(seed):
+    env = ColumnPopperEnv(seed=seed)
+    obs, _ = env.reset(seed=seed)
+    total, length = 0.0, 0
+    while True:
+        batched = {k: np.asarray(v)[None] for k, v in obs.items()}
+        action = int(hashed_random_policy(batched)[0])
+        obs, reward, terminated, truncated, info = env.step(action)
+        total += reward
+        length += 1
+        if terminated or truncated:
+            env.close()
+            return EpisodeResult(
+                seed, float(info["score"]), length, total, bool(terminated), bool(truncated)
+            )
+
+
+def test_results_match_single_env_episodes():
+    results = evaluate("random", SEEDS[:6], batch=4)
+    assert [r.seed for r in results] == SEEDS[:6]
+    for r in results:
+        expected = _single_env(r.seed)
+        assert r.score == expected.score
+        assert r.length == expected.length
+        assert r.total_reward == pytest.approx(expected.total_reward)
+        assert (r.terminated, r.truncated) == (expected.terminated, expected.truncated)
+
+
+def test_results_do_not_depend_on_batch_or_workers():
+    base = evaluate("random", SEEDS, batch=1)
+    assert evaluate("random", SEEDS, batch=64) == base
+    assert evaluate("random", SEEDS, batch=5, shard_size=7) == base
+    assert evaluate("random", SEEDS, batch=8, workers=2) == base
+
+
+def test_callable_policy_and_env_kwargs():
+    def always_pick(obs):
+        return np.zeros(len(obs["board"]), dtype=np.int64)
+
+    results = evaluate(always_pick, SEEDS[:4], env_kwargs={"game_duration": 5.0})
+    assert all(r.truncated and r.length < 60 for r in results)
+
+
+def test_cache_only_plays_missing_seeds(tmp_path):
+    played = []
+    first = evaluate("random", SEEDS[:10], cache_dir=tmp_path, on_result=played.append)
+    assert len(played) == 10
+    played.clear()
+    second = evaluate("random", SEEDS, cache_dir=tmp_path, on_result=played.append)
+    assert sorted(r.seed for r in played) == SEEDS[10:]
+    assert second[:10] == first
+    path = cache_path(tmp_path, "random", {})
+    assert sorted(load_results(path)) == SEEDS
+    # Another config gets its own cache file
+    evaluate("random", SEEDS[:2], cache_dir=tmp_path, env_kwargs={"game_duration": 5.0})
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_policy_hash_tracks_source():
+    def a(obs):
+        return 0
+
+    def b(obs):
+        return 1
+
+    assert policy_hash("random") == policy_hash(hashed_random_policy)
+    assert policy_hash(a) != policy_hash(b)
+
+
+_WEIGHTS = np.zeros(4)
+
+
+def _weighted(obs, bias=0.0):
+    return np.full(len(obs["board"]), int(np.argmax(_WEIGHTS + bias)))
+
+
+class _Linear:
+    def __init__(self, weights):
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+    def __call__(self, obs):
+        return np.full(len(obs["board"]), int(np.argmax(self.weights)))
+
+
+def _closure(weights):
+    def policy(obs):
+        return np.full(len(obs["board"]), int(np.argmax(weights)))
+
+    return policy
+
+
+def test_policy_hash_tracks_weights_defaults_and_closures(monkeypatch):
+    assert policy_hash(_closure([1, 0])) == policy_hash(_closure([1, 0]))
+    assert policy_hash(_closure([1, 0])) != policy_hash(_closure([0, 1]))
+    assert policy_hash(_Linear([1, 0])) == policy_hash(_Linear([1, 0]))
+    assert policy_hash(_Linear([1, 0])) != policy_hash(_Linear([0, 1]))
+    assert policy_hash(partial(_weighted, bias=1.0)) != policy_hash(partial(_weighted, bias=2.0))
+
+    before = policy_hash(_weighted)
+    monkeypatch.setattr(_weighted, "__defaults__", (1.0,))
+    assert policy_hash(_weighted) != before
+    monkeypatch.undo()
+    # Module globals the policy reads are part of its identity
+    monkeypatch.setitem(globals(), "_WEIGHTS", np.ones(4))
+    assert policy_hash(_weighted) != before
+
+
+def test_policy_version_keys_the_cache(tmp_path):
+    assert policy_hash(_Linear([1, 0]), "v1") == policy_hash(_Linear([0, 1]), "v1")
+    assert policy_hash(_Linear([1, 0]), "v1") != policy_hash(_Linear([1, 0]), "v2")
+    assert cache_path(tmp_path, "random", {}, "v1") != cache_path(tmp_path, "random", {})
+    # State that has no stable hash needs an explicit version
+    held = _Linear([1, 0])
+    held.lock = threading.Lock()
+    with pytest.raises(ValueError, match="policy version"):
+        policy_hash(held)
+    evaluate(held, SEEDS[:2], cache_dir=tmp_path, policy_version="v1")
+    assert cache_path(tmp_path, held, {}, "v1").exists()
+
+
+def test_summarize_statistics():
+    results = [
+        EpisodeResult(i, float(i), 10 * i, 0.5 * i, i % 4 == 0, i % 4 != 0) for i in range(1, 9)
+    ]
+    summary = summarize(results)
+    assert summary["episodes"] == 8
+    score = summary["score"]
+    assert score["mean"] == 4.5
+    assert score["p50"] == 4.5
+    assert (score["min"], score["max"]) == (1.0, 8.0)
+    half = 1.959963984540054 * np.std(np.arange(1, 9), ddof=1) / math.sqrt(8)
+    assert score["ci95"] == pytest.approx([4.5 - half, 4.5 + half])
+    overflow = summary["overflow_rate"]
+    assert overflow["rate"] == 0.25
+    lo, hi = overflow["ci95"]
+    assert 0.0 < lo < 0.25 < hi < 1.0
+    assert summarize([])["episodes"] == 0
+
+
+def test_wilson_interval_at_the_edges():
+    results = [EpisodeResult(i, 0.0, 1, 0.0, False, True) for i in range(20)]
+    summary = summarize(results)
+    assert summary["overflow_rate"]["ci95"][0] == 0.0
+    assert 0.0 < summary["overflow_rate"]["ci95"][1] < 0.2
+    assert summary["truncation_rate"]["ci95"][1] == 1.0
+
+
+def test_cli_prints_summary(tmp_path, capsys):
+    out = tmp_path / "results.jsonl"
+    argv = ["--episodes=12", "--seed-start=5", "--batch=4", f"--results={out}"]
+    assert evaluate_cli.main([*argv, f"--cache-dir={tmp_path / 'cache'}"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["episodes"] == 12
+    assert summary["seeds"] == [5, 17]
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["seed"] for r in rows] == list(range(5, 17))
+    assert {"score", "length", "total_reward", "overflow_rate"} <= set(summary)
@@ -0,0 +1,165 @@
+import json
+
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import column_popper.envs  # noqa: F401
+from column_popper.envs import (
+    ColumnPopperEnv,
+    ProcessVectorColumnPopperEnv,
+    VectorColumnPopperEnv,
+)
+from column_popper.envs.events import EVENTS, EventCounts, MetricsExporter
+
+
+def _counts(**kwargs):
+    row = np.zeros(len(EVENTS), dtype=np.int64)
+    for event, value in kwargs.items():
+        row[EVENTS.index(event)] = value
+    return row
+
+
+def _play_singles(num_envs, steps, seed=100, **kwargs):
+    """Single envs driven like a next-step-autoreset vector env; returns merged counts."""
+    envs = [ColumnPopperEnv(seed=seed + i, **kwargs) for i in range(num_envs)]
+    for env in envs:
+        env.reset()
+    rng = np.random.default_rng(0)
+    done = [False] * num_envs
+    for _ in range(steps):
+        actions = rng.integers(0, 4, size=num_envs)
+        for i, env in enumerate(envs):
+            if done[i]:
+                env.reset()
+                done[i] = False
+            else:
+                _, _, term, trunc, _ = env.step(int(actions[i]))
+                done[i] = term or trunc
+    return EventCounts.merge(env.event_counts() for env in envs)
+
+
+def _play_vector(env, steps):
+    rng = np.random.default_rng(0)
+    env.reset()
+    for _ in range(steps):
+        env.step(rng.integers(0, 4, size=env.num_envs))
+    return env.event_counts()
+
+
+def test_single_env_counts_are_consistent():
+    env = ColumnPopperEnv(seed=3, initial_fall_interval=0.5)
+    env.reset()
+    rng = np.random.default_rng(1)
+    steps = picks = drops = manual = pops = 0
+    holding = False
+    for _ in range(3000):
+        action = int(rng.integers(0, 4))
+        _, _, terminated, truncated, info = env.step(action)
+        steps += 1
+        manual += action == 3
+        picks += action < 3 and not holding
+        drops += action < 3 and holding
+        pops += info["pops_this_step"]
+        holding = bool(env.selection[0])
+        if terminated or truncated:
+            assert env.last_episode_events is not None
+            assert env.last_episode_events["steps"] > 0
+            env.reset()
+            holding = False
+    counts = env.event_counts()
+    totals = dict(zip(EVENTS, counts.totals.tolist(), strict=True))
+    assert totals["steps"] == steps
+    assert totals["picks"] + totals["invalid_picks"] == picks
+    assert totals["drops"] + totals["invalid_drops"] == drops
+    assert totals["manual_falls"] == manual
+    assert totals["pops"] == pops
+    assert totals["scheduled_falls"] > 0
+    assert counts.episodes == totals["overflows"] + totals["truncations"] > 0
+    assert counts.finished[0] + counts.unfinished[0] == totals["steps"]
+
+
+def test_reset_moves_partial_episode_to_unfinished():
+    env = ColumnPopperEnv(seed=1)
+    env.reset()
+    for _ in range(5):
+        env.step(0)
+    env.reset()
+    env.step(3)
+    counts = env.event_counts()
+    assert counts.episodes == 0
+    assert counts.finished.sum() == 0
+    assert counts.unfinished[EVENTS.index("steps")] == 6
+    assert counts.unfinished[EVENTS.index("manual_falls")] == 1
+
+
+@pytest.mark.parametrize("num_threads", [1, 3])
+def test_vector_env_counts_match_single_envs(num_threads):
+    env = VectorColumnPopperEnv(6, seed=100, initial_fall_interval=0.5, num_threads=num_threads)
+    try:
+        counts = _play_vector(env, 800)
+    finally:
+        env.close()
+    assert counts == _play_singles(6, 800, initial_fall_interval=0.5)
+    assert counts.episodes > 6
+
+
+def test_vector_env_partial_reset_moves_counts():
+    env = VectorColumnPopperEnv(3, seed=0)
+    env.reset()
+    for _ in range(4):
+        env.step(np.array([0, 1, 3]))
+    env.reset(options={"reset_mask": [True, False, False]})
+    counts = env.event_counts()
+    assert counts.unfinished[EVENTS.index("steps")] == 12
+    np.testing.assert_array_equal(env._events_abandoned[0], env._events_abandoned.sum(axis=0))
+    env.close()
+
+
+def test_process_vector_env_merges_worker_counts():
+    env = ProcessVectorColumnPopperEnv(4, num_workers=2, seed=100, initial_fall_interval=0.5)
+    try:
+        counts = _play_vector(env, 300)
+    finally:
+        env.close()
+    assert counts == _play_singles(4, 300, initial_fall_interval=0.5)
+
+
+def test_as_dict_and_prometheus_text():
+    counts = EventCounts(2, _counts(steps=10, pops=6, overflows=2), _counts(steps=3))
+    data = counts.as_dict()
+    assert data["episodes"] == 2
+    assert data["totals"]["steps"] == 13
+    assert data["per_episode"]["pops"] == 3.0
+    text = counts.to_prometheus(labels='run="a"')
+    assert "# TYPE column_popper_events_total counter" in text
+    assert 'column_popper_events_total{event="steps",run="a"} 13' in text
+    assert 'column_popper_episodes_total{run="a"} 2' in text
+    assert 'column_popper_episode_events_mean{event="overflows",run="a"} 1' in text
+    assert "column_popper_episodes_total 0" in EventCounts.zeros().to_prometheus()
+
+
+def test_exporter_formats_and_interval(tmp_path):
+    env = gym.make("SpecKitAI/ColumnPopper-v1", disable_env_checker=True, seed=1)
+    venv = gym.vector.SyncVectorEnv([lambda i=i: ColumnPopperEnv(seed=i) for i in range(2)])
+    env.reset()
+    venv.reset(seed=0)
+    for _ in range(20):
+        env.step(0)
+        venv.step(np.array([0, 1]))
+    prom = MetricsExporter([env, venv], tmp_path / "cp.prom", interval=3600.0)
+    assert prom.maybe_write()
+    assert not prom.maybe_write()
+    assert 'column_popper_events_total{event="steps"} 60' in (tmp_path / "cp.prom").read_text()
+
+    exporter = MetricsExporter(venv, tmp_path / "cp.json", fmt="json", interval=0.0)
+    exporter.write()
+    snapshot = json.loads((tmp_path / "cp.json").read_text())
+    assert snapshot["totals"]["steps"] == 40
+    assert {"time", "version", "episodes", "per_episode"} <= snapshot.keys()
+    assert not list(tmp_path.glob(".*.tmp"))
+
+    with pytest.raises(ValueError):
+        MetricsExporter(env, tmp_path / "x", fmt="csv")
+    with pytest.raises(TypeError):
+        MetricsExporter(object(), tmp_path / "x")
@@ -0,0 +1,39 @@
+import json
+import pickle
+
+import pytest
+
+
+def test_lazy_info_resolves_on_access_and_serializes():
+    from column_popper.envs.info import LazyInfo
+
+    info = LazyInfo.for_level("full", (1.5, -0.2, 3, 2.0))
+    assert len(info) == 4 and "time_left" in info
+    assert info["time_left"] == 0.0
+    assert info.get("missing", 7) == 7
+    expected = {"score": 1.5, "time_left": 0.0, "pops_this_step": 3, "fall_interval": 2.0}
+    assert json.loads(json.dumps(LazyInfo.for_level("full", (1.5, -0.2, 3, 2.0)))) == expected
+    assert dict(LazyInfo.for_level("full", (1.5, -0.2, 3, 2.0))) == expected
+    assert {**LazyInfo.for_level("full", (1.5, -0.2, 3, 2.0))} == expected
+    assert pickle.loads(pickle.dumps(LazyInfo.for_level("full", (1.5, -0.2, 3, 2.0)))) == expected
+    info["episode"] = {"r": 1.0}
+    assert info.copy() == {**expected, "episode": {"r": 1.0}}
+
+
+@pytest.mark.parametrize(
+    "level, keys",
+    [
+        ("none", set()),
+        ("minimal", {"score", "pops_this_step"}),
+        ("full", {"score", "time_left", "pops_this_step", "fall_interval"}),
+    ],
+)
+def test_env_info_levels_and_reset_only_constants(level, keys):
+    from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+    env = ColumnPopperEnv(seed=3, info_level=level)
+    _, info = env.reset()
+    assert set(info) == keys | {"seed", "version", "spawn_stream"}
+    assert info["seed"] == 3
+    _, _, _, _, info = env.step(3)
+    assert set(info) == keys
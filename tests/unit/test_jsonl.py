@@ -0,0 +1,116 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from column_popper.cli import protocol, rollout
+from column_popper.utils.jsonl import BulkReader, FrameWriter, dumps, encode_obs
+
+SRC = str(Path(__file__).resolve().parents[2] / "src")
+
+
+def _stdin(text: str) -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BufferedReader(io.BytesIO(text.encode())))
+
+
+def _run(monkeypatch, capsys, main, argv, text):
+    monkeypatch.setattr("sys.stdin", _stdin(text))
+    assert main(argv) == 0
+    return capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        np.arange(36, dtype=np.int32).reshape(12, 3) % 4,
+        np.array([-1, 2], dtype=np.int32),
+        np.array([0.1, 1e-20, 3.0], dtype=np.float32),
+        np.array([np.nan, np.inf], dtype=np.float64),
+        np.zeros((0, 3), dtype=np.int32),
+        np.array([True, False]),
+    ],
+)
+def test_encode_obs_matches_json_dumps(value):
+    obs = {"board": value, "é": np.array([7], dtype=np.uint8)}
+    plain = {k: v.tolist() for k, v in obs.items()}
+    assert encode_obs(obs) == json.dumps(plain)
+
+
+def test_dumps_appends_encoded_values():
+    obs = {"sel_pos": np.array([-1, -1], dtype=np.int32)}
+    msg = {"type": "reset", "info": {"seed": None}, "r": float("nan")}
+    expected = json.dumps({**msg, "obs": {"sel_pos": [-1, -1]}, "x": [1]})
+    assert dumps(msg, obs=encode_obs(obs), x="[1]") == expected
+    assert dumps({}, x="[1]") == json.dumps({"x": [1]})
+    assert dumps(msg) == json.dumps(msg)
+
+
+@pytest.mark.parametrize("main", [rollout.main, protocol.main])
+@pytest.mark.parametrize("extra", [[], ["--include-time", "--info-level=minimal"]])
+def test_throughput_mode_is_byte_identical(monkeypatch, capsys, main, extra):
+    actions = np.random.default_rng(5).choice(4, size=1500, p=[0.3, 0.3, 0.3, 0.1])
+    # Blank, invalid and CRLF lines and a final line without a newline
+    text = "\n".join(map(str, actions.tolist())) + "\n\nx\r\n7\r\n2\n1"
+    argv = ["--episodes=3", "--seed=9", *extra]
+    slow = _run(monkeypatch, capsys, main, argv, text)
+    fast = _run(monkeypatch, capsys, main, [*argv, "--throughput"], text)
+    assert fast == slow
+    assert len(slow.splitlines()) > 100
+
+
+@pytest.mark.parametrize("level", ["none", "full"])
+def test_rollout_first_frame_carries_episode_info(monkeypatch, capsys, level):
+    argv = ["--episodes=2", "--seed=9", f"--info-level={level}"]
+    out = _run(monkeypatch, capsys, rollout.main, argv, "3\n" * 100)
+    frames = [json.loads(line) for line in out.splitlines()]
+    firsts = [f for f in frames if f["step"] == 0]
+    assert [f["info"]["seed"] for f in firsts] == [9, 10]
+    assert all({"version", "spawn_stream"} <= f["info"].keys() for f in firsts)
+    assert not any("seed" in f["info"] for f in frames if f["step"] > 0)
+
+
+def test_bulk_reader_matches_readline():
+    text = "1\n\n22\r\nx\n3"
+    reader = BulkReader(_stdin(text))
+    plain = io.StringIO(text)
+    for _ in range(7):
+        assert reader.readline() == plain.readline()
+
+
+def test_frame_writer_buffers_until_flush():
+    sink = io.StringIO()
+    writer = FrameWriter(sink, flush_interval=3600.0)
+    writer.write("a\n")
+    assert sink.getvalue() == ""
+    reader = BulkReader(io.StringIO("0\n"), on_wait=writer.flush)
+    assert reader.readline() == "0\n"
+    assert sink.getvalue() == "a\n"
+
+
+def test_protocol_throughput_answers_interactive_client():
+    env = {**os.environ, "PYTHONPATH": SRC}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "column_popper.cli.protocol", "--throughput", "--seed=1"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    assert proc.stdin is not None and proc.stdout is not None
+    try:
+        for step in range(5):
+            while True:
+                msg = json.loads(proc.stdout.readline())
+                if msg["type"] == "step_request":
+                    break
+            assert msg["step"] == step
+            proc.stdin.write("3\n")
+            proc.stdin.flush()
+    finally:
+        proc.kill()
+        proc.wait()
@@ -0,0 +1,170 @@
+import copy
+import pickle
+
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import column_popper.envs  # noqa: F401
+from column_popper.envs import (
+    ColumnPopperEnv,
+    ProcessVectorColumnPopperEnv,
+    VectorColumnPopperEnv,
+)
+from column_popper.envs.profiling import PHASES, ProfileReport, profile
+
+
+def _play(env, steps, seed=3):
+    rng = np.random.default_rng(0)
+    out = []
+    obs, _ = env.reset(seed=seed)
+    for a in rng.integers(0, 4, size=steps).tolist():
+        obs, reward, terminated, truncated, info = env.step(a)
+        out.append((obs["board"].tobytes(), reward, terminated, truncated, dict(info)))
+        if terminated or truncated:
+            env.reset()
+    return out
+
+
+def test_disabled_env_runs_plain_methods():
+    env = ColumnPopperEnv(seed=1)
+    assert not env.profiling
+    env.enable_profiling()
+    assert env.profiling
+    assert all(name in env.__dict__ for name in env._PROFILE_HOOKS.values())
+    env.disable_profiling()
+    assert not env.profiling
+    assert not any(name in env.__dict__ for name in env._PROFILE_HOOKS.values())
+    # Stats stay readable after disabling
+    assert env.profile_report() == ProfileReport()
+
+
+def test_profiling_does_not_change_the_game():
+    plain = _play(ColumnPopperEnv(seed=3), 1500)
+    assert _play(ColumnPopperEnv(seed=3, profile=True), 1500) == plain
+
+
+def test_phase_counts():
+    env = ColumnPopperEnv(seed=3, profile=True)
+    _play(env, 500)
+    phases = env.profile_report().phases
+    resets = phases["reset"][0]
+    assert resets >= 1
+    for phase in ("step", "action", "schedule"):
+        assert phases[phase][0] == 500
+    assert phases["obs"][0] == phases["info"][0] == 500 + resets
+    # reset() spawns the first row with one fall tick
+    assert phases["fall"][0] >= resets
+    assert 0 < phases["pop"][0] < 500
+    assert all(ns > 0 for calls, ns in phases.values() if calls)
+    env.enable_profiling()
+    assert env.profile_report().steps == 0
+
+
+def test_self_time_excludes_nested_phases():
+    env = ColumnPopperEnv(seed=3, profile=True)
+    _play(env, 300)
+    report = env.profile_report()
+    env.disable_profiling()
+    # The step phase is what `step()` spends outside its nested phases
+    assert report.phases["step"][1] < report.total_ns - report.phases["reset"][1]
+
+
+def test_report_merge_and_file_round_trip(tmp_path):
+    a = ProfileReport({"step": (2, 100), "obs": (2, 40)})
+    b = ProfileReport({"step": (3, 200), "fall": (1, 60)})
+    merged = ProfileReport.merge([a, b])
+    assert merged.phases["step"] == (5, 300)
+    assert merged.steps == 5 and merged.total_ns == 400
+    data = merged.as_dict()
+    assert list(data["phases"]) == list(PHASES)
+    assert data["phases"]["step"]["ns_per_step"] == 60.0
+    assert data["phases"]["fall"]["share"] == 0.15
+    merged.write(tmp_path / "p.json")
+    assert ProfileReport.read(tmp_path / "p.json") == merged
+    assert "step" in merged.format()
+
+
+def test_context_manager_over_wrapped_and_sync_vector_envs(tmp_path):
+    env = gym.make("SpecKitAI/ColumnPopper-v1", disable_env_checker=True, seed=1)
+    venv = gym.vector.SyncVectorEnv(
+        [lambda i=i: ColumnPopperEnv(seed=i) for i in range(3)],
+        autoreset_mode=gym.vector.AutoresetMode.NEXT_STEP,
+    )
+    path = tmp_path / "profile.json"
+    with profile(env, venv, path=path) as prof:
+        env.reset()
+        venv.reset(seed=0)
+        for _ in range(50):
+            env.step(3)
+            venv.step(np.array([0, 1, 2]))
+        assert prof.report().steps == 50 + 3 * 50
+    assert not env.unwrapped.profiling
+    assert prof.report().steps == 200
+    assert ProfileReport.read(path) == prof.report()
+    with pytest.raises(TypeError):
+        profile(object())
+
+
+@pytest.mark.parametrize("num_threads", [1, 3])
+def test_vector_env_profiling(num_threads):
+    env = VectorColumnPopperEnv(6, seed=0, num_threads=num_threads, profile=True)
+    rng = np.random.default_rng(0)
+    env.reset()
+    for _ in range(100):
+        env.step(rng.integers(0, 4, size=6))
+    phases = env.profile_report().phases
+    assert phases["step"][0] == 100
+    # One core step per shard per step
+    assert phases["action"][0] == 100 * num_threads
+    assert phases["schedule"][0] == 100 * num_threads
+    env.disable_profiling()
+    assert not any(shard.profiling for shard in env._shards)
+    env.close()
+
+
+def test_process_vector_env_merges_worker_stats():
+    env = ProcessVectorColumnPopperEnv(4, num_workers=2, seed=0)
+    try:
+        with profile(env) as prof:
+            env.reset()
+            for _ in range(30):
+                env.step(np.array([0, 1, 2, 3]))
+        phases = prof.report().phases
+        # Each worker counts its own steps
+        assert phases["step"][0] == 60
+        assert env.profile_report() == prof.report()
+    finally:
+        env.close()
+
+
+def test_deepcopy_profiles_the_copy():
+    env = ColumnPopperEnv(seed=3, profile=True)
+    env.reset()
+    clone = copy.deepcopy(env)
+    before = env.profile_report()
+    for _ in range(20):
+        clone.step(0)
+    assert env.profile_report() == before
+    assert clone.profiling
+    assert clone.profile_report().steps == 20
+
+
+@pytest.mark.parametrize(
+    ("make", "action"),
+    [
+        (lambda: ColumnPopperEnv(seed=3, profile=True), 0),
+        (lambda: VectorColumnPopperEnv(2, seed=3, profile=True), np.zeros(2, dtype=np.int64)),
+    ],
+    ids=["single", "vector"],
+)
+def test_pickled_env_keeps_profiling(make, action):
+    env = make()
+    env.reset()
+    env.step(action)
+    clone = pickle.loads(pickle.dumps(env))
+    assert clone.profiling
+    assert clone.profile_report() == env.profile_report()
+    clone.step(action)
+    assert clone.profile_report().steps == 2
+    assert env.profile_report().steps == 1
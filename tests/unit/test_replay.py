@@ -0,0 +1,130 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+from column_popper.utils.replay import (
+    ReplayEpisode,
+    ReplayError,
+    ReplayHeader,
+    ReplayWriter,
+    pack_actions,
+    read_replay,
+    record_episode,
+    replay_episode,
+    unpack_actions,
+)
+
+
+def test_pack_actions_roundtrip():
+    actions = np.array([0, 1, 2, 3, 3, 2, 1], dtype=np.uint8)
+    packed = pack_actions(actions)
+    assert len(packed) == 2
+    np.testing.assert_array_equal(unpack_actions(packed, 7), actions)
+    with pytest.raises(ValueError):
+        pack_actions([4])
+
+
+def test_replay_roundtrip_and_verification(tmp_path):
+    env = ColumnPopperEnv(seed=0, strict_invalid=True, schedule_curve=[(5.0, 0.5)])
+    header = ReplayHeader.for_env(env)
+    rng = np.random.default_rng(3)
+    recorded = [record_episode(env, 10 + i, rng.integers(0, 4, size=900)) for i in range(3)]
+    recorded.append(record_episode(env, 7, [3, 3], digests=False))
+    path = tmp_path / "episodes.cpr"
+    with ReplayWriter(path, header) as writer:
+        for episode in recorded:
+            writer.write_episode(episode)
+
+    loaded_header, episodes = read_replay(path)
+    assert loaded_header == header
+    assert [e.seed for e in episodes] == [10, 11, 12, 7]
+    assert episodes[3].digests is None
+    for original, episode in zip(recorded[:3], episodes[:3], strict=True):
+        np.testing.assert_array_equal(original.actions, episode.actions)
+        result = replay_episode(loaded_header, episode)
+        assert result.steps == episode.steps
+        assert result.terminated or result.truncated
+
+    # Any divergence fails at the first differing step
+    first = episodes[0]
+    k = int(np.flatnonzero(first.actions != 3)[0])
+    tampered = first.actions.copy()
+    tampered[k] = 3
+    with pytest.raises(ReplayError, match=f"mismatch at step {k}"):
+        replay_episode(loaded_header, ReplayEpisode(first.seed, tampered, first.digests))
+    bad = tmp_path / "bad.cpr"
+    bad.write_bytes(b"XXXX" + path.read_bytes()[4:])
+    with pytest.raises(ReplayError):
+        read_replay(bad)
+
+
+def test_unseeded_episodes_are_rejected(tmp_path):
+    env = ColumnPopperEnv(seed=0)
+    header = ReplayHeader.for_env(env)
+    with pytest.raises(ValueError, match="Unseeded"):
+        record_episode(env, None, [3, 3])
+    unseeded = ReplayEpisode(None, np.array([3, 3], dtype=np.uint8))
+    with ReplayWriter(tmp_path / "x.cpr", header) as writer:
+        with pytest.raises(ValueError, match="Unseeded"):
+            writer.write_episode(unseeded)
+    # Episodes flagged unseeded by older writers fail clearly instead of replaying wrongly
+    with pytest.raises(ReplayError, match="without a seed"):
+        replay_episode(header, unseeded)
+
+
+def test_replay_cli_converts_rollout_jsonl(tmp_path, monkeypatch, capsys):
+    from column_popper.cli import replay, rollout
+
+    actions = "\n".join(str(a) for a in np.random.default_rng(1).integers(0, 4, size=3000))
+    monkeypatch.setattr("sys.stdin", io.StringIO(actions + "\n"))
+    assert rollout.main(["--episodes=2", "--seed=5", "--info-level=none"]) == 0
+    frames = capsys.readouterr().out
+    jsonl = tmp_path / "frames.jsonl"
+    jsonl.write_text(frames)
+
+    out = tmp_path / "frames.cpr"
+    assert replay.main(["convert", str(jsonl), str(out), "--seed=5", "--check"]) == 0
+    assert out.stat().st_size * 20 < len(frames)
+    _, episodes = read_replay(out)
+    steps = [
+        sum(1 for line in frames.splitlines() if json.loads(line)["episode"] == e) for e in (0, 1)
+    ]
+    assert [e.steps for e in episodes] == steps
+    capsys.readouterr()
+    assert replay.main(["run", str(out)]) == 0
+    assert "Replayed 2 episodes" in capsys.readouterr().out
+    # Converting with the wrong seed is caught against the seeds the frames report
+    assert replay.main(["convert", str(jsonl), str(out), "--seed=6", "--no-check"]) == 1
+    assert "played with seed 5" in capsys.readouterr().err
+    # Without --seed the frames' seeds are used, and frames are checked by default
+    assert replay.main(["convert", str(jsonl), str(out)]) == 0
+    for loaded, first in zip(read_replay(out)[1], episodes, strict=True):
+        assert loaded.seed == first.seed
+        np.testing.assert_array_equal(loaded.actions, first.actions)
+
+
+def test_replay_cli_checks_delta_and_seedless_frames(tmp_path, monkeypatch, capsys):
+    from column_popper.cli import replay, rollout
+
+    actions = "\n".join(str(a) for a in np.random.default_rng(2).integers(0, 4, size=2000))
+    monkeypatch.setattr("sys.stdin", io.StringIO(actions + "\n"))
+    assert rollout.main(["--episodes=2", "--seed=5", "--delta", "--keyframe-interval=7"]) == 0
+    jsonl = tmp_path / "delta.jsonl"
+    jsonl.write_text(capsys.readouterr().out)
+    out = tmp_path / "delta.cpr"
+    assert replay.main(["convert", str(jsonl), str(out)]) == 0
+    capsys.readouterr()
+
+    # Frames without seed info (older rollouts) need --seed, and a wrong one fails the check
+    frames = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    for frame in frames:
+        frame["info"] = {}
+    jsonl.write_text("".join(json.dumps(frame) + "\n" for frame in frames))
+    assert replay.main(["convert", str(jsonl), str(out)]) == 1
+    assert "pass --seed" in capsys.readouterr().err
+    assert replay.main(["convert", str(jsonl), str(out), "--seed=6"]) == 1
+    assert "diverges" in capsys.readouterr().err
+    assert replay.main(["convert", str(jsonl), str(out), "--seed=5"]) == 0
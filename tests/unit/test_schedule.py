@@ -21,3 +21,45 @@ def test_schedule_basic_and_curve():
     assert falls_total == 5
     assert sched.truncated is True
 
+
+def test_fixed_dt_timeline_matches_stepwise_schedule():
+    from column_popper.core.schedule import Schedule
+
+    curve = [(40.0, 1.0), (7.5, 0.35), (20.0, 2.0), (20.0, 0.5)]
+    stepwise = Schedule(game_duration=60.0, initial_interval=3.0, curve=curve)
+    tabled = Schedule(game_duration=60.0, initial_interval=3.0, curve=curve, fixed_dt=0.1)
+    for _ in range(605):
+        assert tabled.advance_step(dt=0.1) == stepwise.advance_step(dt=0.1)
+        assert tabled.get_state() == stepwise.get_state()
+    assert tabled.truncated and stepwise.truncated
+
+
+def test_timeline_resumes_after_set_state_and_other_dt():
+    from column_popper.core.schedule import Schedule
+
+    ref = Schedule(game_duration=30.0, initial_interval=1.3, curve=[(10.0, 0.7)])
+    sched = Schedule(game_duration=30.0, initial_interval=1.3, curve=[(10.0, 0.7)], fixed_dt=0.1)
+    for _ in range(120):
+        ref.advance_step(dt=0.1)
+    sched.set_state(ref.get_state())
+    assert sched.advance_step(dt=0.1) == ref.advance_step(dt=0.1)
+    assert sched._step == 121
+    # A different dt leaves the table; later steps are computed stepwise
+    assert sched.advance_step(dt=0.25) == ref.advance_step(dt=0.25)
+    assert sched.advance_step(dt=0.1) == ref.advance_step(dt=0.1)
+    assert sched.get_state() == ref.get_state() and sched._step is None
+
+
+def test_compiled_interval_lookup_and_stacking():
+    from column_popper.core.schedule import compile_schedule, stack_timelines
+
+    compiled = compile_schedule(60.0, 3.0, ((40.0, 1.0), (20.0, 2.0)))
+    assert compiled.interval_at(20.0, 3.0) == 3.0  # thresholds apply strictly after
+    assert compiled.interval_at(20.1, 3.0) == 2.0
+    assert compiled.interval_at(59.0, 3.0) == 1.0
+    other = compile_schedule(60.0, 3.0, ())
+    stacked = stack_timelines([compiled.timeline(0.1), other.timeline(0.1)])
+    assert stacked.falls.shape == (2, stacked.last_step + 1)
+    assert stacked.fall_interval[1].max() == 3.0
+    with pytest.raises(ValueError):
+        stack_timelines([compiled.timeline(0.1), compiled.timeline(0.2)])
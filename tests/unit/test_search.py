@@ -0,0 +1,127 @@
+import time
+
+import numpy as np
+import pytest
+
+from column_popper.agents.search import (
+    ExpectimaxPlanner,
+    GameModel,
+    MCTSPlanner,
+    SearchConfig,
+    TranspositionTable,
+)
+from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+
+def _assert_model_matches_env(env, steps, rng):
+    model = GameModel.from_env(env)
+    env.reset()
+    state = model.root(env)
+    for _ in range(steps):
+        action = int(rng.choice(4, p=[0.3, 0.3, 0.3, 0.1]))
+        after, reward, ticks, terminal = model.apply_action(state, action)
+        obs, env_reward, terminated, truncated, _ = env.step(action)
+        assert reward == env_reward
+        assert terminal == (terminated or truncated)
+        if terminal:
+            env.reset()
+            state = model.root(env)
+            continue
+        # Replay the env's spawns (newest tick in row 0) through the chance ticks
+        for k in range(ticks):
+            after = model.tick(after, [int(v) for v in obs["board"][ticks - 1 - k]])
+        assert after == model.root(env)
+        state = after
+
+
+@pytest.mark.parametrize("strict_invalid", [False, True])
+def test_game_model_matches_env_given_spawns(strict_invalid):
+    env = ColumnPopperEnv(seed=3, strict_invalid=strict_invalid, initial_fall_interval=0.35)
+    _assert_model_matches_env(env, 1500, np.random.default_rng(0))
+
+
+@pytest.mark.parametrize("seed", range(24))
+def test_game_model_matches_env_over_seeds(seed):
+    # Random rules per seed: short games reach truncation, curves change the interval
+    rng = np.random.default_rng(seed)
+    env = ColumnPopperEnv(
+        seed=seed,
+        strict_invalid=bool(seed % 2),
+        initial_fall_interval=float(rng.choice([0.15, 0.35, 1.0, 3.0])),
+        game_duration=float(rng.choice([4.0, 15.0, 60.0])),
+        schedule_curve=[(1.5, float(rng.choice([0.2, 0.5]))), (3.0, 0.3)],
+    )
+    _assert_model_matches_env(env, 400, rng)
+
+
+def test_tick_outcomes_follow_spawn_constraint():
+    model = GameModel()
+    state = GameModel().root(_env_with_grid({(0, 0): 2, (1, 0): 2}))
+    outcomes = list(model.tick_outcomes(state))
+    # Column 0 avoids 2 (rows 1-2 after the shift hold 2, 2); the others allow all three
+    assert len(outcomes) == 2 * 3 * 3
+    assert sum(p for p, _ in outcomes) == pytest.approx(1.0)
+    assert {s.codes[0] & 3 for _, s in outcomes} == {1, 3}
+
+
+def _env_with_grid(cells, seed=0):
+    env = ColumnPopperEnv(seed=seed)
+    env.reset()
+    grid = np.zeros((12, 3), dtype=np.int32)
+    for (r, c), v in cells.items():
+        grid[r, c] = v
+    env.board.grid = grid
+    env.board.reindex()
+    return env
+
+
+def test_transposition_table_lru_eviction():
+    table = TranspositionTable(2, "lru")
+    table.put(1, "a")
+    table.put(2, "b")
+    assert table.get(1) == "a"  # 1 becomes most recent
+    table.put(3, "c")
+    assert table.get(2) is None and table.get(1) == "a" and table.get(3) == "c"
+    assert len(table) == 2 and table.evictions == 1
+
+
+def test_transposition_table_depth_preferred_keeps_shallow_entries():
+    class Entry:
+        def __init__(self, depth):
+            self.depth = depth
+
+    table = TranspositionTable(1, "depth")
+    table.put(10, Entry(5))
+    table.put(11, Entry(9))  # deeper: rejected
+    assert table.get(10).depth == 5 and table.get(11) is None
+    table.put(12, Entry(3))  # shallower: replaces
+    assert table.get(12).depth == 3
+    table.horizon = 4  # entries before the current root are stale
+    table.put(13, Entry(8))
+    assert table.get(13).depth == 8 and len(table) == 1
+
+
+@pytest.mark.parametrize("planner_cls", [MCTSPlanner, ExpectimaxPlanner])
+def test_planners_take_an_immediate_pop(planner_cls):
+    # Dropping into column 1 lands in its top empty row and completes 2, 2, 2
+    env = _env_with_grid({(11, 0): 2, (1, 1): 2, (2, 1): 2, (11, 1): 3, (11, 2): 1})
+    env.step(0)  # hold the 2 from column 0
+    planner = planner_cls.for_env(env, SearchConfig(max_nodes=400, max_depth=6, seed=0))
+    assert planner.act(env) == 1
+    result = planner.last_result
+    assert 0 < result.nodes <= 400
+    assert result.values[1] == max(result.values)
+
+
+def test_mcts_respects_time_budget_and_reuses_tree():
+    env = ColumnPopperEnv(seed=2)
+    env.reset()
+    planner = MCTSPlanner.for_env(env, SearchConfig(max_nodes=None, time_limit=0.05, seed=1))
+    start = time.perf_counter()
+    action = planner.act(env)
+    assert time.perf_counter() - start < 0.5
+    assert planner.last_result.nodes > 0
+    # No fall is due on the next step, so the next root was already expanded
+    env.step(action)
+    node = planner.table.get(planner.model.key(planner.model.root(env)))
+    assert node is not None and node.visits > 0
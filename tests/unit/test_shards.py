@@ -0,0 +1,96 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from column_popper.utils.shards import ShardWriter, existing_shards, iter_shards, load_shard
+
+
+def _rollout(monkeypatch, capsys, actions, *args):
+    from column_popper.cli import rollout
+
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(map(str, actions)) + "\n"))
+    assert rollout.main(["--episodes=3", "--seed=11", "--include-time", *args]) == 0
+    return capsys.readouterr().out
+
+
+@pytest.mark.parametrize("compress", ["deflate", "none"])
+def test_npz_rollout_matches_jsonl_frames(tmp_path, monkeypatch, capsys, compress):
+    actions = np.random.default_rng(2).choice(4, size=4000, p=[0.3, 0.3, 0.3, 0.1]).tolist()
+    frames = [json.loads(line) for line in _rollout(monkeypatch, capsys, actions).splitlines()]
+    out = tmp_path / "shards"
+    _rollout(
+        monkeypatch,
+        capsys,
+        actions,
+        "--format=npz",
+        f"--out-dir={out}",
+        "--shard-steps=100",
+        f"--compress={compress}",
+    )
+
+    shards = list(iter_shards(out))
+    assert len(shards) >= 2
+    if compress == "none":
+        assert isinstance(shards[0]["board"], np.memmap)
+    cols = {k: np.concatenate([s[k] for s in shards]) for k in shards[0]}
+    assert cols["board"].dtype == np.uint8 and cols["board"].shape == (len(frames), 12, 3)
+    np.testing.assert_array_equal(cols["board"], [f["obs"]["board"] for f in frames])
+    np.testing.assert_array_equal(cols["selection"], [f["obs"]["selection"] for f in frames])
+    np.testing.assert_array_equal(cols["sel_pos"], [f["obs"]["sel_pos"] for f in frames])
+    np.testing.assert_array_equal(
+        cols["time_left_norm"], np.array([f["obs"]["time_left_norm"] for f in frames], np.float32)
+    )
+    np.testing.assert_array_equal(cols["action"], [f["action"] for f in frames])
+    np.testing.assert_array_equal(cols["reward"], [f["reward"] for f in frames])
+    np.testing.assert_array_equal(cols["terminated"], [f["terminated"] for f in frames])
+    np.testing.assert_array_equal(cols["truncated"], [f["truncated"] for f in frames])
+    np.testing.assert_array_equal(cols["score"], [f["info"]["score"] for f in frames])
+    assert cols["episode"].tolist() == [0, 1, 2]
+    assert cols["episode_seed"].tolist() == [11, 12, 13]
+
+
+def test_shard_writer_offsets_and_flush(tmp_path):
+    with ShardWriter(tmp_path, shard_steps=10, compress=False) as writer:
+        for epi, n in enumerate([4, 3, 5, 2]):
+            writer.add_episode(
+                epi,
+                None if epi == 3 else epi,
+                {"action": np.full(n, epi, dtype=np.uint8), "empty": np.zeros((n, 0))},
+            )
+    assert [p.name for p in writer.paths] == ["shard-00000.npz", "shard-00001.npz"]
+    first = load_shard(writer.paths[0])
+    assert first["episode_start"].tolist() == [0, 4, 7, 12]
+    assert first["action"][7:12].tolist() == [2] * 5
+    second = load_shard(writer.paths[1], mmap=False)
+    assert second["episode_seed"].tolist() == [-1]
+    assert second["empty"].shape == (2, 0)
+
+
+def test_shard_writer_refuses_directory_with_shards(tmp_path):
+    with ShardWriter(tmp_path, shard_steps=1) as writer:
+        writer.add_episode(0, 0, {"action": np.zeros(3, dtype=np.uint8)})
+    assert existing_shards(tmp_path) == writer.paths
+    with pytest.raises(FileExistsError):
+        ShardWriter(tmp_path)
+    # Other files do not count as shards
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "notes.txt").write_text("x")
+    ShardWriter(tmp_path / "other").close()
+
+
+@pytest.mark.parametrize("extra", ["--delta", "--throughput", None])
+def test_npz_rollout_rejects_jsonl_options_and_reused_out_dir(tmp_path, monkeypatch, extra):
+    from column_popper.cli import rollout
+
+    out = tmp_path / "shards"
+    if extra is None:
+        monkeypatch.setattr("sys.stdin", io.StringIO(""))
+        assert rollout.main(["--format=npz", f"--out-dir={out}"]) == 0
+        args = []
+    else:
+        args = [extra]
+    with pytest.raises(SystemExit) as exc:
+        rollout.main(["--format=npz", f"--out-dir={out}", *args])
+    assert exc.value.code == 2
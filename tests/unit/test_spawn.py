@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+
+def _reference(seed, pool, avoids):
+    rng = np.random.Generator(np.random.PCG64(seed))
+    out = []
+    for avoid in avoids:
+        sub = [p for p in pool if p != avoid] if avoid in pool and len(pool) > 1 else list(pool)
+        out.append(int(rng.choice(sub)))
+    return out
+
+
+@pytest.mark.parametrize("pool", [(1, 2, 3), (1, 2), (1, 2, 3, 4, 5, 6, 7)])
+def test_compat_reproduces_generator_choice(pool):
+    from column_popper.core.spawn import COMPAT_BLOCK, SpawnSampler
+
+    avoids = np.random.default_rng(1).integers(0, max(pool) + 1, size=4 * COMPAT_BLOCK + 7)
+    for seed in (0, 7, 12345):
+        sampler = SpawnSampler(np.random.Generator(np.random.PCG64(seed)), pool, "compat")
+        got = [sampler.sample(int(a)) for a in avoids]
+        assert got == _reference(seed, pool, avoids)
+
+
+def test_compat_consumes_buffered_half_word():
+    from column_popper.core.spawn import SpawnSampler
+
+    rng = np.random.Generator(np.random.PCG64(3))
+    ref = np.random.Generator(np.random.PCG64(3))
+    rng.integers(0, 10, dtype=np.uint32)
+    ref.integers(0, 10, dtype=np.uint32)
+    sampler = SpawnSampler(rng, (1, 2, 3), "compat")
+    assert [sampler.sample(0) for _ in range(50)] == [int(ref.choice([1, 2, 3])) for _ in range(50)]
+
+
+def test_fast_mode_deterministic_and_respects_avoid():
+    from column_popper.core.spawn import FAST_BLOCK, SpawnSampler
+
+    def draw(seed, avoids):
+        sampler = SpawnSampler(np.random.Generator(np.random.PCG64(seed)), (1, 2, 3), "fast")
+        return [sampler.sample(int(a)) for a in avoids]
+
+    avoids = np.random.default_rng(2).integers(0, 4, size=FAST_BLOCK + 100)
+    a = draw(9, avoids)
+    assert a == draw(9, avoids)
+    assert a != draw(10, avoids)
+    assert all(v != avoid and v in (1, 2, 3) for v, avoid in zip(a, avoids, strict=True))
+    counts = np.bincount(draw(9, np.zeros(6000, dtype=int)), minlength=4)[1:]
+    assert counts.min() > 1800
+
+
+def test_fast_mode_rejects_pools_beyond_uint8_span():
+    from column_popper.core.spawn import FAST_MAX_POOL, SpawnSampler
+
+    pool = tuple(range(1, FAST_MAX_POOL + 1))
+    sampler = SpawnSampler(np.random.default_rng(0), pool, "fast")
+    assert {sampler.sample(1) for _ in range(2000)} == set(pool[1:])
+    with pytest.raises(ValueError, match="at most 16"):
+        SpawnSampler(np.random.default_rng(0), (*pool, FAST_MAX_POOL + 1), "fast")
+    SpawnSampler(np.random.default_rng(0), (*pool, FAST_MAX_POOL + 1), "compat")
+
+
+def test_env_reports_spawn_stream():
+    from column_popper.envs.column_popper_env import ColumnPopperEnv
+
+    _, info = ColumnPopperEnv(seed=1).reset()
+    assert info["spawn_stream"] == "pcg64-choice-v1"
+    _, info = ColumnPopperEnv(seed=1, spawn_mode="fast").reset()
+    assert info["spawn_stream"] == "pcg64-block6-v1"
+    with pytest.raises(ValueError):
+        ColumnPopperEnv(spawn_mode="bogus")
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def table_cache(tmp_path_factory):
+    from column_popper.core import tables
+
+    cache_dir = tmp_path_factory.mktemp("tables")
+    mp = pytest.MonkeyPatch()
+    mp.setenv("COLUMN_POPPER_CACHE", str(cache_dir))
+    yield cache_dir
+    mp.undo()
+    tables._loaded.clear()
+
+
+def test_pop_table_matches_bit_ops_and_is_cached(tmp_path):
+    from column_popper.core.bitboard import pop_triples_codes
+    from column_popper.core.tables import PopTable, load_pop_table, pop_table_path
+
+    height = 6
+    with pytest.raises(FileNotFoundError):
+        load_pop_table(height, tmp_path, build=False)
+    table = load_pop_table(height, tmp_path)
+    assert pop_table_path(height, tmp_path).exists()
+    assert isinstance(table, np.memmap)
+
+    codes = np.arange(4**height, dtype=np.uint32)
+    expected_codes, expected_popped = pop_triples_codes(codes, height)
+    kernel = PopTable(table)
+    new_codes, popped = kernel.pop_codes(codes)
+    np.testing.assert_array_equal(new_codes, expected_codes)
+    np.testing.assert_array_equal(popped, expected_popped)
+    assert kernel.pop(int(codes[-1])) == (int(expected_codes[-1]), int(expected_popped[-1]))
+
+
+def test_spawn_avoid_table_matches_bit_ops():
+    from column_popper.core.bitboard import spawn_avoid_codes
+    from column_popper.core.tables import PopTable
+
+    codes = np.arange(4**4, dtype=np.uint32)
+    np.testing.assert_array_equal(PopTable.spawn_avoid_codes(codes), spawn_avoid_codes(codes))
+
+
+def test_lookup_backends_match_scan_backends(table_cache):
+    import gymnasium as gym
+
+    import column_popper.envs  # noqa: F401
+    from column_popper.envs.vector_env import VectorColumnPopperEnv
+
+    env_id = "SpecKitAI/ColumnPopper-v1"
+    env1 = gym.make(env_id, disable_env_checker=True, board_backend="array")
+    env2 = gym.make(env_id, disable_env_checker=True, board_backend="lookup")
+    venv1 = VectorColumnPopperEnv(8, seed=3)
+    venv2 = VectorColumnPopperEnv(8, seed=3, use_pop_table=True)
+    rng = np.random.default_rng(4)
+    try:
+        env1.reset(seed=2)
+        env2.reset(seed=2)
+        venv1.reset()
+        venv2.reset()
+        for _ in range(600):
+            a = int(rng.integers(0, 4))
+            o1, r1, t1, tr1, _ = env1.step(a)
+            o2, r2, t2, tr2, _ = env2.step(a)
+            np.testing.assert_array_equal(o1["board"], o2["board"])
+            assert (r1, t1, tr1) == (r2, t2, tr2)
+            if t1 or tr1:
+                env1.reset()
+                env2.reset()
+
+            actions = rng.integers(0, 4, size=8)
+            v1 = venv1.step(actions)
+            v2 = venv2.step(actions)
+            np.testing.assert_array_equal(v1[0]["board"], v2[0]["board"])
+            np.testing.assert_array_equal(v1[1], v2[1])
+    finally:
+        env1.close()
+        env2.close()